@@ -0,0 +1,144 @@
+# Асинхронный двойник DatabaseRepository: те же методы и DatabaseResponse, запросы — через AsyncSession.
+from functools import wraps
+import logging
+from typing import AsyncContextManager, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.database import AsyncTransaction, Database
+from backend.repository import DatabaseRepository
+from backend.utils.database_exception_handler import DatabaseErrorHandler
+from backend.utils.responce_types import DatabaseResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _async_twin(method_name: str, uses_database: bool = True, read_only: bool = False) -> classmethod:
+    """
+    Асинхронная версия метода DatabaseRepository с той же сигнатурой и документацией.
+    uses_database=False — метод работает только с каталогом схемы и кэшами, выполняется сразу;
+    read_only=True — только чтение: вне async_transaction() идёт на реплику, как Database.run_read
+    """
+    method = getattr(DatabaseRepository, method_name)
+
+    @wraps(method)
+    async def twin(cls, *args, **kwargs) -> DatabaseResponse:
+        if not uses_database:
+            return method(*args, **kwargs)
+        return await cls._run(method, args, kwargs, read_only)
+
+    return classmethod(twin)
+
+
+class AsyncDatabaseRepository:
+    """
+    Асинхронный репозиторий на SQLAlchemy asyncio (драйвер settings.ASYNC_DRIVER: psycopg или asyncpg).
+    Методы совпадают с DatabaseRepository (валидация, построение запросов, кэши выражений и результатов
+    общие) и возвращают DatabaseResponse; ожидание ответа БД не блокирует цикл событий, поэтому
+    независимые запросы выполняются параллельно:
+
+        products, sales = await asyncio.gather(
+            AsyncDatabaseRepository.search_foreign_key("products", "name", "product_id", "эн"),
+            AsyncDatabaseRepository.get_table_data("sales", filters_dict={"product_id": 1}, limit=50),
+        )
+
+    Вне async_transaction() каждый вызов — отдельная сессия и транзакция на соединении из пула
+    асинхронного движка. Чтения (get_table_data, aggregate_table_data, search_foreign_key) при заданной
+    реплике идут на неё с тем же окном read-your-writes и переходом в основную БД при её отказе,
+    что и в DatabaseRepository; внутри async_transaction() все вызовы — в основной БД. COPY (copy_from_csv, export_table_data) и потоковое iter_table_data
+    работают с соединением драйвера напрямую и есть только в DatabaseRepository
+    """
+
+    @staticmethod
+    def transaction() -> AsyncContextManager[AsyncTransaction]:
+        """
+        Единица работы над несколькими вызовами:
+
+            async with AsyncDatabaseRepository.transaction() as tx:
+                await AsyncDatabaseRepository.insert_into_table("sales", {...})
+                async with tx.savepoint():
+                    await AsyncDatabaseRepository.update_table_data("inventory", {...}, {...})
+
+        Поведение как у DatabaseRepository.transaction(); вызовы внутри выполняются по очереди
+        """
+        return Database().async_transaction()
+
+    @classmethod
+    async def _run(
+        cls, method: Callable[..., DatabaseResponse], args: tuple, kwargs: dict, read_only: bool = False
+    ) -> DatabaseResponse:
+        """
+        Выполнить метод DatabaseRepository в сессии async_transaction() или в отдельной сессии
+        (read_only=True — в сессии Database.open_async_read_session)
+        """
+        database = Database()
+        transaction = database.current_async_transaction()
+        if transaction is not None:
+            return await transaction.run(method, *args, **kwargs)
+
+        try:
+            if read_only:
+                response = await cls._run_in_session(
+                    database, await database.open_async_read_session(), method, args, kwargs
+                )
+                if response is not None:
+                    return response
+            return await cls._run_in_session(database, database.get_async_db_session(), method, args, kwargs)
+
+        except Exception as e:
+            logger.error(f"Ошибка в асинхронном {method.__name__}: {str(e)}")
+            return DatabaseErrorHandler.handle_exception(e, f"async {method.__name__}")
+
+    @staticmethod
+    async def _run_in_session(
+        database: Database, session: AsyncSession, method: Callable[..., DatabaseResponse], args: tuple, kwargs: dict
+    ) -> Optional[DatabaseResponse]:
+        """
+        Вызов в отдельной транзакции сессии session. None — реплика перестала отвечать во время чтения:
+        она помечается недоступной, вызов нужно повторить в основной БД (как в Database.run_read)
+        """
+        async with session:
+            transaction = AsyncTransaction(session, explicit=False)
+            response = await transaction.run(method, *args, **kwargs)
+            if transaction.failed:
+                error = transaction._transaction._failures[0]
+                if session.sync_session.info.get("replica") and database._is_replica_failure(error):
+                    await session.invalidate()
+                    database._mark_replica_down(error)
+                    logger.warning(f"Чтение с реплики прервано, повтор в основной БД: {error}")
+                    return None
+                await session.rollback()
+                return response
+            await session.commit()
+            database._committed(session.sync_session, transaction.wrote)
+            return response
+
+    # Каталог схемы и кэши
+    get_model_by_tablename = _async_twin("get_model_by_tablename", uses_database=False)
+    get_tablenames = _async_twin("get_tablenames", uses_database=False)
+    get_table_columns = _async_twin("get_table_columns", uses_database=False)
+    get_display_column = _async_twin("get_display_column", uses_database=False)
+    get_related_tables = _async_twin("get_related_tables", uses_database=False)
+    get_result_cache_stats = _async_twin("get_result_cache_stats", uses_database=False)
+    get_statement_cache_stats = _async_twin("get_statement_cache_stats", uses_database=False)
+    get_query_log = _async_twin("get_query_log", uses_database=False)
+    configure_query_log = _async_twin("configure_query_log", uses_database=False)
+
+    # Чтение
+    get_table_data = _async_twin("get_table_data", read_only=True)
+    aggregate_table_data = _async_twin("aggregate_table_data", read_only=True)
+    search_foreign_key = _async_twin("search_foreign_key", read_only=True)
+
+    # Запись
+    insert_into_table = _async_twin("insert_into_table")
+    insert_many = _async_twin("insert_many")
+    upsert_many = _async_twin("upsert_many")
+    bulk_update_by_pk = _async_twin("bulk_update_by_pk")
+    update_table_data = _async_twin("update_table_data")
+    increment = _async_twin("increment")
+    delete_from_table = _async_twin("delete_from_table")
+
+    @staticmethod
+    def invalidate_result_cache(*table_names: str) -> None:
+        """Сброс кэша результатов (общего с DatabaseRepository)"""
+        DatabaseRepository.invalidate_result_cache(*table_names)
@@ -1,8 +1,19 @@
+import asyncio
+import logging
+import time
 from sqlalchemy import Engine, create_engine
-from sqlalchemy.orm import sessionmaker
-from contextlib import contextmanager
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, TypeVar
 from backend.settings import PgConfig
 from backend.utils.database_exception_handler import DatabaseErrorHandler
+from backend.utils.pool_instrumentation import InstrumentedQueuePool, PoolInstrumentation
+from backend.utils.query_instrumentation import QueryInstrumentation
+
+logger = logging.getLogger(__name__)
 
 '''
 Singleton гарантирует, что класс имеет только один экземпляр во всем приложении и предоставляет 
@@ -19,6 +30,123 @@ class Singleton(type):
         return self._instances[self]
 
 
+class TransactionFailedError(RuntimeError):
+    """Шаг единицы работы завершился ошибкой БД, вся транзакция откачена"""
+
+    def __init__(self, cause: BaseException):
+        super().__init__(f"Транзакция откачена из-за ошибки: {cause}")
+        self.cause = cause
+
+
+class Transaction:
+    """
+    Единица работы: одна сессия и одна транзакция для всех вызовов репозитория внутри
+    with Database().transaction(). Ошибка БД в любом шаге помечает текущий уровень
+    (транзакцию или точку сохранения) как неудавшийся: уровень откатывается при выходе
+    """
+
+    def __init__(self, session: Session, explicit: bool = True):
+        self.session = session
+        # False — сессия одного вызова AsyncDatabaseRepository вне async_transaction()
+        self.explicit = explicit
+        # Был ли вызов get_db_session не только для чтения (окно read-your-writes после фиксации)
+        self.wrote = False
+        # Первая ошибка на каждом уровне вложенности: [транзакция, точка сохранения, ...]
+        self._failures: List[Optional[BaseException]] = [None]
+
+    @property
+    def failed(self) -> bool:
+        return self._failures[-1] is not None
+
+    def mark_failed(self, error: BaseException) -> None:
+        if self._failures[-1] is None:
+            self._failures[-1] = error
+
+    @contextmanager
+    def savepoint(self) -> Iterator["Transaction"]:
+        """
+        Вложенный шаг (SAVEPOINT): при исключении или ошибке БД внутри откатывается только он,
+        внешняя транзакция продолжается
+        """
+        nested = self.session.begin_nested()
+        self._failures.append(None)
+        try:
+            yield self
+        except BaseException:
+            self._failures.pop()
+            nested.rollback()
+            raise
+        if self._failures.pop() is not None:
+            nested.rollback()
+        else:
+            nested.commit()
+
+
+_current_transaction: ContextVar[Optional[Transaction]] = ContextVar("current_transaction", default=None)
+
+T = TypeVar("T")
+
+
+class AsyncTransaction:
+    """
+    Асинхронная единица работы: одна AsyncSession для вызовов AsyncDatabaseRepository.
+    Синхронный код репозитория выполняется в AsyncSession.run_sync с сессией этой единицы работы
+    (через Transaction, как внутри transaction()), запросы при этом не блокируют цикл событий
+    """
+
+    def __init__(self, session: AsyncSession, explicit: bool = True):
+        self.session = session
+        self._transaction = Transaction(session.sync_session, explicit)
+        # AsyncSession нельзя использовать из нескольких задач одновременно: вызовы выполняются по очереди
+        self._lock = asyncio.Lock()
+
+    @property
+    def failed(self) -> bool:
+        return self._transaction.failed
+
+    @property
+    def wrote(self) -> bool:
+        return self._transaction.wrote
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Выполнить синхронную функцию, работающую через get_db_session, в сессии единицы работы"""
+        async with self._lock:
+            return await self.session.run_sync(self._call, func, args, kwargs)
+
+    def _call(self, sync_session: Session, func: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        # run_sync выполняет func в отдельном greenlet: сессия передаётся через _current_transaction
+        token = _current_transaction.set(self._transaction)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_transaction.reset(token)
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncIterator["AsyncTransaction"]:
+        """Вложенный шаг (SAVEPOINT), как Transaction.savepoint"""
+        async with self._lock:
+            nested = await self.session.begin_nested()
+        failures = self._transaction._failures
+        failures.append(None)
+        try:
+            yield self
+        except BaseException:
+            failures.pop()
+            async with self._lock:
+                await nested.rollback()
+            raise
+        async with self._lock:
+            if failures.pop() is not None:
+                await nested.rollback()
+            else:
+                await nested.commit()
+
+
+_current_async_transaction: ContextVar[Optional[AsyncTransaction]] = ContextVar(
+    "current_async_transaction", default=None
+)
+
+
 class Database(metaclass=Singleton):
     def __init__(self):
         # Получение конфигурации базы данных из настроек
@@ -28,47 +156,316 @@ class Database(metaclass=Singleton):
         self._SessionLocal = sessionmaker(
             autocommit=False, autoflush=False, bind=self._engine
         )
+        # Реплика для чтения (settings.REPLICA_URL): None — все запросы идут в основную БД
+        self._replica_engine = self._create_replica_engine()
+        self._ReplicaSessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=self._replica_engine
+        )
+        # time.monotonic(): до какого момента реплика считается недоступной и когда была последняя запись
+        self._replica_down_until = 0.0
+        self._last_write_at = float("-inf")
+        # Асинхронный движок создаётся при первом обращении (драйвер settings.ASYNC_DRIVER необязателен)
+        self._async_engine: Optional[AsyncEngine] = None
+        self._AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+        self._AsyncReplicaSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
 
     @DatabaseErrorHandler()
-    def create_database_engine(self) -> Engine:
+    def create_database_engine(self, replica: bool = False) -> Engine:
         """
-        Создание движка SQLAlchemy с использованием настроек PgConfig
+        Создание движка SQLAlchemy с использованием настроек PgConfig (replica=True — движок реплики)
         """
-        database_url = self._pg_config.database_url()
+        database_url = self._pg_config.replica_database_url() if replica else self._pg_config.database_url()
 
         engine = create_engine(
             database_url,
             echo=self._pg_config.echo if hasattr(self._pg_config, "echo") else False,  # type: ignore
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,  # Проверка соединений перед использованием
+            connect_args=self._pg_config.connect_args(),  # sslmode, connect_timeout, prepare_threshold (psycopg)
+            poolclass=InstrumentedQueuePool,
+            **self._pg_config.pool_options(),  # размер, переполнение, таймаут, recycle, pre-ping (settings.POOL_*)
         )
 
+        # Журнал запросов и медленных планов (включается settings.QUERY_LOG_ENABLED)
+        QueryInstrumentation.install(engine)
+        # Статистика пула: ожидание соединения, установка соединений, исчерпания
+        PoolInstrumentation.install(engine)
+
+        return engine
+
+    def _create_replica_engine(self) -> Optional[Engine]:
+        if not self._pg_config.replica_url:
+            return None
+        engine = self.create_database_engine(replica=True)
+        if not isinstance(engine, Engine):
+            logger.warning(f"Реплика для чтения не подключена, чтения идут в основную БД: {engine.message}")
+            return None
         return engine
 
     @contextmanager
     @DatabaseErrorHandler()
-    def get_db_session(self):
+    def get_db_session(self, read_only: bool = False, use_replica: bool = True):
         """
-        Контекстный менеджер для сессий базы данных с автоматическим управлением транзакциями
+        Контекстный менеджер для сессий базы данных с автоматическим управлением транзакциями.
+        Внутри transaction() возвращает сессию единицы работы: фиксация — при выходе из transaction().
+        read_only=True — сессия только для чтения: при заданной реплике идёт в неё (см. _open_read_session),
+        если не передано use_replica=False
         """
-        session = self._SessionLocal()
+        transaction = _current_transaction.get()
+        if transaction is not None:
+            transaction.wrote = transaction.wrote or not read_only
+            try:
+                yield transaction.session
+            except Exception as e:
+                transaction.mark_failed(e)
+                raise
+            return
+
+        session = self._open_read_session() if read_only and use_replica else self._SessionLocal()
         try:
             yield session
             session.commit()
+            self._committed(session, wrote=not read_only)
         except Exception as e:
-            session.rollback()
-            print(f"Транзакция отменена из-за ошибки: {e}")
+            # Реплика перестала отвечать во время запроса: следующие чтения — в основную БД
+            if session.info.get("replica") and self._is_replica_failure(e):
+                # Ошибка драйвера (COPY через его курсор) не помечает соединение разорванным —
+                # соединение отбрасывается без отката, иначе ошибка отката скроет исходную
+                session.invalidate()
+                self._mark_replica_down(e)
+            else:
+                session.rollback()
             raise
         finally:
             session.close()
 
+    def run_read(self, work: Callable[[Session], T], can_retry: Optional[Callable[[], bool]] = None) -> T:
+        """
+        Выполнить чтение work(session) в сессии get_db_session(read_only=True).
+        Если реплика перестала отвечать во время запроса (_is_replica_failure), она помечается недоступной,
+        а work один раз повторяется в основной БД. can_retry() — можно ли повторять
+        (например, пока результат ещё не начал записываться в поток)
+        """
+        on_replica = False
+        try:
+            with self.get_db_session(read_only=True) as session:
+                # Внутри единицы работы сессию не заменить: повтор — у её владельца
+                # (AsyncDatabaseRepository._run для сессии реплики)
+                on_replica = bool(session.info.get("replica")) and _current_transaction.get() is None
+                return work(session)
+        except Exception as e:
+            if not on_replica or not self._is_replica_failure(e) or (can_retry is not None and not can_retry()):
+                raise
+            logger.warning(f"Чтение с реплики прервано, повтор в основной БД: {e}")
+
+        with self.get_db_session(read_only=True, use_replica=False) as session:
+            return work(session)
+
+    def _open_read_session(self) -> Session:
+        """
+        Сессия для чтения: реплика, если она задана и доступна и после последней записи прошло
+        не меньше settings.REPLICA_STICKY_SECONDS (read-your-writes), иначе основная БД.
+        Недоступная реплика пропускается settings.REPLICA_RETRY_SECONDS
+        """
+        if self._replica_engine is None or not self._replica_readable():
+            return self._SessionLocal()
+
+        session = self._ReplicaSessionLocal()
+        try:
+            # Соединение берётся сразу: при недоступной реплике запрос уходит в основную БД
+            session.connection()
+        except OperationalError as e:
+            session.close()
+            self._mark_replica_down(e)
+            return self._SessionLocal()
+        session.info["replica"] = True
+        return session
+
+    async def open_async_read_session(self) -> AsyncSession:
+        """
+        Асинхронная сессия для чтения (async with ... as session): реплика или основная БД
+        по тем же правилам, что _open_read_session
+        """
+        self.get_async_engine()
+        if self._AsyncReplicaSessionLocal is None or not self._replica_readable():
+            return self._AsyncSessionLocal()
+
+        session = self._AsyncReplicaSessionLocal()
+        try:
+            await session.connection()
+        except OperationalError as e:
+            await session.close()
+            self._mark_replica_down(e)
+            return self._AsyncSessionLocal()
+        session.sync_session.info["replica"] = True
+        return session
+
+    def _replica_readable(self) -> bool:
+        """Реплика доступна и окно read-your-writes после последней записи истекло"""
+        now = time.monotonic()
+        return (
+            now >= self._replica_down_until
+            and now - self._last_write_at >= self._pg_config.replica_sticky_seconds
+        )
+
+    def _is_replica_failure(self, error: BaseException) -> bool:
+        """
+        Обрыв соединения с репликой: OperationalError SQLAlchemy, ошибка, признанная диалектом разрывом
+        соединения (asyncpg), или ошибка драйвера (COPY через его курсор)
+        """
+        if isinstance(error, OperationalError) or (isinstance(error, DBAPIError) and error.connection_invalidated):
+            return True
+        dbapi = self._replica_engine.dialect.dbapi if self._replica_engine is not None else None
+        return dbapi is not None and isinstance(error, (dbapi.OperationalError, dbapi.InterfaceError))
+
+    def _mark_replica_down(self, error: BaseException) -> None:
+        self._replica_down_until = time.monotonic() + self._pg_config.replica_retry_seconds
+        logger.warning(
+            f"Реплика недоступна, чтения идут в основную БД "
+            f"({self._pg_config.replica_retry_seconds:g} с): {error}"
+        )
+
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """
+        Единица работы: вызовы репозитория внутри with используют одну сессию,
+        фиксация одна — при выходе. Вложенный вызов transaction() открывает точку сохранения.
+        Если шаг завершился ошибкой БД (метод репозитория вернул ошибку), транзакция откатывается
+        и возбуждается TransactionFailedError
+        """
+        current = _current_transaction.get()
+        if current is not None:
+            with current.savepoint() as transaction:
+                yield transaction
+            return
+
+        session = self._SessionLocal()
+        transaction = Transaction(session)
+        token = _current_transaction.set(transaction)
+        try:
+            try:
+                yield transaction
+            except BaseException:
+                session.rollback()
+                raise
+            if transaction.failed:
+                session.rollback()
+                raise TransactionFailedError(transaction._failures[0])
+            session.commit()
+            self._committed(session, transaction.wrote)
+        finally:
+            _current_transaction.reset(token)
+            session.close()
+
+    @asynccontextmanager
+    async def async_transaction(self) -> AsyncIterator[AsyncTransaction]:
+        """
+        Асинхронная единица работы (аналог transaction() для AsyncDatabaseRepository):
+        вызовы внутри async with используют одну AsyncSession, фиксация одна — при выходе.
+        Вложенный вызов открывает точку сохранения; при ошибке шага — откат и TransactionFailedError
+        """
+        current = _current_async_transaction.get()
+        if current is not None:
+            async with current.savepoint() as transaction:
+                yield transaction
+            return
+
+        async with self.get_async_db_session() as session:
+            transaction = AsyncTransaction(session)
+            token = _current_async_transaction.set(transaction)
+            try:
+                try:
+                    yield transaction
+                except BaseException:
+                    await session.rollback()
+                    raise
+                if transaction.failed:
+                    await session.rollback()
+                    raise TransactionFailedError(transaction._transaction._failures[0])
+                await session.commit()
+                self._committed(session.sync_session, transaction.wrote)
+            finally:
+                _current_async_transaction.reset(token)
+
+    def current_async_transaction(self) -> Optional[AsyncTransaction]:
+        """Открытая async_transaction() текущей задачи"""
+        return _current_async_transaction.get()
+
+    def in_transaction(self) -> bool:
+        """Открыта ли единица работы transaction() (или async_transaction()) в текущем контексте"""
+        transaction = _current_transaction.get()
+        return transaction is not None and transaction.explicit
+
+    @staticmethod
+    def after_commit(session: Session, callback: Callable[[], None]) -> None:
+        """
+        Вызвать callback после фиксации транзакции сессии: при выходе из get_db_session
+        или, внутри единицы работы, при выходе из transaction(). При откате не вызывается
+        """
+        session.info.setdefault("after_commit", []).append(callback)
+
+    @staticmethod
+    def _run_after_commit(session: Session) -> None:
+        for callback in session.info.pop("after_commit", []):
+            callback()
+
+    def _committed(self, session: Session, wrote: bool) -> None:
+        """После фиксации: отметка записи (окно read-your-writes для реплики) и callbacks after_commit"""
+        if wrote:
+            self._last_write_at = time.monotonic()
+        self._run_after_commit(session)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Состояние пула (занято, свободно, переполнение) и гистограммы ожидания и установки соединений"""
+        stats = PoolInstrumentation.snapshot(self._engine)
+        stats["pre_ping"] = self._pg_config.pool_pre_ping
+        stats["recycle"] = self._pg_config.pool_recycle
+        if self._replica_engine is not None:
+            now = time.monotonic()
+            stats["replica"] = {
+                **PoolInstrumentation.snapshot(self._replica_engine),
+                "available": now >= self._replica_down_until,
+                "sticky": now - self._last_write_at < self._pg_config.replica_sticky_seconds,
+            }
+        return stats
+
     def get_engine(self) -> Engine:
         """
         Получить экземпляр движка базы данных
         """
         return self._engine
 
+    def get_async_engine(self) -> AsyncEngine:
+        """
+        Асинхронный движок (settings.ASYNC_DRIVER) с теми же параметрами пула.
+        Соединения пула привязаны к циклу событий, в котором созданы.
+        Вместе с ним создаётся асинхронный движок реплики, если подключена синхронная
+        """
+        if self._async_engine is None:
+            engine = self._create_async_engine(self._pg_config.async_database_url())
+            if self._replica_engine is not None:
+                self._AsyncReplicaSessionLocal = async_sessionmaker(
+                    self._create_async_engine(self._pg_config.replica_database_url(asynchronous=True)),
+                    autoflush=False, expire_on_commit=False
+                )
+            self._AsyncSessionLocal = async_sessionmaker(
+                engine, autoflush=False, expire_on_commit=False
+            )
+            self._async_engine = engine
+        return self._async_engine
+
+    def _create_async_engine(self, database_url: str) -> AsyncEngine:
+        engine = create_async_engine(
+            database_url,
+            connect_args=self._pg_config.connect_args(self._pg_config.async_driver),
+            **self._pg_config.pool_options(),
+        )
+        QueryInstrumentation.install(engine.sync_engine)
+        return engine
+
+    def get_async_db_session(self) -> AsyncSession:
+        """Новая AsyncSession (async with ... as session); фиксация — на стороне вызывающего"""
+        self.get_async_engine()
+        return self._AsyncSessionLocal()
+
     def get_database_url(self) -> str:
         """
         Получить URL базы данных из PgConfig
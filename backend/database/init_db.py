@@ -4,7 +4,7 @@
 """
 import logging
 from pathlib import Path
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import create_engine, func, inspect, literal, select, text, union_all
 from sqlalchemy.exc import SQLAlchemyError
 from backend.utils.database_exception_handler import DatabaseErrorHandler
 from backend.utils.responce_types import DatabaseResponse, ErrorCode
@@ -67,7 +67,7 @@ def create_database_if_not_exists() -> DatabaseResponse:
 
 
 def _get_table_counts(engine) -> dict[str, int]:
-    """Внутренняя функция: получает количество строк во всех таблицах (отдельные запросы для простоты)"""
+    """Внутренняя функция: получает количество строк во всех таблицах одним запросом (UNION ALL)"""
     inspector = inspect(engine)
     table_names = [t for t in inspector.get_table_names(schema='public') if t in Base.metadata.tables]
     counts = {}
@@ -75,15 +75,23 @@ def _get_table_counts(engine) -> dict[str, int]:
     if not table_names:
         return counts
     
+    # Один запрос вместо отдельного COUNT(*) на каждую таблицу; имена таблиц экранирует SQLAlchemy
+    union_query = union_all(*(
+        select(
+            literal(table_name).label("table_name"),
+            func.count().label("row_count")
+        ).select_from(Base.metadata.tables[table_name])
+        for table_name in table_names
+    ))
+    
     with engine.connect() as conn:
-        for table_name in table_names:
-            try:
-                result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-                counts[table_name] = result.scalar() or 0
+        try:
+            for table_name, row_count in conn.execute(union_query):
+                counts[table_name] = row_count or 0
                 logger.debug(f"Подсчёт для {table_name}: {counts[table_name]}")
-            except Exception as e:
-                logger.warning(f"Ошибка подсчета в {table_name}: {e}")
-                counts[table_name] = 0
+        except Exception as e:
+            logger.warning(f"Ошибка подсчета строк в таблицах: {e}")
+            counts = {table_name: 0 for table_name in table_names}
     
     return counts
 
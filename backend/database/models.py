@@ -79,7 +79,7 @@ class Inventory(Base):
     inventory_id = Column(Integer, primary_key=True, autoincrement=True)
     product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False)
     quantity_in_stock = Column(Integer, nullable=False, default=0)
-    last_updated = Column(TIMESTAMP, default=func.now())
+    last_updated = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
 
     # Ограничение проверки
     __table_args__ = (
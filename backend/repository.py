@@ -1,30 +1,134 @@
 # Содержит функции или классы, которые реализуют все запросы к базе (чтение, запись, обновление, удаление).
 from datetime import datetime, date
+from decimal import Decimal
 from collections import defaultdict
+import json
 import logging
+import math
+import time
+from pathlib import Path
+from threading import Lock
 from backend.utils.database_exception_handler import DatabaseErrorHandler
 from backend.utils.exception_handler import ExceptionHandler
 from backend.utils.responce_types import DatabaseResponse, ErrorCode, ResponseStatus
+from backend.utils import columnar, pg_copy
+from backend.utils.query_instrumentation import QueryInstrumentation
+from backend.utils.result_cache import ResultCache
+from backend.utils.schema_catalog import SchemaCatalog, build_columns_info
+from backend.utils.schema_reflection import load_schema, mentions_column
+from backend.utils.statement_cache import StatementCache
+from backend.utils.keyset_cursor import (
+    InvalidCursorError, cursor_signature, decode_cursor, encode_cursor
+)
 from backend.database.models import Base
-from backend.database.database import Database
+from backend.database.database import Database, Transaction
+from backend.settings import (
+    RESULT_CACHE_ENABLED, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL, SCHEMA_CACHE_ENABLED, SCHEMA_CACHE_PATH
+)
 from sqlalchemy import (
-    CheckConstraint, String, TextClause, Tuple, and_, asc, cast, delete, desc,
-    select, insert, update, text
+    Integer, Numeric, String, UniqueConstraint, and_, asc, bindparam, cast, column, delete, desc,
+    distinct, func, literal_column, or_, select, insert, tuple_, update, text, values
 )
-from typing import Dict, List, Optional, Any
-from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from typing import IO, Callable, ContextManager, Dict, Iterator, List, Optional, Any, Sequence, Tuple, Union
 
 
 db_engine = Database().get_engine()
 logger = logging.getLogger(__name__)
 
 
+def _load_reflected_schema() -> Optional[Dict[str, Dict[str, Any]]]:
+    """Живая схема БД для каталога; при недоступной БД каталог строится только по моделям"""
+    if not SCHEMA_CACHE_ENABLED:
+        return None
+    try:
+        return load_schema(db_engine, Base, SCHEMA_CACHE_PATH)
+    except Exception as e:
+        logger.warning(f"Не удалось отразить схему БД, используются только модели: {e}")
+        return None
+
+
+class FilterValueError(ValueError):
+    """Значение фильтра не прошло валидацию"""
+
+
 class DatabaseRepository:
     """Репозиторий для работы с базой данных"""
   
-    # Кэш для метаданных таблиц
-    _columns_cache: Dict[str, Dict[str, Any]] = {}
-    _cache_enabled: bool = True
+    # Каталог схемы: модели, колонки, связи и колонки для отображения, собирается один раз —
+    # при первом обращении (_get_catalog), а не при импорте: отражение схемы обращается к БД
+    _catalog: Optional[SchemaCatalog] = None
+    _catalog_lock = Lock()
+
+    # Кэш построенных запросов по их форме (значения передаются через bindparam)
+    _statement_cache: StatementCache = StatementCache()
+
+    # Кэш результатов get_table_data, сбрасываемый при записи в таблицу
+    _result_cache: ResultCache = ResultCache(
+        max_entries=RESULT_CACHE_MAX_ENTRIES,
+        ttl=RESULT_CACHE_TTL,
+        enabled=RESULT_CACHE_ENABLED
+    )
+
+    # Планы фильтров: (таблица, набор ключей) -> разобранные ключи и преобразователи значений
+    _filter_plans: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[str, str, str, Callable[[Any], Any]]]] = {}
+    _FILTER_PLANS_MAX_SIZE: int = 512
+
+    # Агрегатные функции для aggregate_table_data
+    _AGGREGATE_FUNCTIONS = {
+        'sum': func.sum,
+        'count': func.count,
+        'count_distinct': lambda column: func.count(distinct(column)),
+        'avg': func.avg,
+        'min': func.min,
+        'max': func.max,
+    }
+
+    # Оконные функции для get_table_data(windows=...)
+    _WINDOW_FUNCTIONS = {
+        'row_number': func.row_number,
+        'rank': func.rank,
+        'dense_rank': func.dense_rank,
+        'sum': func.sum,
+        'avg': func.avg,
+        'count': func.count,
+        'min': func.min,
+        'max': func.max,
+        'lag': func.lag,
+        'lead': func.lead,
+    }
+
+    @classmethod
+    def _get_catalog(cls) -> SchemaCatalog:
+        """Каталог схемы; при первом вызове строится по моделям и отражённой схеме БД"""
+        if cls._catalog is None:
+            with cls._catalog_lock:
+                if cls._catalog is None:
+                    cls._catalog = SchemaCatalog.build(Base, reflected=_load_reflected_schema())
+        return cls._catalog
+
+    @staticmethod
+    def transaction() -> ContextManager[Transaction]:
+        """
+        Единица работы над несколькими вызовами репозитория:
+
+            with DatabaseRepository.transaction() as tx:
+                DatabaseRepository.insert_into_table("sales", {...})
+                with tx.savepoint():
+                    DatabaseRepository.update_table_data("inventory", {...}, {...})
+
+        Методы внутри with используют одну сессию, фиксация одна — при выходе.
+        Ошибка БД в шаге откатывает транзакцию целиком (TransactionFailedError при выходе),
+        в savepoint() — только этот шаг. Вложенный transaction() равносилен savepoint()
+        """
+        return Database().transaction()
+
+    @classmethod
+    def _invalidate_after_commit(cls, session: Any, table_name: str) -> None:
+        """Сброс кэша результатов таблицы после фиксации (в transaction() — после общей фиксации)"""
+        Database.after_commit(session, lambda: cls._result_cache.invalidate_table(table_name))
 
     @classmethod
     @DatabaseErrorHandler()
@@ -36,13 +140,12 @@ class DatabaseRepository:
                 "Некорректное имя таблицы"
             )
 
-        for mapper in Base.registry.mappers:
-            if mapper.class_.__tablename__ == table_name:
-                logger.info(f"Таблица '{table_name}' успешно найдена")
-                return DatabaseResponse.success(
-                    data=mapper.class_,
-                    message=f"Модель для таблицы '{table_name}' найдена"
-                )
+        model = cls._get_catalog().model(table_name)
+        if model is not None:
+            return DatabaseResponse.success(
+                data=model,
+                message=f"Модель для таблицы '{table_name}' найдена"
+            )
 
         logger.warning(f"Таблица '{table_name}' не была найдена")
         return DatabaseResponse.error(
@@ -54,299 +157,1355 @@ class DatabaseRepository:
     @DatabaseErrorHandler()
     def get_tablenames(cls) -> DatabaseResponse:
         """Получение списка имён таблиц"""
+        tables = cls._get_catalog().table_names()
+        return DatabaseResponse.success(
+            data=tables,
+            message=f"Найдено {len(tables)} таблиц"
+        )
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def get_table_columns(cls, table_name: str, use_cache: bool = True) -> DatabaseResponse:
+        """
+        Получение полной информации о колонках таблицы, включая типы, внешние ключи, enum-значения и ограничения.
+        Возвращается изменяемая копия из каталога схемы; use_cache=False собирает описание заново по модели.
+        """
+        table_info = cls._get_catalog().table(table_name)
+        if table_info is None:
+            return cls.get_model_by_tablename(table_name)
+
+        try:
+            columns_info = table_info.columns_dict() if use_cache else build_columns_info(table_info.model)
+        except Exception as e:
+            return DatabaseResponse.error(
+                ErrorCode.OPERATION_FAILED,
+                f"Ошибка при получении колонок таблицы '{table_name}': {str(e)}"
+            )
+
+        return DatabaseResponse.success(
+            data=columns_info,
+            message=f"Найдено {len(columns_info)} колонок в таблице '{table_name}'"
+        )
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def get_display_column(cls, table_name: str) -> DatabaseResponse:
+        """Колонка для отображения записей таблицы (например, в выпадающих списках внешних ключей)"""
+        table_info = cls._get_catalog().table(table_name)
+        if table_info is None:
+            return cls.get_model_by_tablename(table_name)
+        return DatabaseResponse.success(data=table_info.display_column)
+
+    @classmethod
+    def _get_catalog_columns(cls, table_name: str) -> DatabaseResponse:
+        """Неизменяемое описание колонок из каталога схемы (без копирования, для внутренних проверок)"""
+        table_info = cls._get_catalog().table(table_name)
+        if table_info is None:
+            return cls.get_model_by_tablename(table_name)
+        return DatabaseResponse.success(data=table_info.columns)
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def get_table_data(
+        cls,
+        table_name: str,
+        columns_list: Optional[List[str]] = None,
+        filters_dict: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Dict[str, str]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        join_config: Optional[List[Dict[str, Any]]] = None,
+        keyset: bool = False,
+        cursor: Optional[str] = None,
+        result_format: str = "rows",
+        windows: Optional[Dict[str, Dict[str, Any]]] = None,
+        top_n: Optional[Dict[str, Any]] = None,
+        total: Optional[str] = None,
+        use_cache: bool = True
+    ) -> DatabaseResponse:
+        """
+        Получение данных из таблицы с расширенными фильтрами
+      
+        Новый формат filters_dict:
+        {
+            "column_name": value,                    # простое равенство
+            "column_name__gt": value,               # больше чем
+            "column_name__lt": value,               # меньше чем
+            "column_name__gte": value,              # больше или равно
+            "column_name__lte": value,              # меньше или равно
+            "column_name__like": value,             # LIKE '%value%'
+            "column_name__ilike": value,            # ILIKE '%value%' (регистронезависимо)
+            "column_name__in": [value1, value2],    # IN списка
+            "column_name__between": [min, max],     # BETWEEN
+            "column_name__is_null": True/False,     # IS NULL / IS NOT NULL
+            "column_name__neq": value,              # не равно
+        }
+
+        Keyset-пагинация (keyset=True или передан cursor):
+            строки отдаются после кортежа (колонки order_by + первичный ключ) последней
+            строки предыдущей страницы, поэтому глубокие страницы стоят столько же, сколько первая.
+            limit обязателен, offset не допускается. Токен следующей страницы
+            возвращается в response.meta["next_cursor"] (None, если страниц больше нет).
+            Колонки сортировки должны быть NOT NULL: сравнение с NULL не продвигает курсор.
+
+        result_format:
+            "rows"     — список словарей (по умолчанию);
+            "columnar" — {"row_count", "columns": {колонка: массив}, "schema": {...}}:
+                         целые, вещественные числа и даты в массивах NumPy, NUMERIC — object-массив
+                         Decimal без потери точности, текст/ENUM словарно закодированы
+                         ({"codes": int32, "categories": [...]}, NULL = -1). Требует numpy.
+
+        windows — оконные функции, вычисляемые в Postgres, добавляются колонками-псевдонимами:
+            {
+                "running_total": {"func": "sum", "column": "total_price",
+                                  "partition_by": ["product_id"], "order_by": {"sale_date": "asc"}},
+                "place": {"func": "rank", "partition_by": ["product_id"],
+                          "order_by": {"quantity_sold": "desc"}},
+                "prev_qty": {"func": "lag", "column": "quantity_sold", "offset": 1,
+                             "order_by": {"sale_date": "asc"}},
+            }
+            функции: row_number, rank, dense_rank, sum, avg, count, min, max, lag, lead;
+            "rows": [start, end] задаёт рамку ROWS BETWEEN (None — UNBOUNDED, 0 — CURRENT ROW).
+
+        top_n — первые n строк в каждой группе (фильтрация по номеру строки внутри Postgres):
+            {"n": 1, "partition_by": ["product_id"], "order_by": {"quantity_sold": "desc"}, "ties": False}
+            ties=True использует rank() и оставляет строки с равными значениями.
+
+        windows и top_n не совместимы с keyset-пагинацией: отбор по курсору изменил бы окна.
+
+        total — общее число строк без учёта limit/offset в response.meta["total"]:
+            "exact"     — count(*) OVER () в том же запросе (для keyset — отдельный COUNT(*)
+                          по запросу без курсора);
+            "estimated" — pg_class.reltuples для таблицы без фильтров и JOIN,
+                          иначе оценка планировщика (EXPLAIN); meta["total_is_estimate"] = True.
+
+        use_cache — брать результат из кэша результатов (LRU + TTL, см. settings.RESULT_CACHE_*,
+            по умолчанию кэш выключен). Записи сбрасываются при insert/update/delete через репозиторий
+            в любую из участвующих таблиц; изменения из других процессов видны после истечения TTL.
+            Каждый вызов получает свою копию данных. Внутри transaction() кэш не используется.
+
+        Если задана реплика (settings.REPLICA_URL), запрос выполняется на ней, кроме окна
+        read-your-writes после записи и периода недоступности реплики (Database.get_db_session(read_only=True)).
+        """
+        cache_key = None
+        # Внутри transaction() видны незафиксированные изменения: кэш не читается и не пополняется
+        if use_cache and cls._result_cache.enabled and not Database().in_transaction():
+            cache_key = ("get_table_data", json.dumps(
+                [table_name, columns_list, filters_dict, list((order_by or {}).items()), limit, offset,
+                 join_config, keyset, cursor, result_format, windows, top_n, total],
+                default=str
+            ))
+            cached = cls._result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            # Версии таблиц фиксируются до чтения, чтобы не закэшировать результат, устаревший из-за параллельной записи
+            snapshot = cls._result_cache.snapshot(
+                [table_name] + [join_item["table"] for join_item in join_config or []]
+            )
+
+        response = cls._fetch_table_data(
+            table_name, columns_list, filters_dict, order_by, limit, offset, join_config,
+            keyset, cursor, result_format, windows, top_n, total
+        )
+
+        if cache_key is not None and response.status == ResponseStatus.SUCCESS:
+            cls._result_cache.put(cache_key, response, snapshot)
+        return response
+
+    @classmethod
+    def get_result_cache_stats(cls) -> DatabaseResponse:
+        """Попадания, промахи, число записей и занимаемая память кэша результатов"""
+        return DatabaseResponse.success(
+            data=cls._result_cache.stats(),
+            message="Статистика кэша результатов"
+        )
+
+    @classmethod
+    def invalidate_result_cache(cls, *table_names: str) -> None:
+        """Сброс кэша результатов для таблиц, изменённых в обход методов репозитория"""
+        for table_name in table_names:
+            cls._result_cache.invalidate_table(table_name)
+
+    @classmethod
+    def get_pool_stats(cls) -> DatabaseResponse:
+        """Состояние и статистика пула соединений (см. Database.get_pool_stats)"""
+        stats = Database().get_pool_stats()
+        return DatabaseResponse.success(
+            data=stats,
+            message=(
+                f"Пул: занято {stats.get('checked_out')}, свободно {stats.get('checked_in')}, "
+                f"исчерпаний {stats.get('timeouts', 0)}"
+            )
+        )
+
+    @classmethod
+    def get_query_log(cls, min_duration_ms: float = 0) -> DatabaseResponse:
+        """Последние выполненные запросы (settings.QUERY_LOG_ENABLED): SQL, форма параметров, длительность, строки"""
+        records = [
+            record for record in QueryInstrumentation.records()
+            if record["duration_ms"] >= min_duration_ms
+        ]
+        return DatabaseResponse.success(
+            data=records,
+            message=f"В журнале {len(records)} запросов"
+        )
+
+    @classmethod
+    def configure_query_log(
+        cls,
+        enabled: Optional[bool] = None,
+        slow_threshold_ms: Optional[float] = None,
+        explain: Optional[bool] = None,
+        explain_analyze: Optional[bool] = None,
+        max_records: Optional[int] = None,
+    ) -> DatabaseResponse:
+        """
+        Изменение настроек журнала запросов во время работы (None — оставить как есть):
+        включение, порог медленного запроса (мс), EXPLAIN для медленных SELECT,
+        EXPLAIN ANALYZE (повторное выполнение запроса), размер журнала
+        """
         try:
-            tables = [mapper.class_.__tablename__ for mapper in Base.registry.mappers]
+            current = QueryInstrumentation.configure(
+                enabled=enabled,
+                slow_threshold_ms=slow_threshold_ms,
+                explain=explain,
+                explain_analyze=explain_analyze,
+                max_records=max_records,
+            )
+        except ValueError as e:
+            return DatabaseResponse.error(ErrorCode.INVALID_PARAMETERS, str(e))
+        return DatabaseResponse.success(data=current, message="Настройки журнала запросов обновлены")
+
+    @classmethod
+    def _fetch_table_data(
+        cls,
+        table_name: str,
+        columns_list: Optional[List[str]] = None,
+        filters_dict: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Dict[str, str]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        join_config: Optional[List[Dict[str, Any]]] = None,
+        keyset: bool = False,
+        cursor: Optional[str] = None,
+        result_format: str = "rows",
+        windows: Optional[Dict[str, Dict[str, Any]]] = None,
+        top_n: Optional[Dict[str, Any]] = None,
+        total: Optional[str] = None
+    ) -> DatabaseResponse:
+        """Выполнение get_table_data в обход кэша результатов"""
+
+        if total not in (None, "exact", "estimated"):
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                f"Неизвестный режим подсчёта total: {total}"
+            )
+
+        if result_format not in ("rows", "columnar"):
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                f"Неизвестный формат результата: {result_format}"
+            )
+        if result_format == "columnar" and not columnar.is_available():
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "Для колоночного формата требуется пакет numpy"
+            )
+
+        if cursor is not None:
+            keyset = True
+
+        if keyset:
+            if windows or top_n:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    "Keyset-пагинация не совместима с оконными функциями и top_n"
+                )
+            if limit is None or limit <= 0:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    "Для keyset-пагинации требуется положительный limit"
+                )
+            if offset:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    "Keyset-пагинация не совместима с offset"
+                )
+
+        # Получаем основную модель
+        model_response = cls.get_model_by_tablename(table_name)
+        if model_response.status != ResponseStatus.SUCCESS:
+            return model_response
+
+        main_model = model_response.data
+
+        # Значения фильтров валидируются на каждый вызов, структура запроса берётся из кэша
+        params_response = cls._build_filter_params(filters_dict or {}, table_name)
+        if params_response.status != ResponseStatus.SUCCESS:
+            return params_response
+        params = params_response.data
+
+        if top_n:
+            if not isinstance(top_n.get("n"), int) or top_n["n"] <= 0:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    "top_n требует положительное целое 'n'"
+                )
+            params["top_n"] = top_n["n"]
+
+        statement_options = dict(
+            columns_list=columns_list,
+            filters_dict=filters_dict,
+            order_by=order_by,
+            join_config=join_config,
+            with_limit=limit is not None,
+            with_offset=offset is not None,
+            keyset=keyset,
+            with_cursor=cursor is not None,
+            windows=windows,
+            top_n=top_n,
+            with_total_column=total == "exact" and not keyset
+        )
+        statement_response = cls._statement_cache.get_or_build(
+            cls._table_data_statement_key(table_name, **statement_options),
+            lambda: cls._build_table_data_statement(table_name, main_model, **statement_options)
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            return statement_response
+        statement = statement_response.data
+
+        if keyset:
+            key_count = len(statement["key_columns"])
+            if cursor is not None:
+                try:
+                    last_values = decode_cursor(cursor, statement["signature"], key_count)
+                except InvalidCursorError as e:
+                    return DatabaseResponse.error(ErrorCode.INVALID_CURSOR, str(e))
+                for i, value in enumerate(last_values):
+                    params[f"keyset_{i}"] = value
+            # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+            params["row_limit"] = limit + 1
+        else:
+            if limit is not None:
+                params["row_limit"] = limit
+            if offset is not None:
+                params["row_offset"] = offset
+
+        def fetch(session: Session) -> DatabaseResponse:
+            # Выполняем запрос
+            rows = session.execute(statement["query"], params).fetchall()
+
+            meta = None
+            if keyset:
+                has_more = len(rows) > limit
+                rows = rows[:limit]
+                next_cursor = None
+                if has_more and rows:
+                    next_cursor = encode_cursor(statement["signature"], list(rows[-1][-key_count:]))
+                meta = {"next_cursor": next_cursor, "has_more": has_more}
+
+            if total is not None:
+                meta = meta or {}
+                if total == "exact" and not keyset and (rows or not offset):
+                    # count(*) OVER () идёт сразу после выходных колонок
+                    meta["total"] = rows[0][len(statement["output_columns"])] if rows else 0
+                elif total == "exact":
+                    meta["total"] = session.execute(
+                        select(func.count()).select_from(statement["count_query"].subquery()),
+                        params
+                    ).scalar_one()
+                else:
+                    meta["total"] = cls._estimate_row_count(
+                        session, statement["count_query"], params, table_name,
+                        plain_table=not (filters_dict or join_config or top_n)
+                    )
+                meta["total_is_estimate"] = total == "estimated"
+
+            if result_format == "columnar":
+                output_columns = statement["output_columns"]
+                sql_types = [
+                    column.type
+                    for column in statement["query"].selected_columns[:len(output_columns)]
+                ]
+                data = columnar.rows_to_columnar(rows, output_columns, sql_types)
+            else:
+                data = cls._rows_to_dicts(rows, statement["output_columns"])
+
             return DatabaseResponse.success(
-                data=tables,
-                message=f"Найдено {len(tables)} таблиц"
+                data=data,
+                message=f"Получено {len(rows)} записей",
+                meta=meta
             )
+
+        try:
+            return Database().run_read(fetch)
+
         except Exception as e:
+            logger.error(f"Ошибка в get_table_data: {str(e)}")
+            return DatabaseErrorHandler.handle_exception(e, f"get_table_data with extended filters for {table_name}")
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def export_table_data(
+        cls,
+        table_name: str,
+        destination: Union[str, Path, IO[bytes]],
+        columns_list: Optional[List[str]] = None,
+        filters_dict: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Dict[str, str]] = None,
+        join_config: Optional[List[Dict[str, Any]]] = None,
+        limit: Optional[int] = None,
+        export_format: str = "csv",
+        delimiter: str = ",",
+        header: Optional[bool] = None,
+        progress_callback: Optional[Callable[[Optional[int], int, Optional[int]], None]] = None,
+    ) -> DatabaseResponse:
+        """
+        Выгрузка результата запроса в файл через COPY (SELECT ...) TO STDOUT.
+        Принимает те же columns_list/filters_dict/order_by/join_config, что и get_table_data;
+        запрос строится тем же кодом и из того же кэша выражений, строки в Python не собираются.
+        export_format: "csv" или "binary" (формат COPY BINARY).
+        header — строка заголовка CSV (по умолчанию есть); для binary не поддерживается.
+        destination — путь к файлу или бинарный поток.
+        progress_callback(строк, байт, оценка общего числа строк) вызывается по ходу выгрузки;
+        строки считаются по переводам строки CSV, для binary вместо числа строк передаётся None.
+        После выгрузки — последний вызов с точным числом строк
+        """
+        if export_format not in ("csv", "binary"):
             return DatabaseResponse.error(
-                ErrorCode.OPERATION_FAILED,
-                f"Ошибка при получении списка таблиц: {str(e)}"
+                ErrorCode.INVALID_PARAMETERS,
+                f"Неизвестный формат выгрузки: {export_format}"
+            )
+        if export_format == "binary" and header:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "Заголовок (header) поддерживается только для формата csv"
+            )
+        header = export_format == "csv" and header is not False
+
+        model_response = cls.get_model_by_tablename(table_name)
+        if model_response.status != ResponseStatus.SUCCESS:
+            return model_response
+        main_model = model_response.data
+
+        params_response = cls._build_filter_params(filters_dict or {}, table_name)
+        if params_response.status != ResponseStatus.SUCCESS:
+            return params_response
+        params = params_response.data
+
+        statement_options = dict(
+            columns_list=columns_list,
+            filters_dict=filters_dict,
+            order_by=order_by,
+            join_config=join_config,
+            with_limit=limit is not None,
+            with_offset=False,
+            keyset=False,
+            with_cursor=False,
+            windows=None,
+            top_n=None,
+            with_total_column=False
+        )
+        statement_response = cls._statement_cache.get_or_build(
+            cls._table_data_statement_key(table_name, **statement_options),
+            lambda: cls._build_table_data_statement(table_name, main_model, **statement_options)
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            return statement_response
+        statement = statement_response.data
+        if limit is not None:
+            params["row_limit"] = limit
+
+        # Строка заголовка CSV не считается строкой данных
+        header_lines = 1 if header else 0
+        started = time.perf_counter()
+        owns_file = isinstance(destination, (str, Path))
+        stream = open(destination, "wb") if owns_file else destination
+
+        total_estimate = None
+        writer = pg_copy.ProgressWriter(
+            stream,
+            (lambda lines, bytes_written: progress_callback(
+                None if lines is None else max(lines - header_lines, 0), bytes_written, total_estimate
+            )) if progress_callback is not None else None,
+            count_lines=export_format == "csv"
+        )
+
+        def export(session: Session) -> int:
+            nonlocal total_estimate
+            if progress_callback is not None:
+                total_estimate = cls._estimate_row_count(
+                    session, statement["count_query"], params, table_name,
+                    plain_table=not (filters_dict or join_config)
+                )
+                if limit is not None:
+                    total_estimate = min(total_estimate, limit)
+
+            compiled = statement["query"].params(**params).compile(
+                dialect=session.get_bind().dialect,
+                compile_kwargs={"render_postcompile": True}
+            )
+
+            dbapi_connection = session.connection().connection.dbapi_connection
+            with dbapi_connection.cursor() as cursor:
+                query_sql = pg_copy.inline_params(cursor, str(compiled), compiled.params)
+                pg_copy.copy_query_to(cursor, query_sql, writer, export_format, delimiter, header)
+                return cursor.rowcount
+
+        try:
+            # Повтор в основной БД при отказе реплики — только пока в поток ничего не записано
+            rows_written = Database().run_read(export, can_retry=lambda: writer.bytes_written == 0)
+        except Exception as e:
+            if owns_file:
+                stream.close()
+                Path(destination).unlink(missing_ok=True)
+            logger.error(f"Ошибка при выгрузке таблицы '{table_name}': {str(e)}")
+            return DatabaseErrorHandler.handle_exception(e, f"export_table_data for {table_name}")
+        finally:
+            if owns_file and not stream.closed:
+                stream.close()
+
+        if progress_callback is not None:
+            progress_callback(rows_written, writer.bytes_written, total_estimate)
+
+        return DatabaseResponse.success(
+            data={
+                "rows": rows_written,
+                "bytes": writer.bytes_written,
+                "format": export_format,
+                "destination": str(destination) if owns_file else None
+            },
+            message=f"Выгружено {rows_written} записей из таблицы '{table_name}'",
+            affected_rows=rows_written,
+            meta={"duration_ms": round((time.perf_counter() - started) * 1000, 3)}
+        )
+
+    @classmethod
+    def iter_table_data(
+        cls,
+        table_name: str,
+        columns_list: Optional[List[str]] = None,
+        filters_dict: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Dict[str, str]] = None,
+        join_config: Optional[List[Dict[str, Any]]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[DatabaseResponse]:
+        """
+        Потоковое чтение таблицы через серверный курсор (stream_results + yield_per).
+        Принимает те же filters_dict/order_by/join_config, что и get_table_data, и отдаёт
+        DatabaseResponse на каждую пачку из batch_size строк, поэтому расход памяти
+        не зависит от размера таблицы. При ошибке отдаётся один ответ с ошибкой и итерация завершается.
+        """
+        if batch_size <= 0:
+            yield DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "batch_size должен быть положительным"
+            )
+            return
+
+        model_response = cls.get_model_by_tablename(table_name)
+        if model_response.status != ResponseStatus.SUCCESS:
+            yield model_response
+            return
+
+        main_model = model_response.data
+
+        params_response = cls._build_filter_params(filters_dict or {}, table_name)
+        if params_response.status != ResponseStatus.SUCCESS:
+            yield params_response
+            return
+
+        statement_response = cls._statement_cache.get_or_build(
+            cls._table_data_statement_key(table_name, columns_list, filters_dict, order_by, join_config),
+            lambda: cls._build_table_data_statement(
+                table_name, main_model, columns_list, filters_dict, order_by, join_config
+            )
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            yield statement_response
+            return
+        statement = statement_response.data
+
+        # Отказ реплики до первой пачки — повтор в основной БД (как Database.run_read)
+        use_replica = True
+        while True:
+            on_replica = False
+            batch_number = 0
+            try:
+                with Database().get_db_session(read_only=True, use_replica=use_replica) as session:
+                    on_replica = bool(session.info.get("replica"))
+                    result = session.execute(
+                        statement["query"],
+                        params_response.data,
+                        execution_options={"stream_results": True, "yield_per": batch_size}
+                    )
+
+                    for batch_number, rows in enumerate(result.partitions(), start=1):
+                        data = cls._rows_to_dicts(rows, statement["output_columns"])
+                        yield DatabaseResponse.success(
+                            data=data,
+                            message=f"Пачка {batch_number}: получено {len(data)} записей"
+                        )
+                return
+
+            except OperationalError as e:
+                if on_replica and batch_number == 0:
+                    logger.warning(f"Чтение с реплики прервано, повтор в основной БД: {e}")
+                    use_replica = False
+                    continue
+                logger.error(f"Ошибка в iter_table_data: {str(e)}")
+                yield DatabaseErrorHandler.handle_exception(e, f"iter_table_data for {table_name}")
+                return
+
+            except Exception as e:
+                logger.error(f"Ошибка в iter_table_data: {str(e)}")
+                yield DatabaseErrorHandler.handle_exception(e, f"iter_table_data for {table_name}")
+                return
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def aggregate_table_data(
+        cls,
+        table_name: str,
+        aggregates: Dict[str, str],
+        group_by: Optional[List[str]] = None,
+        filters_dict: Optional[Dict[str, Any]] = None,
+        having: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Dict[str, str]] = None,
+        limit: Optional[int] = None,
+        join_config: Optional[List[Dict[str, Any]]] = None
+    ) -> DatabaseResponse:
+        """
+        Агрегация на стороне Postgres (GROUP BY / HAVING): по сети возвращаются только агрегированные строки
+
+        aggregates: {"псевдоним": "колонка__функция"}, функции: sum, count, count_distinct, avg, min, max
+            {"revenue": "total_price__sum", "sales": "*__count", "last_sale": "sale_date__max"}
+            колонки JOIN-таблиц указываются как "table.column__sum"
+        group_by: ["product_id", "products.name"]
+        filters_dict: условия WHERE в формате get_table_data
+        having: условия по псевдонимам агрегатов в том же формате: {"revenue__gt": 1000}
+        order_by: колонки group_by или псевдонимы агрегатов: {"revenue": "desc"}
+
+        Пример — выручка по продуктам:
+            aggregate_table_data("sales", {"revenue": "total_price__sum"}, group_by=["product_id"])
+        """
+        if not aggregates:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "Не указано ни одного агрегата"
+            )
+
+        model_response = cls.get_model_by_tablename(table_name)
+        if model_response.status != ResponseStatus.SUCCESS:
+            return model_response
+        main_model = model_response.data
+
+        params_response = cls._build_filter_params(filters_dict or {}, table_name)
+        if params_response.status != ResponseStatus.SUCCESS:
+            return params_response
+        params = params_response.data
+
+        # Значения HAVING: типы колонок у агрегатов не проверяются, только форма значения
+        try:
+            for index, (having_key, having_value) in enumerate(sorted((having or {}).items())):
+                parts = having_key.split('__')
+                operator = 'eq' if len(parts) == 1 else parts[1]
+                params.update(cls._bind_values_for_operator(
+                    operator, cls._compile_filter_coercer(operator)(having_value), f"having_{index}"
+                ))
+        except FilterValueError as e:
+            return DatabaseResponse.error(ErrorCode.INVALID_FILTER, str(e))
+
+        if limit is not None:
+            params["row_limit"] = limit
+
+        statement_key = (
+            "aggregate_table_data",
+            table_name,
+            tuple(sorted(aggregates.items())),
+            tuple(group_by or ()),
+            cls._filter_shape(filters_dict),
+            cls._filter_shape(having),
+            tuple((order_by or {}).items()),
+            json.dumps(join_config, default=str) if join_config else None,
+            limit is not None,
+        )
+        statement_response = cls._statement_cache.get_or_build(
+            statement_key,
+            lambda: cls._build_aggregate_statement(
+                table_name, main_model, aggregates, group_by, filters_dict,
+                having, order_by, limit is not None, join_config
+            )
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            return statement_response
+        statement = statement_response.data
+
+        def aggregate(session: Session) -> DatabaseResponse:
+            rows = session.execute(statement["query"], params).fetchall()
+            data = cls._rows_to_dicts(rows, statement["output_columns"])
+
+            return DatabaseResponse.success(
+                data=data,
+                message=f"Получено {len(data)} агрегированных записей"
+            )
+
+        try:
+            return Database().run_read(aggregate)
+
+        except Exception as e:
+            logger.error(f"Ошибка в aggregate_table_data: {str(e)}")
+            return DatabaseErrorHandler.handle_exception(e, f"aggregate_table_data for {table_name}")
+
+    @classmethod
+    def _build_aggregate_statement(
+        cls,
+        table_name: str,
+        main_model: Any,
+        aggregates: Dict[str, str],
+        group_by: Optional[List[str]] = None,
+        filters_dict: Optional[Dict[str, Any]] = None,
+        having: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Dict[str, str]] = None,
+        with_limit: bool = False,
+        join_config: Optional[List[Dict[str, Any]]] = None
+    ) -> DatabaseResponse:
+        """Построение SELECT ... GROUP BY ... HAVING на основе _build_select_query"""
+        # JOIN и WHERE строятся общим механизмом, список колонок затем заменяется
+        query_response = cls._build_select_query(
+            table_name, main_model, group_by, filters_dict, None, join_config
+        )
+        if query_response.status != ResponseStatus.SUCCESS:
+            return query_response
+
+        query = query_response.data["query"]
+        joined_models = query_response.data["joined_models"]
+
+        group_columns = []
+        if group_by:
+            if len(query_response.data["output_columns"]) != len(group_by):
+                return DatabaseResponse.error(
+                    ErrorCode.COLUMN_NOT_FOUND,
+                    "Не все колонки группировки найдены"
+                )
+            group_columns = list(query.selected_columns)
+
+        aggregate_columns = {}
+        for alias, spec in aggregates.items():
+            column_spec, _, func_name = spec.rpartition('__')
+            if func_name not in cls._AGGREGATE_FUNCTIONS or not column_spec:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    f"Неверный агрегат '{alias}': {spec}. "
+                    f"Ожидается 'колонка__функция', функции: {', '.join(cls._AGGREGATE_FUNCTIONS)}"
+                )
+
+            if column_spec == '*':
+                if func_name != 'count':
+                    return DatabaseResponse.error(
+                        ErrorCode.INVALID_PARAMETERS,
+                        f"'*' допустим только с count (агрегат '{alias}')"
+                    )
+                aggregate_columns[alias] = func.count().label(alias)
+                continue
+
+            if '.' in column_spec:
+                table_part, column_part = column_spec.split('.', 1)
+            else:
+                table_part, column_part = table_name, column_spec
+            table_model = joined_models.get(table_part)
+            if table_model is None or not hasattr(table_model, column_part):
+                return DatabaseResponse.error(
+                    ErrorCode.COLUMN_NOT_FOUND,
+                    f"Колонка '{column_spec}' для агрегата '{alias}' не найдена"
+                )
+
+            aggregate_columns[alias] = cls._AGGREGATE_FUNCTIONS[func_name](
+                getattr(table_model, column_part)
+            ).label(alias)
+
+        query = query.with_only_columns(
+            *group_columns, *aggregate_columns.values(), maintain_column_froms=True
+        )
+        if group_columns:
+            query = query.group_by(*group_columns)
+
+        # HAVING по псевдонимам агрегатов
+        for index, (having_key, having_value) in enumerate(sorted((having or {}).items())):
+            parts = having_key.split('__')
+            alias = parts[0]
+            operator = 'eq' if len(parts) == 1 else parts[1]
+            if alias not in aggregate_columns:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_FILTER,
+                    f"HAVING ссылается на неизвестный агрегат '{alias}'"
+                )
+            condition = cls._build_condition_for_operator(
+                aggregate_columns[alias].element, operator, having_value, f"having_{index}"
+            )
+            if condition is None:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_FILTER,
+                    f"Неподдерживаемый оператор: {operator}"
+                )
+            query = query.having(condition)
+
+        # Сортировка по колонкам группировки или псевдонимам агрегатов
+        order_targets = dict(zip(group_by or [], group_columns))
+        order_targets.update(aggregate_columns)
+        for order_col, order_dir in (order_by or {}).items():
+            if order_col not in order_targets:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_ORDER_BY,
+                    f"Сортировка возможна только по колонкам группировки или агрегатам: '{order_col}'"
+                )
+            target = order_targets[order_col]
+            query = query.order_by(desc(target) if order_dir.lower() == "desc" else asc(target))
+
+        if with_limit:
+            query = query.limit(bindparam("row_limit"))
+
+        return DatabaseResponse.success(data={
+            "query": query,
+            "output_columns": list(group_by or []) + list(aggregate_columns)
+        })
+
+    @classmethod
+    def _rows_to_dicts(cls, rows: Sequence[Any], output_columns: List[str]) -> List[Dict[str, Any]]:
+        """
+        Преобразование строк Core-результата в словари по именам output_columns.
+        Служебные колонки в конце строки (например, ключ keyset) отбрасываются zip-ом.
+        """
+        data = []
+        for row in rows:
+            row_dict = {}
+            for col_name, value in zip(output_columns, row):
+                # Обработка различных типов данных
+                if isinstance(value, (datetime, date)):
+                    value = value.isoformat()
+                row_dict[col_name] = value
+            data.append(row_dict)
+        return data
+
+    @classmethod
+    def get_statement_cache_stats(cls) -> DatabaseResponse:
+        """Счётчики попаданий/промахов кэша построенных запросов"""
+        return DatabaseResponse.success(
+            data=cls._statement_cache.stats(),
+            message="Статистика кэша запросов"
+        )
+
+    @classmethod
+    def _table_data_statement_key(
+        cls,
+        table_name: str,
+        columns_list: Optional[List[str]] = None,
+        filters_dict: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Dict[str, str]] = None,
+        join_config: Optional[List[Dict[str, Any]]] = None,
+        with_limit: bool = False,
+        with_offset: bool = False,
+        keyset: bool = False,
+        with_cursor: bool = False,
+        windows: Optional[Dict[str, Dict[str, Any]]] = None,
+        top_n: Optional[Dict[str, Any]] = None,
+        with_total_column: bool = False
+    ) -> Tuple:
+        """Ключ формы запроса get_table_data: всё, что влияет на структуру SQL, но не значения"""
+        # n из top_n передаётся параметром и в ключ не входит
+        top_n_shape = {key: value for key, value in top_n.items() if key != "n"} if top_n else None
+        return (
+            "table_data",
+            table_name,
+            tuple(columns_list or ()),
+            cls._filter_shape(filters_dict),
+            tuple((order_by or {}).items()),
+            json.dumps(join_config, default=str) if join_config else None,
+            with_limit,
+            with_offset,
+            keyset,
+            with_cursor,
+            json.dumps(windows, default=str) if windows else None,
+            json.dumps(top_n_shape, default=str) if top_n_shape else None,
+            with_total_column,
+        )
+
+    @classmethod
+    def _build_table_data_statement(
+        cls,
+        table_name: str,
+        main_model: Any,
+        columns_list: Optional[List[str]] = None,
+        filters_dict: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Dict[str, str]] = None,
+        join_config: Optional[List[Dict[str, Any]]] = None,
+        with_limit: bool = False,
+        with_offset: bool = False,
+        keyset: bool = False,
+        with_cursor: bool = False,
+        windows: Optional[Dict[str, Dict[str, Any]]] = None,
+        top_n: Optional[Dict[str, Any]] = None,
+        with_total_column: bool = False
+    ) -> DatabaseResponse:
+        """
+        Построение параметризованного SELECT для кэша: limit, offset, значения курсора и n из top_n
+        подставляются через bindparam ("row_limit", "row_offset", "keyset_N", "top_n") при выполнении
+        """
+        query_response = cls._build_select_query(
+            table_name, main_model, columns_list, filters_dict, order_by, join_config
+        )
+        if query_response.status != ResponseStatus.SUCCESS:
+            return query_response
+
+        query = query_response.data["query"]
+        joined_models = query_response.data["joined_models"]
+        output_columns = list(query_response.data["output_columns"])
+        key_columns = None
+        signature = None
+
+        # Оконные функции добавляются колонками после основных
+        for alias, spec in (windows or {}).items():
+            window_response = cls._build_window_column(spec, joined_models, table_name)
+            if window_response.status != ResponseStatus.SUCCESS:
+                return window_response
+            query = query.add_columns(window_response.data.label(alias))
+            output_columns.append(alias)
+
+        if top_n:
+            top_n_response = cls._apply_top_n(
+                query, top_n, joined_models, table_name, query_response.data["order_columns"]
             )
+            if top_n_response.status != ResponseStatus.SUCCESS:
+                return top_n_response
+            query = top_n_response.data
 
-    @classmethod
-    @DatabaseErrorHandler()
-    def get_table_columns(cls, table_name: str, use_cache: bool = True) -> DatabaseResponse:
-        """Получение полной информации о колонках таблицы, включая типы, внешние ключи, enum-значения и ограничения."""
-      
-        # Проверяем кэш
-        if use_cache and cls._cache_enabled and table_name in cls._columns_cache:
-            return DatabaseResponse.success(
-                data=cls._columns_cache[table_name],
-                message=f"Найдено {len(cls._columns_cache[table_name])} колонок в таблице '{table_name}' (из кэша)"
-            )
-      
-        model_response = cls.get_model_by_tablename(table_name)
-        if model_response.status != ResponseStatus.SUCCESS:
-            return model_response
+        # Запрос без курсора, лимита и смещения — основа для подсчёта total
+        count_query = query.order_by(None)
 
-        model = model_response.data
-        columns_info: Dict[str, Dict[str, Any]] = {}
+        if with_total_column:
+            query = query.add_columns(func.count().over().label("_total_count"))
 
-        try:
-            # Собираем check constraints на уровне таблицы
-            table_check_constraints: Dict[str, List[str]] = {}
-            for constraint in model.__table__.constraints:
-                if isinstance(constraint, CheckConstraint):
-                    sql_text = str(constraint.sqltext) if isinstance(constraint.sqltext, TextClause) else str(constraint.sqltext.compile())
-                    for col in model.__table__.columns:
-                        if col.name in sql_text:
-                            table_check_constraints.setdefault(col.name, []).append(sql_text)
-
-            for column in model.__table__.columns:
-                col_info = {
-                    'name': column.name,
-                    'type': str(column.type),
-                    'nullable': column.nullable,
-                    'primary_key': column.primary_key,
-                    'default': None,
-                    'foreign_keys': [],
-                    'check_constraints': table_check_constraints.get(column.name, []),
-                    'enum_values': None
-                }
+        if keyset:
+            key_columns = cls._get_keyset_columns(main_model, query_response.data["order_columns"])
+            signature = cursor_signature(
+                table_name,
+                [f"{col.table.name}.{col.key}:{direction}" for col, direction in key_columns]
+            )
 
-                # Обработка default
-                if column.default is not None:
-                    if hasattr(column.default, 'arg'):
-                        col_info['default'] = str(column.default.arg)
-                    else:
-                        col_info['default'] = str(column.default)
+            if with_cursor:
+                query = query.where(cls._build_keyset_condition(key_columns))
+
+            # Сортировка по полному ключу и служебные колонки для следующего курсора
+            query = query.order_by(None).order_by(*[
+                desc(col) if direction == "desc" else asc(col)
+                for col, direction in key_columns
+            ])
+            query = query.add_columns(*[
+                col.label(f"_keyset_{i}") for i, (col, _) in enumerate(key_columns)
+            ])
+
+        # Применяем лимит и смещение
+        if with_limit or keyset:
+            query = query.limit(bindparam("row_limit"))
+        if with_offset and not keyset:
+            query = query.offset(bindparam("row_offset"))
+
+        return DatabaseResponse.success(data={
+            "query": query,
+            "output_columns": output_columns,
+            "key_columns": key_columns,
+            "signature": signature,
+            "count_query": count_query
+        })
 
-                # Обработка foreign keys
-                for fk in column.foreign_keys:
-                    col_info['foreign_keys'].append({
-                        'target_table': fk.column.table.name,
-                        'target_column': fk.column.name
-                    })
+    @classmethod
+    def _estimate_row_count(
+        cls,
+        session: Any,
+        query: Any,
+        params: Dict[str, Any],
+        table_name: str,
+        plain_table: bool = False
+    ) -> int:
+        """
+        Оценка числа строк без полного подсчёта: pg_class.reltuples для таблицы целиком,
+        иначе число строк из плана EXPLAIN (FORMAT JSON)
+        """
+        if plain_table:
+            reltuples = session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+                {"table_name": table_name}
+            ).scalar()
+            # -1 — таблица ещё ни разу не анализировалась
+            if reltuples is not None and reltuples >= 0:
+                return int(reltuples)
+
+        bound_query = query.params(**params)
+        compiled = bound_query.compile(
+            dialect=session.get_bind().dialect,
+            compile_kwargs={"render_postcompile": True}
+        )
+        connection = session.connection()
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @classmethod
+    def _resolve_column(cls, column_spec: str, joined_models: Dict[str, Any], main_table: str):
+        """Колонка по спецификации "column" или "table.column" среди участвующих в запросе моделей"""
+        if '.' in column_spec:
+            table_part, column_part = column_spec.split('.', 1)
+        else:
+            table_part, column_part = main_table, column_spec
+        table_model = joined_models.get(table_part)
+        if table_model is None or not hasattr(table_model, column_part):
+            return None
+        return getattr(table_model, column_part)
 
-                # Обработка Enum (расширенная версия из первого кода)
-                if isinstance(column.type, SQLEnum):
-                    if hasattr(column.type, 'enums') and column.type.enums:
-                        col_info['enum_values'] = list(column.type.enums)
-                    elif hasattr(column.type, 'native_enum') and not column.type.native_enum:
-                        # Если используется строковый enum без native поддержки
-                        col_info['enum_values'] = [e for e in column.type.enums] if column.type.enums else None
+    @classmethod
+    def _build_window_over(
+        cls,
+        spec: Dict[str, Any],
+        joined_models: Dict[str, Any],
+        main_table: str
+    ) -> DatabaseResponse:
+        """Аргументы OVER (...): partition_by, order_by и рамка rows"""
+        partition_by = []
+        for column_spec in spec.get("partition_by") or []:
+            column = cls._resolve_column(column_spec, joined_models, main_table)
+            if column is None:
+                return DatabaseResponse.error(
+                    ErrorCode.COLUMN_NOT_FOUND,
+                    f"Колонка PARTITION BY '{column_spec}' не найдена"
+                )
+            partition_by.append(column)
 
-                columns_info[column.name] = col_info
+        order_by = []
+        for column_spec, direction in (spec.get("order_by") or {}).items():
+            column = cls._resolve_column(column_spec, joined_models, main_table)
+            if column is None:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_ORDER_BY,
+                    f"Колонка ORDER BY окна '{column_spec}' не найдена"
+                )
+            order_by.append(desc(column) if direction.lower() == "desc" else asc(column))
 
-            # Сохраняем в кэш
-            if cls._cache_enabled:
-                cls._columns_cache[table_name] = columns_info
+        over_kwargs: Dict[str, Any] = {}
+        if partition_by:
+            over_kwargs["partition_by"] = partition_by
+        if order_by:
+            over_kwargs["order_by"] = order_by
+        if spec.get("rows") is not None:
+            over_kwargs["rows"] = tuple(spec["rows"])
+        return DatabaseResponse.success(data=over_kwargs)
 
-            return DatabaseResponse.success(
-                data=columns_info,
-                message=f"Найдено {len(columns_info)} колонок в таблице '{table_name}'"
+    @classmethod
+    def _build_window_column(
+        cls,
+        spec: Dict[str, Any],
+        joined_models: Dict[str, Any],
+        main_table: str
+    ) -> DatabaseResponse:
+        """Выражение func(...) OVER (...) по описанию из windows"""
+        func_name = spec.get("func")
+        if func_name not in cls._WINDOW_FUNCTIONS:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                f"Неподдерживаемая оконная функция: {func_name}. "
+                f"Допустимо: {', '.join(cls._WINDOW_FUNCTIONS)}"
             )
 
-        except Exception as e:
+        over_response = cls._build_window_over(spec, joined_models, main_table)
+        if over_response.status != ResponseStatus.SUCCESS:
+            return over_response
+
+        if func_name in ('row_number', 'rank', 'dense_rank'):
+            function = cls._WINDOW_FUNCTIONS[func_name]()
+        else:
+            column_spec = spec.get("column")
+            column = cls._resolve_column(column_spec, joined_models, main_table) if column_spec else None
+            if column is None:
+                return DatabaseResponse.error(
+                    ErrorCode.COLUMN_NOT_FOUND,
+                    f"Колонка '{column_spec}' для оконной функции {func_name} не найдена"
+                )
+            if func_name in ('lag', 'lead'):
+                function = cls._WINDOW_FUNCTIONS[func_name](column, int(spec.get("offset", 1)))
+            else:
+                function = cls._WINDOW_FUNCTIONS[func_name](column)
+
+        return DatabaseResponse.success(data=function.over(**over_response.data))
+
+    @classmethod
+    def _apply_top_n(
+        cls,
+        query: Any,
+        top_n: Dict[str, Any],
+        joined_models: Dict[str, Any],
+        main_table: str,
+        order_columns: List[Any]
+    ) -> DatabaseResponse:
+        """
+        Первые n строк в каждой группе: запрос оборачивается в подзапрос с row_number()/rank()
+        и отбирается по номеру <= :top_n. Внешняя сортировка повторяет order_by запроса,
+        затем место в группе
+        """
+        if not top_n.get("partition_by") or not top_n.get("order_by"):
             return DatabaseResponse.error(
-                ErrorCode.OPERATION_FAILED,
-                f"Ошибка при получении колонок таблицы '{table_name}': {str(e)}"
+                ErrorCode.INVALID_PARAMETERS,
+                "top_n требует partition_by и order_by"
             )
 
+        over_response = cls._build_window_over(top_n, joined_models, main_table)
+        if over_response.status != ResponseStatus.SUCCESS:
+            return over_response
+
+        # Колонки сортировки, которых нет в списке выбранных, добавляются во внутренний
+        # запрос скрытыми колонками _top_n_order_N и не попадают в результат
+        output_count = len(query.selected_columns)
+        hidden_columns = {}
+        for index, (column, _) in enumerate(order_columns):
+            if query.selected_columns.corresponding_column(column.expression) is None:
+                hidden_columns[index] = column.expression.label(f"_top_n_order_{index}")
+
+        rank_function = func.rank() if top_n.get("ties") else func.row_number()
+        inner = query.add_columns(
+            *hidden_columns.values(),
+            rank_function.over(**over_response.data).label("_top_n_rank")
+        ).order_by(None)
+        subquery = inner.subquery("top_n")
+
+        # Выбранные колонки в исходном порядке, без скрытых и служебного номера
+        outer_columns = list(subquery.c)[:output_count]
+        outer = select(*outer_columns).where(subquery.c._top_n_rank <= bindparam("top_n"))
+
+        outer_order = []
+        for index, (column, direction) in enumerate(order_columns):
+            if index in hidden_columns:
+                proxy = subquery.c[f"_top_n_order_{index}"]
+            else:
+                proxy = subquery.corresponding_column(column.expression)
+            outer_order.append(desc(proxy) if direction == "desc" else asc(proxy))
+        # Внутри группы — по месту в рейтинге
+        outer_order.append(asc(subquery.c._top_n_rank))
+        return DatabaseResponse.success(data=outer.order_by(*outer_order))
+
     @classmethod
-    @DatabaseErrorHandler()
-    def get_table_data(
+    def _build_select_query(
         cls,
         table_name: str,
+        main_model: Any,
         columns_list: Optional[List[str]] = None,
         filters_dict: Optional[Dict[str, Any]] = None,
         order_by: Optional[Dict[str, str]] = None,
-        limit: Optional[int] = None,
-        offset: Optional[int] = None,
         join_config: Optional[List[Dict[str, Any]]] = None
     ) -> DatabaseResponse:
         """
-        Получение данных из таблицы с расширенными фильтрами
-      
-        Новый формат filters_dict:
-        {
-            "column_name": value,                    # простое равенство
-            "column_name__gt": value,               # больше чем
-            "column_name__lt": value,               # меньше чем
-            "column_name__gte": value,              # больше или равно
-            "column_name__lte": value,              # меньше или равно
-            "column_name__like": value,             # LIKE '%value%'
-            "column_name__ilike": value,            # ILIKE '%value%' (регистронезависимо)
-            "column_name__in": [value1, value2],    # IN списка
-            "column_name__between": [min, max],     # BETWEEN
-            "column_name__is_null": True/False,     # IS NULL / IS NOT NULL
-            "column_name__neq": value,              # не равно
-        }
+        Построение SELECT с колонками, JOIN, фильтрами и сортировкой (без limit/offset).
+        Возвращает {"query", "joined_models", "output_columns": имена ключей результата,
+        "order_columns": [(колонка, "asc"|"desc"), ...]}
         """
-
-        # Получаем основную модель
-        model_response = cls.get_model_by_tablename(table_name)
-        if model_response.status != ResponseStatus.SUCCESS:
-            return model_response
-
-        main_model = model_response.data
-
-        try:
-            with Database().get_db_session() as session:
-                # Базовый запрос
-                joined_models = {table_name: main_model}
-              
-                if columns_list:
-                    # Используем колонки моделей вместо text()
-                    select_columns = []
-                  
-                    for col_spec in columns_list:
-                        if '.' in col_spec:
-                            table_part, column_part = col_spec.split('.', 1)
-                            if table_part in joined_models:
-                                model_obj = joined_models[table_part]
-                                if hasattr(model_obj, column_part):
-                                    select_columns.append(getattr(model_obj, column_part).label(col_spec))
-                        else:
-                            if hasattr(main_model, col_spec):
-                                select_columns.append(getattr(main_model, col_spec))
-                  
-                    if not select_columns:
-                        return DatabaseResponse.error(
-                            ErrorCode.COLUMN_NOT_FOUND,
-                            "Ни одна из указанных колонок не найдена"
-                        )
-                  
-                    query = select(*select_columns)
+        joined_models = {table_name: main_model}
+
+        # Заранее получаем модели JOIN, чтобы колонки вида "table.column" были доступны
+        join_models = []
+        for join_item in join_config or []:
+            join_model_response = cls.get_model_by_tablename(join_item["table"])
+            if join_model_response.status != ResponseStatus.SUCCESS:
+                return join_model_response
+            joined_models[join_item["table"]] = join_model_response.data
+            join_models.append((join_item, join_model_response.data))
+
+        # Базовый запрос
+        if columns_list:
+            # Используем колонки моделей вместо text()
+            select_columns = []
+            output_columns = []
+          
+            for col_spec in columns_list:
+                if '.' in col_spec:
+                    table_part, column_part = col_spec.split('.', 1)
+                    if table_part in joined_models:
+                        model_obj = joined_models[table_part]
+                        if hasattr(model_obj, column_part):
+                            select_columns.append(getattr(model_obj, column_part).label(col_spec))
+                            output_columns.append(col_spec)
                 else:
-                    query = select(main_model)
-
-                # Применяем JOIN
-                if join_config:
-                    for join_item in join_config:
-                        join_table_name = join_item["table"]
-                        join_type = join_item.get("type", "inner").lower()
-                        join_on = join_item["on"]
-                      
-                        join_model_response = cls.get_model_by_tablename(join_table_name)
-                        if join_model_response.status != ResponseStatus.SUCCESS:
-                            return join_model_response
-                      
-                        join_model = join_model_response.data
-                        joined_models[join_table_name] = join_model
-                      
-                        # Построение условия JOIN
-                        if isinstance(join_on, dict) and "condition" in join_on:
-                            logger.warning(f"Используется raw SQL условие для JOIN: {join_on['condition']}")
-                            join_condition = text(join_on["condition"])
-                        else:
-                            join_conditions = []
-                            for main_col, join_col in join_on.items():
-                                if '.' not in main_col:
-                                    main_col = f"{table_name}.{main_col}"
-                                if '.' not in join_col:
-                                    join_col = f"{join_table_name}.{join_col}"
-                              
-                                main_table, main_col_name = main_col.split('.')
-                                join_table, join_col_name = join_col.split('.')
-                              
-                                if main_table in joined_models and join_table in joined_models:
-                                    main_col_obj = getattr(joined_models[main_table], main_col_name)
-                                    join_col_obj = getattr(joined_models[join_table], join_col_name)
-                                    join_conditions.append(main_col_obj == join_col_obj)
-                          
-                            if not join_conditions:
-                                return DatabaseResponse.error(
-                                    ErrorCode.INVALID_JOIN_CONDITION,
-                                    "Неверное условие JOIN"
-                                )
-                          
-                            join_condition = and_(*join_conditions)
-                      
-                        # Применяем JOIN
-                        if join_type == "left":
-                            query = query.join(join_model, join_condition, isouter=True)
-                        elif join_type == "right":
-                            # RIGHT JOIN реализуется через изменение порядка таблиц
-                            logger.warning("RIGHT JOIN конвертирован в LEFT JOIN с изменением порядка таблиц")
-                            query = query.join(join_model, join_condition, isouter=True)
-                        elif join_type == "full":
-                            query = query.outerjoin(join_model, join_condition, full=True)
-                        else:  # inner
-                            query = query.join(join_model, join_condition)
-
-                # Применяем расширенные фильтры
-                if filters_dict:
-                    filter_conditions = cls._build_filter_conditions(
-                        filters_dict, joined_models, table_name
-                    )
-                  
-                    if filter_conditions.status != ResponseStatus.SUCCESS:
-                        return filter_conditions
-                  
-                    if filter_conditions.data:
-                        query = query.where(and_(*filter_conditions.data))
-
-                # Применяем сортировку
-                if order_by:
-                    order_conditions = []
+                    if hasattr(main_model, col_spec):
+                        select_columns.append(getattr(main_model, col_spec))
+                        output_columns.append(col_spec)
+          
+            if not select_columns:
+                return DatabaseResponse.error(
+                    ErrorCode.COLUMN_NOT_FOUND,
+                    "Ни одна из указанных колонок не найдена"
+                )
+          
+            query = select(*select_columns)
+        else:
+            # Core-select по __table__: строки идут сразу в словари,
+            # без создания ORM-объектов и их регистрации в identity map сессии
+            table_columns = list(main_model.__table__.columns)
+            output_columns = [column.key for column in table_columns]
+            query = select(*table_columns)
+
+        # Явно фиксируем основную таблицу как левую сторону JOIN,
+        # даже если выбраны только колонки присоединяемых таблиц
+        query = query.select_from(main_model)
+
+        # Применяем JOIN
+        for join_item, join_model in join_models:
+            join_table_name = join_item["table"]
+            join_type = join_item.get("type", "inner").lower()
+            join_on = join_item["on"]
+
+            # Построение условия JOIN
+            if isinstance(join_on, dict) and "condition" in join_on:
+                logger.warning(f"Используется raw SQL условие для JOIN: {join_on['condition']}")
+                join_condition = text(join_on["condition"])
+            else:
+                join_conditions = []
+                for main_col, join_col in join_on.items():
+                    if '.' not in main_col:
+                        main_col = f"{table_name}.{main_col}"
+                    if '.' not in join_col:
+                        join_col = f"{join_table_name}.{join_col}"
                   
-                    for order_col, order_dir in order_by.items():
-                        col_obj = None
-                      
-                        if '.' in order_col:
-                            table_part, column_part = order_col.split('.', 1)
-                            if table_part in joined_models:
-                                table_model = joined_models[table_part]
-                                if hasattr(table_model, column_part):
-                                    col_obj = getattr(table_model, column_part)
-                        else:
-                            if hasattr(main_model, order_col):
-                                col_obj = getattr(main_model, order_col)
-                      
-                        if col_obj is not None:
-                            if order_dir.lower() == "desc":
-                                order_conditions.append(desc(col_obj))
-                            else:
-                                order_conditions.append(asc(col_obj))
+                    main_table, main_col_name = main_col.split('.')
+                    join_table, join_col_name = join_col.split('.')
                   
-                    if order_conditions:
-                        query = query.order_by(*order_conditions)
-
-                # Применяем лимит и смещение
-                if limit is not None:
-                    query = query.limit(limit)
-                if offset is not None:
-                    query = query.offset(offset)
-
-                # Выполняем запрос
-                result = session.execute(query)
+                    if main_table in joined_models and join_table in joined_models:
+                        main_col_obj = getattr(joined_models[main_table], main_col_name)
+                        join_col_obj = getattr(joined_models[join_table], join_col_name)
+                        join_conditions.append(main_col_obj == join_col_obj)
+              
+                if not join_conditions:
+                    return DatabaseResponse.error(
+                        ErrorCode.INVALID_JOIN_CONDITION,
+                        "Неверное условие JOIN"
+                    )
+              
+                join_condition = and_(*join_conditions)
+          
+            # Применяем JOIN
+            if join_type == "left":
+                query = query.join(join_model, join_condition, isouter=True)
+            elif join_type == "right":
+                # RIGHT JOIN реализуется через изменение порядка таблиц
+                logger.warning("RIGHT JOIN конвертирован в LEFT JOIN с изменением порядка таблиц")
+                query = query.join(join_model, join_condition, isouter=True)
+            elif join_type == "full":
+                query = query.outerjoin(join_model, join_condition, full=True)
+            else:  # inner
+                query = query.join(join_model, join_condition)
+
+        # Применяем расширенные фильтры
+        if filters_dict:
+            filter_conditions = cls._build_filter_conditions(
+                filters_dict, joined_models, table_name
+            )
+          
+            if filter_conditions.status != ResponseStatus.SUCCESS:
+                return filter_conditions
+          
+            if filter_conditions.data:
+                query = query.where(and_(*filter_conditions.data))
+
+        # Применяем сортировку
+        order_columns = []
+        if order_by:
+            for order_col, order_dir in order_by.items():
+                col_obj = None
               
-                if columns_list:
-                    rows = result.fetchall()
-                    data = []
-                    for row in rows:
-                        row_dict = {}
-                        for i, col_name in enumerate(columns_list):
-                            # Обработка различных типов данных
-                            value = row[i]
-                            if isinstance(value, (datetime, date)):
-                                value = value.isoformat()
-                            row_dict[col_name] = value
-                        data.append(row_dict)
+                if '.' in order_col:
+                    table_part, column_part = order_col.split('.', 1)
+                    if table_part in joined_models:
+                        table_model = joined_models[table_part]
+                        if hasattr(table_model, column_part):
+                            col_obj = getattr(table_model, column_part)
                 else:
-                    data = []
-                    for obj in result.scalars().all():
-                        obj_dict = {}
-                        for column in obj.__table__.columns:
-                            value = getattr(obj, column.key)
-                            # Обработка различных типов данных
-                            if isinstance(value, (datetime, date)):
-                                value = value.isoformat()
-                            obj_dict[column.key] = value
-                        data.append(obj_dict)
+                    if hasattr(main_model, order_col):
+                        col_obj = getattr(main_model, order_col)
+              
+                if col_obj is not None:
+                    direction = "desc" if order_dir.lower() == "desc" else "asc"
+                    order_columns.append((col_obj, direction))
+          
+            if order_columns:
+                query = query.order_by(*[
+                    desc(col) if direction == "desc" else asc(col)
+                    for col, direction in order_columns
+                ])
+
+        return DatabaseResponse.success(data={
+            "query": query,
+            "joined_models": joined_models,
+            "output_columns": output_columns,
+            "order_columns": order_columns
+        })
 
-                return DatabaseResponse.success(
-                    data=data,
-                    message=f"Получено {len(data)} записей"
-                )
+    @classmethod
+    def _get_keyset_columns(cls, main_model: Any, order_columns: List[Any]) -> List[Any]:
+        """Ключ keyset-пагинации: колонки order_by + первичный ключ основной таблицы"""
+        key_columns = list(order_columns)
+        used = {(col.table.name, col.key) for col, _ in key_columns}
+        # Первичный ключ идёт в направлении последней сортировки, чтобы работал ROW()-компаратор
+        pk_direction = key_columns[-1][1] if key_columns else "asc"
+
+        for pk_column in main_model.__table__.primary_key.columns:
+            if (pk_column.table.name, pk_column.key) not in used:
+                key_columns.append((getattr(main_model, pk_column.key), pk_direction))
+        return key_columns
 
-        except Exception as e:
-            logger.error(f"Ошибка в get_table_data: {str(e)}")
-            return DatabaseErrorHandler.handle_exception(e, f"get_table_data with extended filters for {table_name}")
+    @classmethod
+    def _build_keyset_condition(cls, key_columns: List[Any]):
+        """
+        Условие "строка после курсора" с учётом направлений сортировки.
+        Значения ключа последней строки передаются параметрами keyset_0..keyset_N
+        """
+        directions = {direction for _, direction in key_columns}
+        last_values = [
+            bindparam(f"keyset_{i}", type_=col.type) for i, (col, _) in enumerate(key_columns)
+        ]
+
+        # Одинаковое направление: (a, b, pk) > (:a, :b, :pk) — использует составной индекс
+        if len(directions) == 1:
+            columns = tuple_(*[col for col, _ in key_columns])
+            values = tuple_(*last_values)
+            return columns < values if directions == {"desc"} else columns > values
+
+        # Смешанные направления: (a > :a) OR (a = :a AND b < :b) OR ...
+        alternatives = []
+        for i, (col, direction) in enumerate(key_columns):
+            prefix = [key_columns[j][0] == last_values[j] for j in range(i)]
+            step = col < last_values[i] if direction == "desc" else col > last_values[i]
+            alternatives.append(and_(*prefix, step))
+        return or_(*alternatives)
+
+    @classmethod
+    def _filter_shape(cls, filters_dict: Optional[Dict[str, Any]]) -> Tuple:
+        """
+        Форма набора фильтров для ключа кэша: ключи фильтров плюс те свойства значений,
+        от которых зависит структура SQL (None для eq/neq, пустой список для in, флаг is_null)
+        """
+        if not filters_dict:
+            return ()
+
+        shape = []
+        for filter_key, filter_value in sorted(filters_dict.items()):
+            parts = filter_key.split('__')
+            operator = 'eq' if len(parts) == 1 else parts[1]
+            if operator in ('eq', 'neq'):
+                value_shape = filter_value is None
+            elif operator in ('in', 'not_in', 'is_null'):
+                value_shape = bool(filter_value)
+            else:
+                value_shape = None
+            shape.append((filter_key, value_shape))
+        return tuple(shape)
 
     @classmethod
     def _build_filter_conditions(
@@ -355,12 +1514,17 @@ class DatabaseRepository:
         joined_models: Dict[str, Any],
         main_table: str
     ) -> DatabaseResponse:
-        """Построение условий фильтрации с поддержкой расширенных операторов"""
+        """
+        Построение условий фильтрации с поддержкой расширенных операторов.
+        Значения не встраиваются в выражение: каждый фильтр ссылается на bindparam
+        "filter_N" (N — позиция ключа в отсортированном filters_dict), а сами значения
+        готовит _build_filter_params
+        """
       
         conditions = []
         main_model = joined_models[main_table]
       
-        for filter_key, filter_value in filters_dict.items():
+        for index, (filter_key, filter_value) in enumerate(sorted(filters_dict.items())):
             # Парсим имя колонки и оператор
             parts = filter_key.split('__')
             column_name = parts[0]
@@ -390,22 +1554,10 @@ class DatabaseRepository:
           
             col_obj = getattr(table_model, column_name)
           
-            # Получаем информацию о типе колонки для валидации
-            col_info_response = cls._get_column_info(table_name, column_name)
-            if col_info_response.status == ResponseStatus.SUCCESS:
-                col_info = col_info_response.data
-            else:
-                col_info = None
-          
-            # Валидируем значение в зависимости от типа
-            validation_result = cls._validate_filter_value(filter_value, operator, col_info)
-            if validation_result.status != ResponseStatus.SUCCESS:
-                return validation_result
-          
-            validated_value = validation_result.data
-          
             # Строим условие в зависимости от оператора
-            condition = cls._build_condition_for_operator(col_obj, operator, validated_value)
+            condition = cls._build_condition_for_operator(
+                col_obj, operator, filter_value, f"filter_{index}"
+            )
             if condition is not None:
                 conditions.append(condition)
             else:
@@ -417,23 +1569,188 @@ class DatabaseRepository:
         return DatabaseResponse.success(data=conditions)
 
     @classmethod
-    def _build_condition_for_operator(cls, column, operator: str, value: Any):
-        """Создает SQL условие для конкретного оператора"""
+    def _build_filter_params(cls, filters_dict: Dict[str, Any], main_table: str) -> DatabaseResponse:
+        """
+        Валидация значений фильтров и подготовка параметров filter_N для _build_filter_conditions.
+        Разбор ключей, метаданные колонок и выбор преобразователей выполняются один раз
+        на набор ключей (см. _get_filter_plan), здесь только применяются к значениям
+        """
+        if not filters_dict:
+            return DatabaseResponse.success(data={})
+
+        plan = cls._get_filter_plan(main_table, tuple(sorted(filters_dict)))
+        params: Dict[str, Any] = {}
+
+        try:
+            for filter_key, operator, bind_name, coerce in plan:
+                params.update(cls._bind_values_for_operator(
+                    operator, coerce(filters_dict[filter_key]), bind_name
+                ))
+        except FilterValueError as e:
+            return DatabaseResponse.error(ErrorCode.INVALID_FILTER, str(e))
+
+        return DatabaseResponse.success(data=params)
+
+    @classmethod
+    def _get_filter_plan(cls, main_table: str, filter_keys: Tuple[str, ...]) -> List[Tuple[str, str, str, Callable[[Any], Any]]]:
+        """
+        План фильтров для (таблица, отсортированный набор ключей):
+        [(ключ, оператор, имя параметра, преобразователь значения), ...]
+        """
+        plan_key = (main_table, filter_keys)
+        plan = cls._filter_plans.get(plan_key)
+        if plan is not None:
+            return plan
+
+        plan = []
+        for index, filter_key in enumerate(filter_keys):
+            parts = filter_key.split('__')
+            column_name = parts[0]
+            operator = 'eq' if len(parts) == 1 else parts[1]
+
+            if '.' in column_name:
+                table_name, column_name = column_name.split('.', 1)
+            else:
+                table_name = main_table
+
+            # Получаем информацию о типе колонки для валидации
+            col_info_response = cls._get_column_info(table_name, column_name)
+            col_info = col_info_response.data if col_info_response.status == ResponseStatus.SUCCESS else None
+
+            plan.append((filter_key, operator, f"filter_{index}", cls._compile_filter_coercer(operator, col_info)))
+
+        if len(cls._filter_plans) >= cls._FILTER_PLANS_MAX_SIZE:
+            cls._filter_plans.clear()
+        cls._filter_plans[plan_key] = plan
+        return plan
+
+    @classmethod
+    def _compile_filter_coercer(cls, operator: str, col_info: Optional[Dict] = None) -> Callable[[Any], Any]:
+        """
+        Преобразователь значения фильтра: проверка формы значения для оператора и приведение
+        к типу колонки (col_info), определяемому заранее. Ошибки сообщаются через FilterValueError
+        """
+        checks: List[Callable[[Any], None]] = []
+
+        # Валидация для оператора IN
+        if operator in ('in', 'not_in'):
+            def check_list(value):
+                if not isinstance(value, (list, tuple)):
+                    raise FilterValueError(
+                        f"Оператор '{operator}' требует список значений, получен: {type(value).__name__}"
+                    )
+            checks.append(check_list)
+
+        # Валидация для оператора BETWEEN
+        if operator == 'between':
+            def check_range(value):
+                if not isinstance(value, (list, tuple)) or len(value) != 2:
+                    raise FilterValueError("Оператор 'between' требует список из двух значений [min, max]")
+                if value[0] is None or value[1] is None:
+                    raise FilterValueError("Оператор 'between' не поддерживает None значения")
+            checks.append(check_range)
+
+        # Валидация для оператора IS_NULL
+        if operator == 'is_null':
+            def check_bool(value):
+                if not isinstance(value, bool):
+                    raise FilterValueError("Оператор 'is_null' требует булево значение")
+            checks.append(check_bool)
+
+        convert: Optional[Callable[[Any], Any]] = None
+        if col_info and operator != 'is_null':
+            col_type = col_info['type'].lower()
+            typed_operators = ('gt', 'gte', 'lt', 'lte', 'between', 'in')
+
+            # Числовые типы: целочисленные колонки получают int (asyncpg не принимает float для integer)
+            if any(num_type in col_type for num_type in ['int', 'numeric', 'decimal', 'float']):
+                if operator in typed_operators:
+                    is_integer = any(int_type in col_type for int_type in ['integer', 'bigint', 'smallint'])
+
+                    def to_number(x):
+                        if not is_integer:
+                            return float(x)
+                        if isinstance(x, int):
+                            return x
+                        if isinstance(x, str) and x.strip().lstrip('+-').isdigit():
+                            return int(x)
+                        number = float(x)
+                        if not number.is_integer():
+                            raise FilterValueError(f"Для целочисленной колонки ожидается целое число, получено: {x}")
+                        return int(number)
+
+                    def convert(value):
+                        try:
+                            if operator == 'between':
+                                return [to_number(value[0]), to_number(value[1])]
+                            if operator == 'in':
+                                return [to_number(x) for x in value]
+                            return to_number(value)
+                        except FilterValueError:
+                            raise
+                        except (ValueError, TypeError):
+                            raise FilterValueError(f"Для числовой колонки ожидается число, получено: {value}")
+
+            # Даты
+            elif any(date_type in col_type for date_type in ['date', 'timestamp', 'datetime']):
+                if operator in typed_operators:
+                    def convert(value):
+                        try:
+                            if operator == 'between':
+                                return [cls._parse_date(value[0]), cls._parse_date(value[1])]
+                            if operator == 'in':
+                                return [cls._parse_date(x) for x in value]
+                            return cls._parse_date(value)
+                        except ValueError as e:
+                            raise FilterValueError(f"Неверный формат даты: {str(e)}")
+
+            # ENUM
+            elif col_info.get('enum_values') and operator not in ['like', 'ilike']:
+                enum_values = list(col_info['enum_values'])
+
+                def convert(value):
+                    if operator in ('in', 'not_in'):
+                        invalid_values = [v for v in value if v not in enum_values]
+                    else:
+                        invalid_values = [value] if value not in enum_values else []
+                    if invalid_values:
+                        raise FilterValueError(
+                            f"Недопустимые значения для ENUM колонки: {invalid_values}. Допустимо: {enum_values}"
+                        )
+                    return value
+
+        def coerce(value):
+            for check in checks:
+                check(value)
+            if convert is None or value is None:
+                return value
+            return convert(value)
+
+        return coerce
+
+    @classmethod
+    def _build_condition_for_operator(cls, column, operator: str, value: Any, bind_name: str):
+        """
+        Создает SQL условие для конкретного оператора.
+        value влияет только на структуру (None, пустой список, флаг is_null),
+        само значение подставляется через bindparam(bind_name)
+        """
+        param = lambda: bindparam(bind_name)
       
         operators = {
-            'eq': lambda: column == value,
-            'neq': lambda: column != value,
-            'gt': lambda: column > value,
-            'gte': lambda: column >= value,
-            'lt': lambda: column < value,
-            'lte': lambda: column <= value,
-            'like': lambda: column.like(f"%{value}%"),
-            'ilike': lambda: column.ilike(f"%{value}%"),
-            'startswith': lambda: column.like(f"{value}%"),
-            'endswith': lambda: column.like(f"%{value}"),
-            'in': lambda: column.in_(value) if value else column.in_([]),  # Пустой список = всегда False
-            'not_in': lambda: ~column.in_(value) if value else column.is_not(None),
-            'between': lambda: column.between(value[0], value[1]),
+            'eq': lambda: column.is_(None) if value is None else column == param(),
+            'neq': lambda: column.is_not(None) if value is None else column != param(),
+            'gt': lambda: column > param(),
+            'gte': lambda: column >= param(),
+            'lt': lambda: column < param(),
+            'lte': lambda: column <= param(),
+            'like': lambda: column.like(param()),
+            'ilike': lambda: column.ilike(param()),
+            'startswith': lambda: column.like(param()),
+            'endswith': lambda: column.like(param()),
+            'in': lambda: column.in_(bindparam(bind_name, expanding=True)) if value else column.in_([]),  # Пустой список = всегда False
+            'not_in': lambda: ~column.in_(bindparam(bind_name, expanding=True)) if value else column.is_not(None),
+            'between': lambda: column.between(bindparam(f"{bind_name}_min"), bindparam(f"{bind_name}_max")),
             'is_null': lambda: column.is_(None) if value else column.isnot(None),
         }
       
@@ -446,93 +1763,23 @@ class DatabaseRepository:
         return None
 
     @classmethod
-    def _validate_filter_value(cls, value: Any, operator: str, col_info: Optional[Dict] = None) -> DatabaseResponse:
-        """Валидация значений фильтров в зависимости от типа данных"""
-      
-        # Валидация для оператора IN
+    def _bind_values_for_operator(cls, operator: str, value: Any, bind_name: str) -> Dict[str, Any]:
+        """Значения параметров для условия, построенного _build_condition_for_operator"""
+        if operator in ('eq', 'neq'):
+            return {} if value is None else {bind_name: value}
+        if operator in ('gt', 'gte', 'lt', 'lte'):
+            return {bind_name: value}
+        if operator in ('like', 'ilike'):
+            return {bind_name: f"%{value}%"}
+        if operator == 'startswith':
+            return {bind_name: f"{value}%"}
+        if operator == 'endswith':
+            return {bind_name: f"%{value}"}
         if operator in ('in', 'not_in'):
-            if not isinstance(value, (list, tuple)):
-                return DatabaseResponse.error(
-                    ErrorCode.INVALID_FILTER,
-                    f"Оператор '{operator}' требует список значений, получен: {type(value).__name__}"
-                )
-      
-        # Валидация для оператора BETWEEN
+            return {bind_name: list(value)} if value else {}
         if operator == 'between':
-            if not isinstance(value, (list, tuple)) or len(value) != 2:
-                return DatabaseResponse.error(
-                    ErrorCode.INVALID_FILTER,
-                    "Оператор 'between' требует список из двух значений [min, max]"
-                )
-            if value[0] is None or value[1] is None:
-                return DatabaseResponse.error(
-                    ErrorCode.INVALID_FILTER,
-                    "Оператор 'between' не поддерживает None значения"
-                )
-      
-        # Валидация для оператора IS_NULL
-        if operator == 'is_null' and not isinstance(value, bool):
-            return DatabaseResponse.error(
-                ErrorCode.INVALID_FILTER,
-                "Оператор 'is_null' требует булево значение"
-            )
-      
-        # Валидация типов данных если есть информация о колонке
-        if col_info and value is not None and operator not in ['is_null']:
-            col_type = col_info['type'].lower()
-          
-            # Валидация числовых типов
-            if any(num_type in col_type for num_type in ['int', 'numeric', 'decimal', 'float']):
-                if operator in ['gt', 'gte', 'lt', 'lte', 'between', 'in']:
-                    try:
-                        if operator == 'between':
-                            return DatabaseResponse.success(data=[float(value[0]), float(value[1])])
-                        elif operator in ('in', 'not_in'):
-                            return DatabaseResponse.success(data=[float(x) for x in value])
-                        else:
-                            return DatabaseResponse.success(data=float(value))
-                    except (ValueError, TypeError) as e:
-                        return DatabaseResponse.error(
-                            ErrorCode.INVALID_FILTER,
-                            f"Для числовой колонки ожидается число, получено: {value}"
-                        )
-          
-            # Валидация дат
-            elif any(date_type in col_type for date_type in ['date', 'timestamp', 'datetime']):
-                if operator in ['gt', 'gte', 'lt', 'lte', 'between', 'in']:
-                    try:
-                        if operator == 'between':
-                            dates = [
-                                cls._parse_date(value[0]),
-                                cls._parse_date(value[1])
-                            ]
-                            return DatabaseResponse.success(data=dates)
-                        elif operator in ('in', 'not_in'):
-                            dates = [cls._parse_date(x) for x in value]
-                            return DatabaseResponse.success(data=dates)
-                        else:
-                            return DatabaseResponse.success(data=cls._parse_date(value))
-                    except ValueError as e:
-                        return DatabaseResponse.error(
-                            ErrorCode.INVALID_FILTER,
-                            f"Неверный формат даты: {str(e)}"
-                        )
-          
-            # Валидация ENUM
-            elif col_info.get('enum_values') and operator not in ['like', 'ilike']:
-                enum_values = col_info['enum_values']
-                if operator in ('in', 'not_in'):
-                    invalid_values = [v for v in value if v not in enum_values]
-                else:
-                    invalid_values = [value] if value not in enum_values else []
-              
-                if invalid_values:
-                    return DatabaseResponse.error(
-                        ErrorCode.INVALID_FILTER,
-                        f"Недопустимые значения для ENUM колонки: {invalid_values}. Допустимо: {enum_values}"
-                    )
-      
-        return DatabaseResponse.success(data=value)
+            return {f"{bind_name}_min": value[0], f"{bind_name}_max": value[1]}
+        return {}
 
     @classmethod
     def _parse_date(cls, date_value) -> datetime:
@@ -565,7 +1812,7 @@ class DatabaseRepository:
     @classmethod
     def _get_column_info(cls, table_name: str, column_name: str) -> DatabaseResponse:
         """Получение информации о конкретной колонке"""
-        columns_response = cls.get_table_columns(table_name)
+        columns_response = cls._get_catalog_columns(table_name)
         if columns_response.status != ResponseStatus.SUCCESS:
             return columns_response
       
@@ -583,57 +1830,22 @@ class DatabaseRepository:
     def get_related_tables(cls, table_name: str) -> DatabaseResponse:
         """Получение информации о таблицах, связанных с указанной через foreign keys"""
 
-        model_response = cls.get_model_by_tablename(table_name)
-        if model_response.status != ResponseStatus.SUCCESS:
-            return model_response
-
-        model = model_response.data
-        related_tables = {}
-
-        try:
-            # Ищем внешние ключи из этой таблицы
-            for column in model.__table__.columns:
-                for fk in column.foreign_keys:
-                    target_table = fk.column.table.name
-                    if target_table not in related_tables:
-                        related_tables[target_table] = {
-                            'relationship_type': 'outgoing',
-                            'columns': []
-                        }
-                    related_tables[target_table]['columns'].append({
-                        'source_column': column.name,
-                        'target_column': fk.column.name
-                    })
-
-            # Ищем внешние ключи, ссылающиеся на эту таблицу
-            for mapper in Base.registry.mappers:
-                other_model = mapper.class_
-                if other_model.__tablename__ == table_name:
-                    continue
-
-                for column in other_model.__table__.columns:
-                    for fk in column.foreign_keys:
-                        if fk.column.table.name == table_name:
-                            if other_model.__tablename__ not in related_tables:
-                                related_tables[other_model.__tablename__] = {
-                                    'relationship_type': 'incoming',
-                                    'columns': []
-                                }
-                            related_tables[other_model.__tablename__]['columns'].append({
-                                'source_column': column.name,
-                                'target_column': fk.column.name
-                            })
+        table_info = cls._get_catalog().table(table_name)
+        if table_info is None:
+            return cls.get_model_by_tablename(table_name)
 
-            return DatabaseResponse.success(
-                data=related_tables,
-                message=f"Найдено {len(related_tables)} связанных таблиц"
-            )
+        related_tables = {
+            related_table: {
+                'relationship_type': relation['relationship_type'],
+                'columns': [dict(column) for column in relation['columns']]
+            }
+            for related_table, relation in table_info.related_tables.items()
+        }
 
-        except Exception as e:
-            return DatabaseResponse.error(
-                ErrorCode.OPERATION_FAILED,
-                f"Ошибка при получении связанных таблиц: {str(e)}"
-            )
+        return DatabaseResponse.success(
+            data=related_tables,
+            message=f"Найдено {len(related_tables)} связанных таблиц"
+        )
 
     @classmethod
     @DatabaseErrorHandler()
@@ -662,7 +1874,7 @@ class DatabaseRepository:
         model: type[Base] = model_response.data
 
         # 2. Проверяем существование колонок
-        columns_response = cls.get_table_columns(table)
+        columns_response = cls._get_catalog_columns(table)
         if columns_response.status != ResponseStatus.SUCCESS:
             return columns_response
 
@@ -680,20 +1892,24 @@ class DatabaseRepository:
 
         # 3. Строим безопасный запрос
         try:
-            display_column = getattr(model, display_col)
-            id_column = getattr(model, id_col)
-
             # Убираем потенциально опасные символы? Нет — используем параметризацию
             # SQLAlchemy автоматически экранирует параметры
             search_pattern = f"%{query.strip()}%"
 
-            with Database().get_db_session() as session:
-                stmt = (
-                    select(id_column, display_column)
-                    .where(cast(display_column, String).ilike(search_pattern))
-                    .limit(limit)
+            statement_response = cls._statement_cache.get_or_build(
+                ("search_foreign_key", table, display_col, id_col),
+                lambda: DatabaseResponse.success(data=(
+                    select(getattr(model, id_col), getattr(model, display_col))
+                    .where(cast(getattr(model, display_col), String).ilike(bindparam("search_pattern")))
+                    .limit(bindparam("row_limit"))
+                ))
+            )
+
+            def search(session: Session) -> DatabaseResponse:
+                result = session.execute(
+                    statement_response.data,
+                    {"search_pattern": search_pattern, "row_limit": limit}
                 )
-                result = session.execute(stmt)
                 rows = result.fetchall()
 
                 # Формируем результат: список словарей
@@ -707,6 +1923,8 @@ class DatabaseRepository:
                     message=f"Найдено {len(data)} совпадений в таблице '{table}'"
                 )
 
+            return Database().run_read(search)
+
         except Exception as e:
             return DatabaseErrorHandler.handle_exception(
                 e,
@@ -727,7 +1945,7 @@ class DatabaseRepository:
         model = model_response.data
 
         # Получаем информацию о колонках
-        columns_response = cls.get_table_columns(table_name)
+        columns_response = cls._get_catalog_columns(table_name)
         if columns_response.status != ResponseStatus.SUCCESS:
             return columns_response
 
@@ -773,7 +1991,7 @@ class DatabaseRepository:
             with Database().get_db_session() as session:
                 query = insert(model).values(valid_params)
                 result = session.execute(query)
-                session.commit()
+                cls._invalidate_after_commit(session, table_name)
 
                 response_data = {
                     "inserted_data": valid_params,
@@ -790,6 +2008,612 @@ class DatabaseRepository:
             logger.error(f"Ошибка при вставке в таблицу '{table_name}': {str(e)}")
             return DatabaseErrorHandler.handle_exception(e, f"insert_into_table for {table_name}")
 
+    @classmethod
+    @DatabaseErrorHandler()
+    def insert_many(
+        cls,
+        table_name: str,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = 1000,
+        returning: Optional[List[str]] = None,
+    ) -> DatabaseResponse:
+        """
+        Пакетная вставка строк в одной транзакции.
+        Набор колонок проверяется один раз (у всех строк он должен совпадать с первой строкой),
+        строки отправляются частями по chunk_size многострочными INSERT ... VALUES.
+        returning — колонки, значения которых вернуть для вставленных строк (например, сгенерированные ключи).
+        В ответе: число вставленных строк, время каждой части и, если запрошено, возвращённые значения
+        """
+        prepared = cls._prepare_bulk_rows(table_name, rows, chunk_size)
+        if prepared.status != ResponseStatus.SUCCESS:
+            return prepared
+        model, columns_info, insert_columns, invalid_params = prepared.data
+
+        returning = list(returning or [])
+        unknown_returning = [column for column in returning if column not in columns_info]
+        if unknown_returning:
+            return DatabaseResponse.error(
+                ErrorCode.COLUMN_NOT_FOUND,
+                f"Колонки для RETURNING не найдены в таблице '{table_name}': {unknown_returning}"
+            )
+
+        statement_response = cls._statement_cache.get_or_build(
+            ("insert_many", table_name, tuple(insert_columns), tuple(returning)),
+            lambda: cls._build_insert_many_statement(model, returning)
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            return statement_response
+
+        # Одна часть — один многострочный INSERT (insertmanyvalues SQLAlchemy)
+        query = statement_response.data.execution_options(insertmanyvalues_page_size=chunk_size)
+        returned_rows: List[Dict[str, Any]] = []
+
+        def execute_chunk(session, chunk: List[Dict[str, Any]]) -> None:
+            result = session.execute(query, chunk)
+            if returning:
+                returned_rows.extend(dict(zip(returning, row)) for row in result)
+
+        chunks_response = cls._execute_bulk_chunks(
+            table_name, "insert_many", rows, insert_columns, chunk_size, execute_chunk
+        )
+        if chunks_response.status != ResponseStatus.SUCCESS:
+            return chunks_response
+        chunks = chunks_response.data
+
+        total_ms = sum(chunk["duration_ms"] for chunk in chunks)
+        return DatabaseResponse.success(
+            data={
+                "inserted_count": len(rows),
+                "returned": returned_rows if returning else None,
+                "chunks": chunks,
+                "ignored_parameters": invalid_params or None
+            },
+            message=(
+                f"Добавлено {len(rows)} записей в таблицу '{table_name}' "
+                f"({len(chunks)} частей, {total_ms:.1f} мс)"
+            ),
+            affected_rows=len(rows),
+            meta={"chunk_size": chunk_size, "total_ms": round(total_ms, 3)}
+        )
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def upsert_many(
+        cls,
+        table_name: str,
+        rows: List[Dict[str, Any]],
+        conflict_columns: List[str],
+        update_columns: Optional[List[str]] = None,
+        chunk_size: int = 1000,
+    ) -> DatabaseResponse:
+        """
+        Пакетный upsert: INSERT ... ON CONFLICT (conflict_columns) DO UPDATE частями по chunk_size
+        в одной транзакции. conflict_columns должны совпадать с первичным ключом или уникальным
+        ограничением таблицы. update_columns — колонки, обновляемые при конфликте (по умолчанию все
+        переданные, кроме conflict_columns); пустой список — ON CONFLICT DO NOTHING.
+        Вставленные и обновлённые строки считаются раздельно по RETURNING (xmax = 0).
+
+        Остатки по результатам инвентаризации (ключ — inventory_id; product_id не уникален,
+        поэтому целью ON CONFLICT быть не может):
+
+            DatabaseRepository.upsert_many(
+                "inventory",
+                [
+                    {"inventory_id": 1, "product_id": 1, "quantity_in_stock": 4950},
+                    {"inventory_id": 2, "product_id": 2, "quantity_in_stock": 4700},
+                ],
+                conflict_columns=["inventory_id"],
+                update_columns=["quantity_in_stock"],
+            )
+        """
+        prepared = cls._prepare_bulk_rows(table_name, rows, chunk_size)
+        if prepared.status != ResponseStatus.SUCCESS:
+            return prepared
+        model, columns_info, insert_columns, invalid_params = prepared.data
+
+        conflict_columns = list(conflict_columns or [])
+        missing_conflict = [column for column in conflict_columns if column not in insert_columns]
+        if not conflict_columns or missing_conflict:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                f"Колонки конфликта должны присутствовать во всех строках: {missing_conflict or conflict_columns}"
+            )
+
+        unique_keys = cls._get_unique_keys(model)
+        if set(conflict_columns) not in unique_keys:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                f"Для колонок {conflict_columns} нет первичного ключа или уникального ограничения "
+                f"в таблице '{table_name}'",
+                error_details={"unique_keys": [sorted(key) for key in unique_keys]}
+            )
+
+        if update_columns is None:
+            update_columns = [column for column in insert_columns if column not in conflict_columns]
+        update_columns = list(update_columns)
+        invalid_update = [
+            column for column in update_columns
+            if column not in insert_columns or column in conflict_columns
+        ]
+        if invalid_update:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                f"Колонки для обновления должны быть в строках и не входить в ключ конфликта: {invalid_update}"
+            )
+
+        # ON CONFLICT DO UPDATE не может изменить одну строку дважды в одной команде
+        seen_keys: Dict[Tuple[Any, ...], int] = {}
+        for index, row in enumerate(rows):
+            key = tuple(row[column] for column in conflict_columns)
+            if key in seen_keys:
+                return DatabaseResponse.error(
+                    ErrorCode.DUPLICATE_KEY,
+                    f"Строки {seen_keys[key]} и {index} имеют одинаковый ключ конфликта",
+                    error_details={"rows": [seen_keys[key], index], "key": dict(zip(conflict_columns, key))}
+                )
+            seen_keys[key] = index
+
+        statement_response = cls._statement_cache.get_or_build(
+            ("upsert_many", table_name, tuple(insert_columns), tuple(conflict_columns), tuple(update_columns)),
+            lambda: cls._build_upsert_many_statement(model, conflict_columns, update_columns)
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            return statement_response
+
+        query = statement_response.data.execution_options(insertmanyvalues_page_size=chunk_size)
+        counts = {"inserted": 0, "updated": 0}
+
+        def execute_chunk(session, chunk: List[Dict[str, Any]]) -> None:
+            for (inserted,) in session.execute(query, chunk):
+                counts["inserted" if inserted else "updated"] += 1
+
+        chunks_response = cls._execute_bulk_chunks(
+            table_name, "upsert_many", rows, insert_columns, chunk_size, execute_chunk
+        )
+        if chunks_response.status != ResponseStatus.SUCCESS:
+            return chunks_response
+        chunks = chunks_response.data
+
+        # DO NOTHING не возвращает строки, пропущенные из-за конфликта
+        skipped = len(rows) - counts["inserted"] - counts["updated"]
+        total_ms = sum(chunk["duration_ms"] for chunk in chunks)
+        return DatabaseResponse.success(
+            data={
+                "inserted_count": counts["inserted"],
+                "updated_count": counts["updated"],
+                "skipped_count": skipped,
+                "chunks": chunks,
+                "ignored_parameters": invalid_params or None
+            },
+            message=(
+                f"Таблица '{table_name}': добавлено {counts['inserted']}, обновлено {counts['updated']} "
+                f"записей ({len(chunks)} частей, {total_ms:.1f} мс)"
+            ),
+            affected_rows=counts["inserted"] + counts["updated"],
+            meta={"chunk_size": chunk_size, "total_ms": round(total_ms, 3)}
+        )
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def bulk_update_by_pk(
+        cls,
+        table_name: str,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = 500,
+    ) -> DatabaseResponse:
+        """
+        Пакетное обновление разных значений по первичному ключу.
+        Каждая строка содержит первичный ключ и новые значения колонок (набор колонок у всех строк одинаковый).
+        Часть из chunk_size строк отправляется одной командой
+        UPDATE t SET ... FROM (VALUES ...) AS v WHERE t.pk = v.pk, все части — в одной транзакции.
+        В ответе: число обновлённых строк и ключи, для которых записи не нашлось
+        """
+        prepared = cls._prepare_bulk_rows(table_name, rows, chunk_size, check_required=False)
+        if prepared.status != ResponseStatus.SUCCESS:
+            return prepared
+        model, columns_info, row_columns, invalid_params = prepared.data
+
+        key_columns = [column.name for column in model.__table__.primary_key.columns]
+        missing_keys = [column for column in key_columns if column not in row_columns]
+        if missing_keys:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                f"В строках нет колонок первичного ключа: {missing_keys}"
+            )
+        set_columns = [column for column in row_columns if column not in key_columns]
+        if not set_columns:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "Не предоставлено ни одного корректного параметра для обновления",
+                error_details={"invalid_parameters": invalid_params}
+            )
+
+        # При повторе ключа UPDATE ... FROM применил бы к записи произвольную из строк
+        seen_keys: Dict[Tuple[Any, ...], int] = {}
+        for index, row in enumerate(rows):
+            key = tuple(row[column] for column in key_columns)
+            if key in seen_keys:
+                return DatabaseResponse.error(
+                    ErrorCode.DUPLICATE_KEY,
+                    f"Строки {seen_keys[key]} и {index} имеют одинаковый первичный ключ",
+                    error_details={"rows": [seen_keys[key], index], "key": dict(zip(key_columns, key))}
+                )
+            seen_keys[key] = index
+
+        value_columns = key_columns + set_columns
+        matched_rows: List[int] = []
+        chunk_offset = 0
+
+        def execute_chunk(session, chunk: List[Dict[str, Any]]) -> None:
+            nonlocal chunk_offset
+            # Форма команды зависит от числа строк: в кэше — только UPDATE полной части (chunk_size строк),
+            # последняя неполная часть строится без кэша, чтобы её размеры не вытесняли другие выражения
+            if len(chunk) == chunk_size:
+                statement_response = cls._statement_cache.get_or_build(
+                    ("bulk_update_by_pk", table_name, tuple(set_columns), chunk_size),
+                    lambda: cls._build_bulk_update_statement(model, key_columns, set_columns, chunk_size)
+                )
+            else:
+                statement_response = cls._build_bulk_update_statement(model, key_columns, set_columns, len(chunk))
+            if statement_response.status != ResponseStatus.SUCCESS:
+                raise ValueError(statement_response.message)
+            params = {}
+            for row_index, row in enumerate(chunk):
+                params[f"row_{row_index}"] = chunk_offset + row_index
+                params.update({f"value_{row_index}_{column}": row[column] for column in value_columns})
+            matched_rows.extend(row_number for (row_number,) in session.execute(statement_response.data, params))
+            chunk_offset += len(chunk)
+
+        chunks_response = cls._execute_bulk_chunks(
+            table_name, "bulk_update_by_pk", rows, value_columns, chunk_size, execute_chunk
+        )
+        if chunks_response.status != ResponseStatus.SUCCESS:
+            return chunks_response
+        chunks = chunks_response.data
+
+        matched = set(matched_rows)
+        not_found = [
+            {column: row[column] for column in key_columns}
+            for index, row in enumerate(rows) if index not in matched
+        ]
+        total_ms = sum(chunk["duration_ms"] for chunk in chunks)
+        return DatabaseResponse.success(
+            data={
+                "updated_count": len(matched),
+                "not_found": not_found or None,
+                "chunks": chunks,
+                "ignored_parameters": invalid_params or None
+            },
+            message=(
+                f"Обновлено {len(matched)} записей в таблице '{table_name}' "
+                f"({len(chunks)} частей, {total_ms:.1f} мс)"
+            ),
+            affected_rows=len(matched),
+            meta={"chunk_size": chunk_size, "total_ms": round(total_ms, 3)}
+        )
+
+    @classmethod
+    def _prepare_bulk_rows(
+        cls,
+        table_name: str,
+        rows: List[Dict[str, Any]],
+        chunk_size: int,
+        check_required: bool = True,
+    ) -> DatabaseResponse:
+        """
+        Общие проверки пакетных операций: непустой список словарей, chunk_size,
+        одинаковый набор колонок во всех строках, обязательные поля.
+        data: (модель, описание колонок, колонки таблицы из строк, проигнорированные ключи)
+        """
+        if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "rows должен быть непустым списком словарей"
+            )
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "chunk_size должен быть положительным целым числом"
+            )
+
+        model_response = cls.get_model_by_tablename(table_name)
+        if model_response.status != ResponseStatus.SUCCESS:
+            return model_response
+        model = model_response.data
+
+        columns_response = cls._get_catalog_columns(table_name)
+        if columns_response.status != ResponseStatus.SUCCESS:
+            return columns_response
+        columns_info = columns_response.data
+
+        row_keys = set(rows[0])
+        for index, row in enumerate(rows):
+            if set(row) != row_keys:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    f"Строка {index}: набор колонок отличается от первой строки",
+                    error_details={
+                        "row_index": index,
+                        "missing": sorted(row_keys - set(row)),
+                        "unexpected": sorted(set(row) - row_keys)
+                    }
+                )
+
+        row_columns = [column for column in columns_info if column in row_keys]
+        invalid_params = sorted(row_keys - set(row_columns))
+        if not row_columns:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "Не предоставлено ни одного корректного параметра",
+                error_details={"invalid_parameters": invalid_params}
+            )
+
+        if check_required:
+            # Проверяем обязательные поля (NOT NULL без default)
+            missing_required = [
+                col_name for col_name, col_info in columns_info.items()
+                if not col_info['nullable'] and col_info['default'] is None
+                and not col_info['primary_key'] and col_name not in row_keys
+            ]
+            if missing_required:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    f"Отсутствуют обязательные поля: {', '.join(missing_required)}"
+                )
+
+        if invalid_params:
+            logger.warning(f"Игнорируем некорректные параметры: {invalid_params}")
+
+        return DatabaseResponse.success(data=(model, columns_info, row_columns, invalid_params))
+
+    @classmethod
+    def _execute_bulk_chunks(
+        cls,
+        table_name: str,
+        operation: str,
+        rows: List[Dict[str, Any]],
+        columns: List[str],
+        chunk_size: int,
+        execute_chunk: Callable[[Any, List[Dict[str, Any]]], None],
+    ) -> DatabaseResponse:
+        """
+        Вызывает execute_chunk(session, часть) для частей по chunk_size строк (только колонки columns)
+        в одной транзакции. data: размер и время каждой части.
+        При ошибке откатывается вся транзакция, в error_details — номер части и диапазон строк
+        """
+        chunks: List[Dict[str, Any]] = []
+        chunk_index, chunk_start = 0, 0
+
+        try:
+            with Database().get_db_session() as session:
+                for chunk_index, chunk_start in enumerate(range(0, len(rows), chunk_size)):
+                    chunk = [
+                        {column: row[column] for column in columns}
+                        for row in rows[chunk_start:chunk_start + chunk_size]
+                    ]
+                    started = time.perf_counter()
+                    execute_chunk(session, chunk)
+                    chunks.append({
+                        "chunk": chunk_index,
+                        "rows": len(chunk),
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+                    })
+                cls._invalidate_after_commit(session, table_name)
+
+        except Exception as e:
+            failed_rows = [chunk_start, min(chunk_start + chunk_size, len(rows)) - 1]
+            logger.error(
+                f"Ошибка {operation} в таблице '{table_name}' "
+                f"(часть {chunk_index}, строки {failed_rows[0]}-{failed_rows[1]}): {str(e)}"
+            )
+            response = DatabaseErrorHandler.handle_exception(e, f"{operation} for {table_name}")
+            response.error_details = {
+                **(response.error_details or {}),
+                "failed_chunk": chunk_index,
+                "failed_rows": failed_rows,
+                "completed_chunks": chunks,
+            }
+            return response
+
+        return DatabaseResponse.success(data=chunks)
+
+    @classmethod
+    def _build_insert_many_statement(cls, model: Any, returning: List[str]) -> DatabaseResponse:
+        """INSERT для executemany: SQLAlchemy собирает строки части в один многострочный VALUES"""
+        query = insert(model.__table__)
+        if returning:
+            query = query.returning(*(model.__table__.c[column] for column in returning))
+        return DatabaseResponse.success(data=query)
+
+    @classmethod
+    def _build_upsert_many_statement(
+        cls,
+        model: Any,
+        conflict_columns: List[str],
+        update_columns: List[str]
+    ) -> DatabaseResponse:
+        """INSERT ... ON CONFLICT для executemany; RETURNING (xmax = 0) истинно для вставленных строк"""
+        query = pg_insert(model.__table__)
+        if update_columns:
+            query = query.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={column: query.excluded[column] for column in update_columns}
+            )
+        else:
+            query = query.on_conflict_do_nothing(index_elements=conflict_columns)
+        return DatabaseResponse.success(data=query.returning(literal_column("(xmax = 0)")))
+
+    @classmethod
+    def _build_bulk_update_statement(
+        cls,
+        model: Any,
+        key_columns: List[str],
+        set_columns: List[str],
+        row_count: int
+    ) -> DatabaseResponse:
+        """
+        UPDATE ... FROM (VALUES ...) AS v на row_count строк; параметры row_{i} и value_{i}_{колонка}.
+        Значения VALUES приходят без типа, поэтому приводятся к типам колонок таблицы.
+        RETURNING v.row — номера обновлённых строк входного списка
+        """
+        table = model.__table__
+        value_columns = key_columns + set_columns
+        values_table = values(
+            column("row", Integer),
+            *(column(name, table.c[name].type) for name in value_columns),
+            name="v"
+        ).data([
+            (bindparam(f"row_{index}"), *(bindparam(f"value_{index}_{name}") for name in value_columns))
+            for index in range(row_count)
+        ])
+        query = (
+            update(table)
+            .values({name: cast(values_table.c[name], table.c[name].type) for name in set_columns})
+            .where(and_(*(
+                table.c[name] == cast(values_table.c[name], table.c[name].type) for name in key_columns
+            )))
+            .returning(cast(values_table.c.row, Integer))
+        )
+        return DatabaseResponse.success(data=query)
+
+    @staticmethod
+    def _get_unique_keys(model: Any) -> List[set]:
+        """Наборы колонок первичного ключа и уникальных ограничений/индексов — допустимые цели ON CONFLICT"""
+        table = model.__table__
+        keys = [{column.name for column in table.primary_key.columns}]
+        keys.extend(
+            {column.name for column in constraint.columns}
+            for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+        )
+        keys.extend({column.name for column in index.columns} for index in table.indexes if index.unique)
+        keys.extend({column.name} for column in table.columns if column.unique)
+        return keys
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def copy_from_csv(
+        cls,
+        table_name: str,
+        file_or_stream: pg_copy.CsvSource,
+        delimiter: str = ",",
+        null: str = "",
+        encoding: str = "utf-8",
+        skip_conflicts: bool = False,
+    ) -> DatabaseResponse:
+        """
+        Потоковый импорт CSV через COPY (psycopg2 copy_expert), без построения строк в Python.
+        Первая строка файла — заголовок, колонки проверяются по каталогу. Данные загружаются
+        во временную таблицу с текстовыми колонками; строки с неприводимыми значениями,
+        пустыми обязательными полями, нарушениями CHECK, ссылками на несуществующие записи
+        и повторами первичного/уникального ключа (с таблицей или с более ранней строкой файла)
+        отбрасываются и перечисляются в ответе, остальные одним INSERT ... SELECT переносятся
+        в целевую таблицу. Всё — одна транзакция.
+        skip_conflicts=True — повторы ключей не отбрасываются заранее, а пропускаются
+        при вставке (ON CONFLICT DO NOTHING) и считаются в skipped_conflicts
+        """
+        model_response = cls.get_model_by_tablename(table_name)
+        if model_response.status != ResponseStatus.SUCCESS:
+            return model_response
+        model = model_response.data
+
+        columns_response = cls._get_catalog_columns(table_name)
+        if columns_response.status != ResponseStatus.SUCCESS:
+            return columns_response
+        columns_info = columns_response.data
+
+        started = time.perf_counter()
+        with pg_copy.open_csv_source(file_or_stream, encoding) as stream:
+            header = pg_copy.read_csv_header(stream, delimiter, encoding)
+
+            unknown_columns = [column for column in header if column not in columns_info]
+            duplicate_columns = sorted({column for column in header if header.count(column) > 1})
+            missing_required = [
+                col_name for col_name, col_info in columns_info.items()
+                if not col_info['nullable'] and col_info['default'] is None
+                and not col_info['primary_key'] and col_name not in header
+            ]
+            if not header or unknown_columns or duplicate_columns or missing_required:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    f"Заголовок CSV не соответствует таблице '{table_name}'",
+                    error_details={
+                        "header": header,
+                        "unknown_columns": unknown_columns,
+                        "duplicate_columns": duplicate_columns,
+                        "missing_required": missing_required
+                    }
+                )
+
+            column_types = pg_copy.column_type_names(model.__table__, db_engine.dialect, header)
+            required_columns = [column for column in header if not columns_info[column]['nullable']]
+            # CHECK проверяются заранее, если все их колонки есть в файле (иначе — при вставке)
+            check_constraints = {}
+            for expression in cls._get_catalog().table(table_name).check_constraints:
+                check_columns = [column for column in columns_info if mentions_column(expression, column)]
+                if check_columns and set(check_columns) <= set(header):
+                    check_constraints[expression] = check_columns
+            unique_keys = [
+                sorted(key) for key in cls._get_unique_keys(model) if key and key <= set(header)
+            ]
+            foreign_keys = {
+                column: (columns_info[column]['foreign_keys'][0]['target_table'],
+                         columns_info[column]['foreign_keys'][0]['target_column'])
+                for column in header if columns_info[column]['foreign_keys']
+            }
+            staging_name = pg_copy.staging_table_name(table_name)
+
+            try:
+                # Соединение сессии: внутри transaction() импорт входит в общую транзакцию
+                with Database().get_db_session() as session, \
+                        session.connection().connection.dbapi_connection.cursor() as cursor:
+                    pg_copy.create_staging_table(cursor, staging_name, header)
+                    copied = pg_copy.copy_csv_into(cursor, staging_name, header, stream, delimiter, null)
+                    copied_at = time.perf_counter()
+
+                    # Каждый шаг видит только строки, прошедшие предыдущие: приведение типов уже не падает
+                    rejections = [pg_copy.reject_invalid_rows(
+                        cursor, staging_name, column_types, required_columns,
+                        pg_copy.prepare_input_validation(cursor)
+                    )]
+                    rejections.append(pg_copy.reject_check_violations(
+                        cursor, staging_name, column_types, check_constraints
+                    ))
+                    rejections.append(pg_copy.reject_orphan_rows(
+                        cursor, staging_name, column_types, foreign_keys
+                    ))
+                    if not skip_conflicts:
+                        rejections.append(pg_copy.reject_conflicting_rows(
+                            cursor, table_name, staging_name, column_types, unique_keys
+                        ))
+                    rejected = sum(count for count, _ in rejections)
+                    rejected_sample = sorted(
+                        (row for _, sample in rejections for row in sample), key=lambda row: row["line"]
+                    )[:100]
+                    inserted = pg_copy.merge_staging(cursor, table_name, staging_name, column_types, skip_conflicts)
+                    pg_copy.drop_staging_table(cursor, staging_name)
+                    cls._invalidate_after_commit(session, table_name)
+            except Exception as e:
+                logger.error(f"Ошибка при импорте CSV в таблицу '{table_name}': {str(e)}")
+                return DatabaseErrorHandler.handle_exception(e, f"copy_from_csv for {table_name}")
+
+        finished = time.perf_counter()
+
+        return DatabaseResponse.success(
+            data={
+                "rows_read": copied,
+                "inserted": inserted,
+                "rejected": rejected,
+                "rejected_rows": rejected_sample,
+                "skipped_conflicts": copied - rejected - inserted,
+            },
+            message=f"Импортировано {inserted} из {copied} строк в таблицу '{table_name}'",
+            affected_rows=inserted,
+            meta={
+                "copy_ms": round((copied_at - started) * 1000, 3),
+                "merge_ms": round((finished - copied_at) * 1000, 3),
+            }
+        )
+
     @classmethod
     @DatabaseErrorHandler()
     def update_table_data(
@@ -807,7 +2631,7 @@ class DatabaseRepository:
         model = model_response.data
 
         # Получаем информацию о колонках
-        columns_response = cls.get_table_columns(table_name)
+        columns_response = cls._get_catalog_columns(table_name)
         if columns_response.status != ResponseStatus.SUCCESS:
             return columns_response
 
@@ -837,23 +2661,23 @@ class DatabaseRepository:
                 "Фильтры обязательны для операции обновления (безопасность)"
             )
 
-        try:
-            with Database().get_db_session() as session:
-                query = update(model).values(valid_params)
+        params_response = cls._build_filter_params(filters_dict, table_name)
+        if params_response.status != ResponseStatus.SUCCESS:
+            return params_response
+        params = params_response.data
+        params.update({f"value_{key}": value for key, value in valid_params.items()})
 
-                # Обработка фильтров
-                if filters_dict:
-                    joined_models = {table_name: model}
-                    filter_conditions = cls._build_filter_conditions(
-                        filters_dict, joined_models, table_name
-                    )
-                    if filter_conditions.status != ResponseStatus.SUCCESS:
-                        return filter_conditions
-                    if filter_conditions.data:
-                        query = query.where(and_(*filter_conditions.data))
+        statement_response = cls._statement_cache.get_or_build(
+            ("update_table_data", table_name, tuple(sorted(valid_params)), cls._filter_shape(filters_dict)),
+            lambda: cls._build_update_statement(table_name, model, list(valid_params), filters_dict)
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            return statement_response
 
-                result = session.execute(query)
-                session.commit()
+        try:
+            with Database().get_db_session() as session:
+                result = session.execute(statement_response.data, params)
+                cls._invalidate_after_commit(session, table_name)
 
                 response_data = {
                     "updated_data": valid_params,
@@ -870,6 +2694,96 @@ class DatabaseRepository:
             logger.error(f"Ошибка при обновлении таблицы '{table_name}': {str(e)}")
             return DatabaseErrorHandler.handle_exception(e, f"update_table_data for {table_name}")
 
+    @classmethod
+    @DatabaseErrorHandler()
+    def increment(
+        cls,
+        table_name: str,
+        filters_dict: Dict[str, Any],
+        deltas: Dict[str, Union[int, float, Decimal]],
+    ) -> DatabaseResponse:
+        """
+        Атомарное изменение числовых колонок на величину: SET col = col + :delta ... RETURNING *.
+        Одна команда без предварительного чтения, поэтому параллельные изменения не теряются.
+        Пример: increment("inventory", {"product_id": 1}, {"quantity_in_stock": -3})
+        Колонки с onupdate (inventory.last_updated) обновляются той же командой.
+        Нарушение CHECK (например, check_quantity_in_stock_non_negative) возвращается как
+        ErrorCode.CHECK_CONSTRAINT_VIOLATION, изменения при этом не применяются.
+        Приращение целой колонки должно быть целым (3.0 допустимо), иначе ErrorCode.INVALID_DATA_TYPE
+        """
+        model_response = cls.get_model_by_tablename(table_name)
+        if model_response.status != ResponseStatus.SUCCESS:
+            return model_response
+        model = model_response.data
+        table = model.__table__
+
+        if not filters_dict:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "Фильтры обязательны для операции обновления (безопасность)"
+            )
+        if not isinstance(deltas, dict) or not deltas:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "deltas должен быть непустым словарём {колонка: приращение}"
+            )
+
+        for column_name, delta in deltas.items():
+            if column_name not in table.c:
+                return DatabaseResponse.error(
+                    ErrorCode.COLUMN_NOT_FOUND,
+                    f"Колонка '{column_name}' не найдена в таблице '{table_name}'"
+                )
+            if not isinstance(table.c[column_name].type, (Integer, Numeric)) or table.c[column_name].primary_key:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_COLUMN_TYPE,
+                    f"Колонка '{column_name}' не является изменяемой числовой колонкой"
+                )
+            if isinstance(delta, bool) or not isinstance(delta, (int, float, Decimal)):
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_DATA_TYPE,
+                    f"Приращение для '{column_name}' должно быть числом, получено: {delta!r}"
+                )
+            # Дробное приращение целой колонки Postgres молча округлил бы при присваивании
+            if isinstance(table.c[column_name].type, Integer) and not isinstance(delta, int):
+                if not math.isfinite(delta) or delta != int(delta):
+                    return DatabaseResponse.error(
+                        ErrorCode.INVALID_DATA_TYPE,
+                        f"Приращение для целой колонки '{column_name}' должно быть целым, получено: {delta!r}"
+                    )
+
+        params_response = cls._build_filter_params(filters_dict, table_name)
+        if params_response.status != ResponseStatus.SUCCESS:
+            return params_response
+        params = params_response.data
+        params.update({
+            f"delta_{column_name}": int(delta) if isinstance(table.c[column_name].type, Integer) else delta
+            for column_name, delta in deltas.items()
+        })
+
+        statement_response = cls._statement_cache.get_or_build(
+            ("increment", table_name, tuple(sorted(deltas)), cls._filter_shape(filters_dict)),
+            lambda: cls._build_increment_statement(table_name, model, sorted(deltas), filters_dict)
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            return statement_response
+
+        try:
+            with Database().get_db_session() as session:
+                rows = session.execute(statement_response.data, params).all()
+                cls._invalidate_after_commit(session, table_name)
+
+                updated_rows = cls._rows_to_dicts(rows, [column.name for column in table.columns])
+                return DatabaseResponse.success(
+                    data=updated_rows,
+                    message=f"Изменено {len(updated_rows)} записей в таблице '{table_name}'",
+                    affected_rows=len(updated_rows)
+                )
+
+        except Exception as e:
+            logger.error(f"Ошибка при изменении значений в таблице '{table_name}': {str(e)}")
+            return DatabaseErrorHandler.handle_exception(e, f"increment for {table_name}")
+
     @classmethod
     @DatabaseErrorHandler()
     def delete_from_table(cls, table_name: str, filters_dict: Dict[str, Any]) -> DatabaseResponse:
@@ -883,7 +2797,7 @@ class DatabaseRepository:
         model = model_response.data
 
         # Получаем информацию о колонках
-        columns_response = cls.get_table_columns(table_name)
+        columns_response = cls._get_catalog_columns(table_name)
         if columns_response.status != ResponseStatus.SUCCESS:
             return columns_response
 
@@ -896,25 +2810,21 @@ class DatabaseRepository:
                 "Фильтры обязательны для операции удаления (безопасность)"
             )
 
+        params_response = cls._build_filter_params(filters_dict, table_name)
+        if params_response.status != ResponseStatus.SUCCESS:
+            return params_response
+
+        statement_response = cls._statement_cache.get_or_build(
+            ("delete_from_table", table_name, cls._filter_shape(filters_dict)),
+            lambda: cls._build_delete_statement(table_name, model, filters_dict)
+        )
+        if statement_response.status != ResponseStatus.SUCCESS:
+            return statement_response
+
         try:
             with Database().get_db_session() as session:
-                # Обработка фильтров с поддержкой расширенных операторов
-                joined_models = {table_name: model}
-                filter_conditions = cls._build_filter_conditions(
-                    filters_dict, joined_models, table_name
-                )
-                if filter_conditions.status != ResponseStatus.SUCCESS:
-                    return filter_conditions
-                
-                if not filter_conditions.data:
-                    return DatabaseResponse.error(
-                        ErrorCode.INVALID_FILTER,
-                        "Не удалось построить условия фильтрации"
-                    )
-
-                query = delete(model).where(and_(*filter_conditions.data))
-                result = session.execute(query)
-                session.commit()
+                result = session.execute(statement_response.data, params_response.data)
+                cls._invalidate_after_commit(session, table_name)
 
                 return DatabaseResponse.success(
                     data={"filters": filters_dict},
@@ -925,3 +2835,76 @@ class DatabaseRepository:
         except Exception as e:
             logger.error(f"Ошибка при удалении из таблицы '{table_name}': {str(e)}")
             return DatabaseErrorHandler.handle_exception(e, f"delete_from_table for {table_name}")
+
+    @classmethod
+    def _build_update_statement(
+        cls,
+        table_name: str,
+        model: Any,
+        update_columns: List[str],
+        filters_dict: Dict[str, Any]
+    ) -> DatabaseResponse:
+        """Параметризованный UPDATE: новые значения передаются как value_<колонка>, фильтры как filter_N"""
+        # Сессия на каждый вызов новая, синхронизировать identity map не нужно
+        query = update(model).values({
+            column: bindparam(f"value_{column}") for column in update_columns
+        }).execution_options(synchronize_session=False)
+
+        joined_models = {table_name: model}
+        filter_conditions = cls._build_filter_conditions(
+            filters_dict, joined_models, table_name
+        )
+        if filter_conditions.status != ResponseStatus.SUCCESS:
+            return filter_conditions
+        if filter_conditions.data:
+            query = query.where(and_(*filter_conditions.data))
+
+        return DatabaseResponse.success(data=query)
+
+    @classmethod
+    def _build_increment_statement(
+        cls,
+        table_name: str,
+        model: Any,
+        delta_columns: List[str],
+        filters_dict: Dict[str, Any]
+    ) -> DatabaseResponse:
+        """UPDATE ... SET col = col + delta_<колонка> с фильтрами filter_N, RETURNING всех колонок"""
+        table = model.__table__
+        query = update(model).values({
+            column_name: table.c[column_name] + bindparam(f"delta_{column_name}", type_=table.c[column_name].type)
+            for column_name in delta_columns
+        }).execution_options(synchronize_session=False)
+
+        filter_conditions = cls._build_filter_conditions(filters_dict, {table_name: model}, table_name)
+        if filter_conditions.status != ResponseStatus.SUCCESS:
+            return filter_conditions
+        if filter_conditions.data:
+            query = query.where(and_(*filter_conditions.data))
+
+        return DatabaseResponse.success(data=query.returning(*table.columns))
+
+    @classmethod
+    def _build_delete_statement(
+        cls,
+        table_name: str,
+        model: Any,
+        filters_dict: Dict[str, Any]
+    ) -> DatabaseResponse:
+        """Параметризованный DELETE с условиями filter_N"""
+        # Обработка фильтров с поддержкой расширенных операторов
+        joined_models = {table_name: model}
+        filter_conditions = cls._build_filter_conditions(
+            filters_dict, joined_models, table_name
+        )
+        if filter_conditions.status != ResponseStatus.SUCCESS:
+            return filter_conditions
+
+        if not filter_conditions.data:
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_FILTER,
+                "Не удалось построить условия фильтрации"
+            )
+
+        query = delete(model).where(and_(*filter_conditions.data))
+        return DatabaseResponse.success(data=query.execution_options(synchronize_session=False))
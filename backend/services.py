@@ -1,2 +1,224 @@
 # Осуществляет бизнес-логику: валидация, выполнение сложных операций.
-# Может нахуй удалю за ненадобностью
\ No newline at end of file
+from datetime import date
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import text
+
+from backend.database.database import Database
+from backend.repository import DatabaseRepository
+from backend.utils.database_exception_handler import DatabaseErrorHandler
+from backend.utils.responce_types import DatabaseResponse, ErrorCode, ResponseStatus
+
+logger = logging.getLogger(__name__)
+
+
+# Продажи одной командой: вход — массивы (unnest), поэтому форма запроса не зависит от числа продаж.
+# Остаток уменьшается на суммарный спрос по товару только если его хватает (проверка и списание —
+# одно UPDATE, параллельные продажи не уводят остаток в минус); продажи вставляются для товаров,
+# остаток которых списан, total_price = products.price * количество.
+# Все части WITH видят один снимок, поэтому stock_row содержит остаток до списания —
+# по нему сообщается о нехватке без второго запроса.
+_RECORD_SALES_SQL = text("""
+WITH input AS (
+    SELECT t.ord, t.product_id, t.quantity, coalesce(t.sale_date, CURRENT_DATE) AS sale_date
+    FROM unnest(
+        CAST(:product_ids AS integer[]),
+        CAST(:quantities AS integer[]),
+        CAST(:sale_dates AS date[])
+    ) WITH ORDINALITY AS t(product_id, quantity, sale_date, ord)
+),
+demand AS (
+    SELECT product_id, sum(quantity) AS quantity
+    FROM input
+    GROUP BY product_id
+),
+stock_row AS (
+    -- Запись склада товара: при нескольких записях — с наименьшим inventory_id
+    SELECT DISTINCT ON (product_id) inventory_id, product_id, quantity_in_stock
+    FROM inventory
+    WHERE product_id IN (SELECT product_id FROM demand)
+    ORDER BY product_id, inventory_id
+),
+stock AS (
+    UPDATE inventory AS i
+    SET quantity_in_stock = i.quantity_in_stock - demand.quantity,
+        last_updated = now()
+    FROM demand, stock_row
+    WHERE i.inventory_id = stock_row.inventory_id
+      AND demand.product_id = stock_row.product_id
+      AND i.quantity_in_stock >= demand.quantity
+    RETURNING i.product_id, i.quantity_in_stock
+),
+new_sale AS (
+    -- sale_id берётся из последовательности здесь, рядом с ord: порядок, в котором INSERT ... SELECT
+    -- раздаёт значения по умолчанию, не гарантирован. CTE с nextval вычисляется один раз
+    SELECT
+        nextval(pg_get_serial_sequence('sales', 'sale_id')) AS sale_id,
+        input.ord,
+        input.product_id,
+        input.sale_date,
+        input.quantity,
+        products.price * input.quantity AS total_price
+    FROM input
+    JOIN stock ON stock.product_id = input.product_id
+    JOIN products ON products.product_id = input.product_id
+),
+sale AS (
+    INSERT INTO sales (sale_id, product_id, sale_date, quantity_sold, total_price)
+    SELECT sale_id, product_id, sale_date, quantity, total_price
+    FROM new_sale
+    RETURNING sale_id
+)
+SELECT
+    input.ord,
+    input.product_id,
+    input.quantity,
+    input.sale_date,
+    recorded.sale_id,
+    recorded.total_price,
+    stock.quantity_in_stock AS remaining_stock,
+    stock_row.quantity_in_stock AS available_stock,
+    demand.quantity AS requested_total
+FROM input
+JOIN demand ON demand.product_id = input.product_id
+LEFT JOIN stock ON stock.product_id = input.product_id
+LEFT JOIN stock_row ON stock_row.product_id = input.product_id
+LEFT JOIN (
+    SELECT new_sale.ord, new_sale.sale_id, new_sale.total_price
+    FROM new_sale
+    JOIN sale ON sale.sale_id = new_sale.sale_id
+) AS recorded ON recorded.ord = input.ord
+ORDER BY input.ord
+""")
+
+
+class SalesService:
+    """Операции над продажами, затрагивающие несколько таблиц"""
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def record_sale(
+        cls,
+        product_id: int,
+        quantity: int,
+        sale_date: Optional[Union[date, str]] = None,
+    ) -> DatabaseResponse:
+        """
+        Продажа одной командой: вставка в sales, списание со склада, total_price по products.price.
+        При нехватке остатка продажа не записывается: ErrorCode.INSUFFICIENT_STOCK,
+        в error_details — запрошенное количество и доступный остаток
+        """
+        response = cls.record_sales([
+            {"product_id": product_id, "quantity": quantity, "sale_date": sale_date}
+        ])
+        if response.status == ResponseStatus.ERROR:
+            return response
+
+        sale = response.data["sales"][0]
+        if not sale["recorded"]:
+            return DatabaseResponse.error(
+                ErrorCode.INSUFFICIENT_STOCK,
+                cls._rejection_message(sale),
+                error_details={
+                    "product_id": product_id,
+                    "requested": quantity,
+                    "available": sale["available_stock"]
+                }
+            )
+        return DatabaseResponse.success(
+            data=sale,
+            message=f"Продажа {sale['sale_id']} записана, остаток товара {product_id}: {sale['remaining_stock']}",
+            affected_rows=1
+        )
+
+    @classmethod
+    @DatabaseErrorHandler()
+    def record_sales(cls, sales: List[Dict[str, Any]]) -> DatabaseResponse:
+        """
+        Пакет продаж одной командой: [{"product_id": 1, "quantity": 2, "sale_date": "2024-05-01"}, ...]
+        (sale_date необязательна, по умолчанию — текущая дата).
+        Спрос суммируется по товару: если остатка не хватает на все продажи товара, ни одна из них
+        не записывается, продажи остальных товаров записываются. В ответе по каждой продаже —
+        sale_id, total_price, остаток после списания или доступный остаток при отказе;
+        при отказах статус WARNING
+        """
+        if not isinstance(sales, list) or not sales or not all(isinstance(sale, dict) for sale in sales):
+            return DatabaseResponse.error(
+                ErrorCode.INVALID_PARAMETERS,
+                "sales должен быть непустым списком словарей"
+            )
+        for index, sale in enumerate(sales):
+            product_id, quantity = sale.get("product_id"), sale.get("quantity")
+            if not isinstance(product_id, int) or isinstance(product_id, bool):
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    f"Продажа {index}: product_id должен быть целым числом"
+                )
+            # Отрицательное количество увеличило бы остаток вместо списания
+            if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                return DatabaseResponse.error(
+                    ErrorCode.INVALID_PARAMETERS,
+                    f"Продажа {index}: quantity должно быть положительным целым числом"
+                )
+
+        params = {
+            "product_ids": [sale["product_id"] for sale in sales],
+            "quantities": [sale["quantity"] for sale in sales],
+            "sale_dates": [cls._format_date(sale.get("sale_date")) for sale in sales],
+        }
+
+        try:
+            with Database().get_db_session() as session:
+                rows = session.execute(_RECORD_SALES_SQL, params).mappings().all()
+                Database.after_commit(
+                    session, lambda: DatabaseRepository.invalidate_result_cache("sales", "inventory")
+                )
+        except Exception as e:
+            logger.error(f"Ошибка при записи продаж: {str(e)}")
+            return DatabaseErrorHandler.handle_exception(e, "record_sales")
+
+        results = [
+            {
+                "product_id": row["product_id"],
+                "quantity": row["quantity"],
+                "sale_date": row["sale_date"].isoformat(),
+                "recorded": row["sale_id"] is not None,
+                "sale_id": row["sale_id"],
+                "total_price": row["total_price"],
+                "remaining_stock": row["remaining_stock"],
+                "available_stock": None if row["sale_id"] is not None else row["available_stock"],
+                "requested_total": row["requested_total"],
+            }
+            for row in rows
+        ]
+        recorded = sum(1 for sale in results if sale["recorded"])
+        data = {"sales": results, "recorded": recorded, "rejected": len(results) - recorded}
+
+        if recorded < len(results):
+            rejected_products = sorted({sale["product_id"] for sale in results if not sale["recorded"]})
+            return DatabaseResponse.warning(
+                message=(
+                    f"Записано продаж: {recorded} из {len(results)}; "
+                    f"недостаточно остатка для товаров {rejected_products}"
+                ),
+                data=data
+            )
+        return DatabaseResponse.success(
+            data=data,
+            message=f"Записано продаж: {recorded}",
+            affected_rows=recorded
+        )
+
+    @staticmethod
+    def _format_date(value: Optional[Union[date, str]]) -> Optional[str]:
+        return value.isoformat() if isinstance(value, date) else value
+
+    @staticmethod
+    def _rejection_message(sale: Dict[str, Any]) -> str:
+        if sale["available_stock"] is None:
+            return f"Для товара {sale['product_id']} нет записи на складе"
+        return (
+            f"Недостаточно товара {sale['product_id']} на складе: "
+            f"запрошено {sale['requested_total']}, доступно {sale['available_stock']}"
+        )
@@ -0,0 +1,105 @@
+"""
+Колоночное представление результата запроса: один типизированный массив на колонку.
+
+Целые и вещественные колонки и даты превращаются в массивы NumPy, текст и ENUM кодируются словарём
+(int32-коды + список уникальных значений), остальное остаётся object-массивом — в том числе
+NUMERIC (Decimal), чтобы не терять точность при переводе в float64.
+NumPy — необязательная зависимость: без неё колоночный формат недоступен.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+
+def is_available() -> bool:
+    return np is not None
+
+
+def _python_type(sql_type: Any) -> Any:
+    try:
+        return sql_type.python_type
+    except (NotImplementedError, AttributeError):
+        return object
+
+
+def _dictionary_encode(values: Sequence[Any]) -> Dict[str, Any]:
+    categories: List[Any] = []
+    positions: Dict[Any, int] = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+            continue
+        code = positions.get(value)
+        if code is None:
+            code = positions[value] = len(categories)
+            categories.append(value)
+        codes[i] = code
+    return {"codes": codes, "categories": categories}
+
+
+def _encode_column(values: Sequence[Any], python_type: Any):
+    """Возвращает (массив или словарь-кодировка, название кодировки: plain | dictionary | object)"""
+    has_nulls = any(value is None for value in values)
+
+    if python_type is bool and not has_nulls:
+        return np.fromiter(values, dtype=np.bool_, count=len(values)), "plain"
+
+    if python_type is int and not has_nulls:
+        return np.fromiter(values, dtype=np.int64, count=len(values)), "plain"
+
+    if python_type in (int, float):
+        # NULL в числовых колонках представляется как NaN
+        return np.array(
+            [np.nan if value is None else float(value) for value in values],
+            dtype=np.float64
+        ), "plain"
+
+    if python_type is datetime:
+        return np.array(
+            [np.datetime64("NaT") if value is None else np.datetime64(value, "us") for value in values],
+            dtype="datetime64[us]"
+        ), "plain"
+
+    if python_type is date:
+        return np.array(
+            [np.datetime64("NaT") if value is None else np.datetime64(value, "D") for value in values],
+            dtype="datetime64[D]"
+        ), "plain"
+
+    if python_type is str:
+        return _dictionary_encode(values), "dictionary"
+
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array, "object"
+
+
+def rows_to_columnar(
+    rows: Sequence[Sequence[Any]],
+    output_columns: List[str],
+    sql_types: List[Any]
+) -> Dict[str, Any]:
+    """
+    Транспонирует строки результата в колонки.
+    Возвращает {"row_count", "columns": {имя: массив}, "schema": {имя: {"type", "encoding", "dtype"}}}
+    """
+    width = len(output_columns)
+    transposed = list(zip(*(row[:width] for row in rows))) if rows else [()] * width
+
+    columns: Dict[str, Any] = {}
+    schema: Dict[str, Dict[str, Any]] = {}
+    for name, sql_type, values in zip(output_columns, sql_types, transposed):
+        encoded, encoding = _encode_column(values, _python_type(sql_type))
+        columns[name] = encoded
+        schema[name] = {
+            "type": str(sql_type),
+            "encoding": encoding,
+            "dtype": str(encoded["codes"].dtype if encoding == "dictionary" else encoded.dtype),
+        }
+
+    return {"row_count": len(rows), "columns": columns, "schema": schema}
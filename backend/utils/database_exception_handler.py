@@ -1,6 +1,6 @@
 from functools import wraps
 import time
-from typing import Callable
+from typing import Callable, Optional
 from sqlalchemy.exc import (
     SQLAlchemyError, IntegrityError, DataError, DatabaseError,
     OperationalError, ProgrammingError, InvalidRequestError,
@@ -34,6 +34,21 @@ class DatabaseErrorHandler(ExceptionHandler):
         CheckViolation: ErrorCode.CHECK_CONSTRAINT_VIOLATION,
         StringDataRightTruncation: ErrorCode.DATA_TOO_LONG,
     }
+
+    # Коды SQLSTATE PostgreSQL — одинаковы для psycopg2 и psycopg (ошибки DBAPI без обёртки SQLAlchemy)
+    SQLSTATE_MAPPING = {
+        "23505": ErrorCode.DUPLICATE_KEY,
+        "23503": ErrorCode.FOREIGN_KEY_VIOLATION,
+        "23502": ErrorCode.NULL_VALUE_NOT_ALLOWED,
+        "23514": ErrorCode.CHECK_CONSTRAINT_VIOLATION,
+        "22001": ErrorCode.DATA_TOO_LONG,
+    }
+
+    @staticmethod
+    def sqlstate(e: Exception) -> Optional[str]:
+        """SQLSTATE исходной ошибки драйвера (psycopg2: pgcode, psycopg: sqlstate)"""
+        orig = getattr(e, "orig", None) or e
+        return getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
     
     @classmethod
     def handle_exception(cls, e: Exception, operation: str = "") -> DatabaseResponse:
@@ -42,7 +57,11 @@ class DatabaseErrorHandler(ExceptionHandler):
         logging.error(f"Database error during {operation}: {str(e)}", exc_info=True)
         
         # Определяем тип ошибки и соответствующий код
-        error_code = cls.ERROR_MAPPING.get(type(e), ErrorCode.UNKNOWN_ERROR)
+        error_code = (
+            cls.ERROR_MAPPING.get(type(e))
+            or cls.SQLSTATE_MAPPING.get(cls.sqlstate(e))
+            or ErrorCode.UNKNOWN_ERROR
+        )
         
         # Формируем детальное описание ошибки
         error_details = {
@@ -62,6 +81,11 @@ class DatabaseErrorHandler(ExceptionHandler):
             elif "not null" in str(e).lower():
                 error_code = ErrorCode.NULL_VALUE_NOT_ALLOWED
                 message = "Обязательное поле не может быть пустым"
+            elif cls.sqlstate(e) == "23514" or "check constraint" in str(e).lower():
+                error_code = ErrorCode.CHECK_CONSTRAINT_VIOLATION
+                constraint_name = getattr(getattr(e.orig, "diag", None), "constraint_name", None)
+                error_details["constraint"] = constraint_name
+                message = f"Нарушено ограничение {constraint_name or 'CHECK'}"
             else:
                 message = "Нарушение целостности данных"
         
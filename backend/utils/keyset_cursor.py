@@ -0,0 +1,74 @@
+"""
+Непрозрачные токены продолжения для keyset (seek) пагинации.
+
+Токен хранит значения ключа сортировки последней отданной строки и отпечаток
+"формы" сортировки, чтобы курсор от одного запроса нельзя было применить к другому.
+"""
+import base64
+import hashlib
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+
+class InvalidCursorError(ValueError):
+    """Токен повреждён или не соответствует текущей сортировке"""
+
+
+def cursor_signature(table_name: str, key_spec: Sequence[str]) -> str:
+    """Отпечаток сортировки: таблица + упорядоченный список 'колонка:направление'"""
+    raw = f"{table_name}|{','.join(key_spec)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, time):
+        return {"t": "time", "v": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"t": "decimal", "v": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    kind, raw = value.get("t"), value.get("v")
+    if kind == "datetime":
+        return datetime.fromisoformat(raw)
+    if kind == "date":
+        return date.fromisoformat(raw)
+    if kind == "time":
+        return time.fromisoformat(raw)
+    if kind == "decimal":
+        return Decimal(raw)
+    raise InvalidCursorError(f"Неизвестный тип значения в курсоре: {kind}")
+
+
+def encode_cursor(signature: str, values: Sequence[Any]) -> str:
+    """Упаковывает значения ключа последней строки в urlsafe-base64 токен"""
+    payload = {"s": signature, "k": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token: str, signature: str, key_count: int) -> List[Any]:
+    """Распаковывает токен и проверяет, что он выдан для той же сортировки"""
+    try:
+        raw = base64.urlsafe_b64decode(token.encode("ascii"))
+        payload = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorError(f"Не удалось разобрать курсор: {e}") from e
+
+    if not isinstance(payload, dict) or payload.get("s") != signature:
+        raise InvalidCursorError("Курсор выдан для другой таблицы или сортировки")
+
+    values = payload.get("k")
+    if not isinstance(values, list) or len(values) != key_count:
+        raise InvalidCursorError("Курсор содержит неверное количество значений ключа")
+
+    return [_decode_value(v) for v in values]
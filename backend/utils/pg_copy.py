@@ -0,0 +1,461 @@
+"""
+Вспомогательные функции для COPY в PostgreSQL через psycopg2 (copy_expert).
+
+Экспорт: COPY (SELECT ...) TO STDOUT пишет результат запроса прямо в файл по мере получения,
+память не зависит от числа строк.
+
+Импорт CSV идёт через временную (TEMP, видна только своему соединению и не пишется в WAL)
+промежуточную таблицу с текстовыми колонками: COPY в неё не падает на значениях неверного типа.
+До переноса в целевую таблицу в SQL отбираются строки, которые сорвали бы INSERT:
+значения, не приводимые к типу колонки (pg_input_is_valid в PostgreSQL 16+, на старых версиях —
+временная функция с пробным приведением), нарушения CHECK, ссылки на несуществующие записи
+связанных таблиц и повторы уникальных ключей.
+
+Функции принимают курсор psycopg2 или psycopg 3 (settings.DRIVER): SQL собирается модулем
+sql соответствующего драйвера, COPY идёт через copy_expert или cursor.copy().
+"""
+import csv
+import io
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import psycopg2.sql
+from psycopg2.extensions import encodings
+
+try:
+    import psycopg
+    import psycopg.sql
+except ImportError:  # psycopg 3 нужен только при DB_DRIVER=psycopg
+    psycopg = None
+
+# Размер блока, которым copy_expert читает поток
+COPY_BUFFER_SIZE = 1 << 20
+
+# Служебная колонка промежуточной таблицы: порядковый номер строки данных в файле
+LINE_COLUMN = "_copy_line"
+
+CsvSource = Union[str, Path, IO[str], IO[bytes]]
+
+
+def is_psycopg3(cursor) -> bool:
+    return psycopg is not None and isinstance(cursor, psycopg.Cursor)
+
+
+def _sql(cursor):
+    """Модуль сборки SQL драйвера курсора (API psycopg2.sql и psycopg.sql совпадает)"""
+    if is_psycopg3(cursor):
+        return psycopg.sql
+    if not hasattr(cursor, "copy_expert"):
+        raise NotImplementedError(
+            f"COPY поддерживается драйверами psycopg2 и psycopg, курсор: {type(cursor).__module__}"
+        )
+    return psycopg2.sql
+
+
+def _copy_from(cursor, statement, stream: IO) -> None:
+    if is_psycopg3(cursor):
+        with cursor.copy(statement) as copy:
+            while data := stream.read(COPY_BUFFER_SIZE):
+                copy.write(data)
+    else:
+        cursor.copy_expert(statement.as_string(cursor), stream, size=COPY_BUFFER_SIZE)
+
+
+def _copy_to(cursor, statement, stream: IO) -> None:
+    if is_psycopg3(cursor):
+        with cursor.copy(statement) as copy:
+            for data in copy:
+                stream.write(data)
+    else:
+        cursor.copy_expert(statement.as_string(cursor), stream, size=COPY_BUFFER_SIZE)
+
+
+@contextmanager
+def open_csv_source(source: CsvSource, encoding: str = "utf-8") -> Iterator[IO]:
+    """Путь к файлу открывается (и закрывается) здесь, открытый поток передаётся как есть"""
+    if isinstance(source, (str, Path)):
+        with open(source, encoding=encoding, newline="") as stream:
+            yield stream
+    else:
+        yield source
+
+
+def read_csv_header(stream: IO, delimiter: str = ",", encoding: str = "utf-8") -> List[str]:
+    """Читает из потока первую строку и разбирает её как заголовок CSV; поток остаётся на первой строке данных"""
+    line = stream.readline()
+    if isinstance(line, bytes):
+        line = line.decode(encoding)
+    if not line.strip():
+        return []
+    return [name.strip().lstrip("\ufeff") for name in next(csv.reader(io.StringIO(line), delimiter=delimiter))]
+
+
+def staging_table_name(table_name: str) -> str:
+    return f"_copy_staging_{table_name}_{uuid.uuid4().hex[:8]}"[:63]
+
+
+def create_staging_table(cursor, staging_name: str, columns: Sequence[str]) -> None:
+    """Временная таблица транзакции: все колонки text плюс номер строки"""
+    sql = _sql(cursor)
+    cursor.execute(sql.SQL("CREATE TEMP TABLE {} ({} bigserial, {}) ON COMMIT DROP").format(
+        sql.Identifier(staging_name),
+        sql.Identifier(LINE_COLUMN),
+        sql.SQL(", ").join(sql.SQL("{} text").format(sql.Identifier(column)) for column in columns)
+    ))
+
+
+def drop_staging_table(cursor, staging_name: str) -> None:
+    sql = _sql(cursor)
+    cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(staging_name)))
+
+
+def copy_csv_into(
+    cursor,
+    table_name: str,
+    columns: Sequence[str],
+    stream: IO,
+    delimiter: str = ",",
+    null: str = "",
+) -> int:
+    """COPY ... FROM STDIN потока без заголовка, возвращает число загруженных строк"""
+    sql = _sql(cursor)
+    statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, DELIMITER {}, NULL {})").format(
+        sql.Identifier(table_name),
+        sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        sql.Literal(delimiter),
+        sql.Literal(null),
+    )
+    _copy_from(cursor, statement, stream)
+    return cursor.rowcount
+
+
+# Замена pg_input_is_valid для PostgreSQL < 16: пробное приведение в блоке с перехватом ошибок данных
+# (класс 22: неверный формат числа, даты, значения ENUM, выход за диапазон)
+_INPUT_IS_VALID_FALLBACK = """
+CREATE OR REPLACE FUNCTION pg_temp.copy_input_is_valid(value text, type_name text) RETURNS boolean
+LANGUAGE plpgsql AS $$
+BEGIN
+    EXECUTE format('SELECT %L::%s', value, type_name);
+    RETURN true;
+EXCEPTION WHEN data_exception THEN
+    RETURN false;
+END
+$$
+"""
+
+
+def prepare_input_validation(cursor) -> str:
+    """
+    Имя функции проверки «значение приводится к типу»: pg_input_is_valid (PostgreSQL 16+)
+    или временная pg_temp.copy_input_is_valid, создаваемая здесь (медленнее: подтранзакция на значение)
+    """
+    cursor.execute("SHOW server_version_num")
+    if int(cursor.fetchone()[0]) >= 160000:
+        return "pg_input_is_valid"
+    cursor.execute(_INPUT_IS_VALID_FALLBACK)
+    return "pg_temp.copy_input_is_valid"
+
+
+def reject_invalid_rows(
+    cursor,
+    staging_name: str,
+    column_types: Dict[str, str],
+    required_columns: Sequence[str],
+    input_is_valid: str,
+    sample_limit: int = 100,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Удаляет из промежуточной таблицы строки, которые нельзя привести к типам целевой таблицы
+    или в которых пусты обязательные колонки. input_is_valid — функция из prepare_input_validation.
+    Возвращает (число строк, первые sample_limit с причинами)
+    """
+    sql = _sql(cursor)
+    problems = []
+    for column in required_columns:
+        problems.append((column, sql.SQL("{} IS NULL").format(sql.Identifier("s", column))))
+    for column, type_name in column_types.items():
+        problems.append((column, sql.SQL("NOT {}({}, {})").format(
+            sql.SQL(input_is_valid), sql.Identifier("s", column), sql.Literal(type_name)
+        )))
+    if not problems:
+        return 0, []
+
+    # pg_input_is_valid(NULL, ...) даёт NULL, coalesce превращает это в «проблемы нет»
+    problems = [(column, sql.SQL("coalesce({}, false)").format(condition)) for column, condition in problems]
+    source = sql.SQL("{} AS s").format(sql.Identifier(staging_name))
+    return _delete_rows(cursor, staging_name, _bad_rows(sql, source, problems), sample_limit)
+
+
+def reject_check_violations(
+    cursor,
+    staging_name: str,
+    column_types: Dict[str, str],
+    check_constraints: Dict[str, Sequence[str]],
+    sample_limit: int = 100,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Удаляет строки, нарушающие CHECK целевой таблицы. check_constraints: выражение -> его колонки
+    (все есть в файле). Выражение вычисляется над значениями, приведёнными к типам колонок;
+    как и в PostgreSQL, NULL-результат нарушением не считается.
+    Вызывается после reject_invalid_rows, когда значения приводятся к типу без ошибок
+    """
+    sql = _sql(cursor)
+    if not check_constraints:
+        return 0, []
+
+    problems = [
+        (column, sql.SQL("(({})) IS FALSE").format(sql.SQL(expression)))
+        for expression, columns in check_constraints.items() for column in columns
+    ]
+    # Выражения CHECK ссылаются на колонки без таблицы: подзапрос отдаёт их под теми же именами
+    source = sql.SQL("(SELECT {}, {} FROM {}) AS s").format(
+        sql.Identifier(LINE_COLUMN),
+        sql.SQL(", ").join(
+            sql.SQL("{col}::{type} AS {col}").format(col=sql.Identifier(column), type=sql.SQL(type_name))
+            for column, type_name in column_types.items()
+        ),
+        sql.Identifier(staging_name),
+    )
+    return _delete_rows(cursor, staging_name, _bad_rows(sql, source, problems), sample_limit)
+
+
+def reject_orphan_rows(
+    cursor,
+    staging_name: str,
+    column_types: Dict[str, str],
+    foreign_keys: Dict[str, Tuple[str, str]],
+    sample_limit: int = 100,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Удаляет строки, значения внешних ключей которых отсутствуют в целевых таблицах.
+    foreign_keys: колонка -> (таблица, колонка). Каждая связанная таблица присоединяется
+    LEFT JOIN (hash/merge join за один проход), отсутствие пары — нарушение.
+    Вызывается после reject_invalid_rows, когда значения уже приводятся к типу без ошибок
+    """
+    sql = _sql(cursor)
+    if not foreign_keys:
+        return 0, []
+
+    joins = []
+    problems = []
+    for index, (column, (target_table, target_column)) in enumerate(foreign_keys.items()):
+        alias = f"fk_{index}"
+        joins.append(sql.SQL("LEFT JOIN {target} AS {alias} ON {target_col} = {col}::{type}").format(
+            target=sql.Identifier(target_table),
+            alias=sql.Identifier(alias),
+            target_col=sql.Identifier(alias, target_column),
+            col=sql.Identifier("s", column),
+            type=sql.SQL(column_types[column]),
+        ))
+        # Колонка ссылки — первичный или уникальный ключ, поэтому строка файла не размножается
+        problems.append((column, sql.SQL("({} IS NOT NULL AND {} IS NULL)").format(
+            sql.Identifier("s", column), sql.Identifier(alias, target_column)
+        )))
+
+    source = sql.SQL("{} AS s {}").format(sql.Identifier(staging_name), sql.SQL(" ").join(joins))
+    return _delete_rows(cursor, staging_name, _bad_rows(sql, source, problems), sample_limit)
+
+
+def reject_conflicting_rows(
+    cursor,
+    table_name: str,
+    staging_name: str,
+    column_types: Dict[str, str],
+    unique_keys: Sequence[Sequence[str]],
+    sample_limit: int = 100,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Удаляет строки, ключ которых (первичный или уникальный, все колонки есть в файле) уже есть
+    в целевой таблице или повторяет ключ более ранней строки файла. Строки с NULL в ключе
+    уникальность не нарушают и остаются.
+    Совпадение с таблицей — LEFT JOIN по ключу, повтор в файле — row_number() OVER (PARTITION BY ключ
+    ORDER BY номер строки) > 1: один проход с сортировкой вместо подзапроса на каждую строку
+    """
+    sql = _sql(cursor)
+    if not unique_keys:
+        return 0, []
+
+    def typed(column: str):
+        return sql.SQL("{}::{}").format(sql.Identifier("s", column), sql.SQL(column_types[column]))
+
+    ranks = []
+    joins = []
+    problems = []
+    for index, key in enumerate(unique_keys):
+        alias, rank = f"key_{index}", f"_key_{index}_rank"
+        ranks.append(sql.SQL("row_number() OVER (PARTITION BY {} ORDER BY {}) AS {}").format(
+            sql.SQL(", ").join(typed(column) for column in key),
+            sql.Identifier("s", LINE_COLUMN),
+            sql.Identifier(rank),
+        ))
+        joins.append(sql.SQL("LEFT JOIN {target} AS {alias} ON {match}").format(
+            target=sql.Identifier(table_name),
+            alias=sql.Identifier(alias),
+            match=sql.SQL(" AND ").join(
+                sql.SQL("{} = {}").format(sql.Identifier(alias, column), typed(column)) for column in key
+            ),
+        ))
+        conflict = sql.SQL("({not_null} AND ({found} IS NOT NULL OR {rank} > 1))").format(
+            not_null=sql.SQL(" AND ").join(
+                sql.SQL("{} IS NOT NULL").format(sql.Identifier("s", column)) for column in key
+            ),
+            found=sql.Identifier(alias, key[0]),
+            rank=sql.Identifier("s", rank),
+        )
+        problems.extend((column, conflict) for column in key)
+
+    source = sql.SQL("(SELECT s.*, {} FROM {} AS s) AS s {}").format(
+        sql.SQL(", ").join(ranks), sql.Identifier(staging_name), sql.SQL(" ").join(joins)
+    )
+    return _delete_rows(cursor, staging_name, _bad_rows(sql, source, problems), sample_limit)
+
+
+def _bad_rows(sql, source, problems: Sequence[Tuple[str, Any]]):
+    """
+    Запрос отбракованных строк: номер строки (line) и колонки-причины (bad_columns).
+    source — FROM с псевдонимом s, problems — пары (колонка, условие нарушения)
+    """
+    # Условие, общее для нескольких колонок (ключ, CHECK), входит в WHERE один раз
+    conditions = list({id(condition): condition for _, condition in problems}.values())
+    return sql.SQL("SELECT {line} AS line, array_remove(ARRAY[{bad_columns}], NULL) AS bad_columns "
+                   "FROM {source} WHERE {condition}").format(
+        line=sql.Identifier("s", LINE_COLUMN),
+        bad_columns=sql.SQL(", ").join(
+            sql.SQL("CASE WHEN {} THEN {} END").format(condition, sql.Literal(column))
+            for column, condition in problems
+        ),
+        source=source,
+        condition=sql.SQL(" OR ").join(conditions),
+    )
+
+
+def _delete_rows(cursor, staging_name: str, bad_rows, sample_limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Удаляет строки, отобранные запросом bad_rows, одним DELETE ... USING. Число удалённых строк
+    считается в том же запросе, клиенту возвращаются только первые sample_limit строк с причинами
+    """
+    sql = _sql(cursor)
+    cursor.execute(sql.SQL(
+        "WITH deleted AS (DELETE FROM {staging} USING ({bad_rows}) AS bad WHERE {staging_line} = bad.line "
+        "RETURNING bad.line, bad.bad_columns) "
+        "SELECT line, bad_columns, (SELECT count(*) FROM deleted) FROM deleted ORDER BY line LIMIT {limit}"
+    ).format(
+        staging=sql.Identifier(staging_name),
+        bad_rows=bad_rows,
+        staging_line=sql.Identifier(staging_name, LINE_COLUMN),
+        # Хотя бы одна строка, чтобы получить число удалённых при sample_limit=0
+        limit=sql.Literal(max(sample_limit, 1)),
+    ))
+    rows = cursor.fetchall()
+    if not rows:
+        return 0, []
+    # +1: первая строка файла — заголовок
+    sample = [{"line": line + 1, "columns": sorted(set(columns))} for line, columns, _ in rows[:sample_limit]]
+    return rows[0][2], sample
+
+
+def merge_staging(
+    cursor,
+    table_name: str,
+    staging_name: str,
+    column_types: Dict[str, str],
+    skip_conflicts: bool = False,
+) -> int:
+    """INSERT INTO target SELECT с приведением типов в порядке строк файла, возвращает число вставленных строк"""
+    sql = _sql(cursor)
+    columns = list(column_types)
+    statement = sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} ORDER BY {}").format(
+        sql.Identifier(table_name),
+        sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        sql.SQL(", ").join(
+            sql.SQL("{}::{}").format(sql.Identifier(column), sql.SQL(column_types[column]))
+            for column in columns
+        ),
+        sql.Identifier(staging_name),
+        sql.Identifier(LINE_COLUMN),
+    )
+    if skip_conflicts:
+        statement = sql.SQL("{} ON CONFLICT DO NOTHING").format(statement)
+    cursor.execute(statement)
+    return cursor.rowcount
+
+
+def inline_params(cursor, query_sql: str, params: Dict[str, Any]) -> str:
+    """Подставляет значения параметров в SQL средствами драйвера (COPY не принимает параметры)"""
+    if is_psycopg3(cursor):
+        # Курсор psycopg 3 передаёт параметры отдельно, подстановку на клиенте делает ClientCursor
+        return psycopg.ClientCursor(cursor.connection).mogrify(query_sql, params)
+    return cursor.mogrify(query_sql, params).decode(encodings[cursor.connection.encoding])
+
+
+def copy_query_to(
+    cursor,
+    query_sql: str,
+    stream: IO,
+    export_format: str = "csv",
+    delimiter: str = ",",
+    header: bool = True,
+) -> None:
+    """COPY (запрос) TO STDOUT в поток; query_sql — готовый SQL с подставленными значениями"""
+    sql = _sql(cursor)
+    if export_format == "binary":
+        options = sql.SQL("FORMAT binary")
+    else:
+        options = sql.SQL("FORMAT csv, DELIMITER {}, HEADER {}").format(
+            sql.Literal(delimiter), sql.SQL("true" if header else "false")
+        )
+    statement = sql.SQL("COPY ({}) TO STDOUT WITH ({})").format(sql.SQL(query_sql), options)
+    _copy_to(cursor, statement, stream)
+
+
+class ProgressWriter:
+    """
+    Обёртка над потоком записи для COPY TO: считает байты и, при count_lines=True (CSV), строки
+    по символам перевода строки — независимо от того, какими порциями пишет драйвер.
+    Перевод строки внутри значения в кавычках тоже засчитывается, поэтому число строк по ходу
+    выгрузки — оценка. Не чаще every_seconds вызывает callback(строк или None, байт)
+    """
+
+    def __init__(
+        self,
+        stream: IO,
+        callback: Optional[Callable[[Optional[int], int], None]] = None,
+        every_seconds: float = 0.2,
+        count_lines: bool = True,
+    ):
+        self.stream = stream
+        self.callback = callback
+        self.every_seconds = every_seconds
+        self.count_lines = count_lines
+        self.lines = 0
+        self.bytes_written = 0
+        self._last_report = time.monotonic()
+
+    def write(self, data) -> int:
+        if isinstance(data, memoryview):  # порции psycopg 3
+            data = data.tobytes()
+        self.stream.write(data)
+        self.bytes_written += len(data)
+        if self.count_lines:
+            self.lines += data.count(b"\n" if isinstance(data, bytes) else "\n")
+        if self.callback is not None:
+            now = time.monotonic()
+            if now - self._last_report >= self.every_seconds:
+                self._last_report = now
+                self.callback(self.lines if self.count_lines else None, self.bytes_written)
+        return len(data)
+
+
+def column_type_names(table, dialect, columns: Optional[Sequence[str]] = None) -> Dict[str, str]:
+    """Имена типов колонок SQLAlchemy-таблицы в синтаксисе PostgreSQL (для приведения типов)"""
+    names = {}
+    for column_name in (columns if columns is not None else [column.name for column in table.columns]):
+        try:
+            names[column_name] = table.c[column_name].type.compile(dialect=dialect)
+        except Exception:
+            # Тип без представления в диалекте (например, NullType отражённой таблицы)
+            names[column_name] = "text"
+    return names
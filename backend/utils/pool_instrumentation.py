@@ -0,0 +1,169 @@
+"""
+Статистика пула соединений движка: занятые соединения и переполнение, время ожидания
+соединения из пула, время установки новых соединений (гистограммы), исчерпания пула.
+
+Ожидание замеряется в InstrumentedQueuePool (poolclass движка): очередь пула не даёт события
+«запрошено соединение», поэтому замеряется получение соединения целиком — ожидание свободного
+и, если пул не заполнен, установка нового.
+"""
+import bisect
+import logging
+import time
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы интервалов гистограмм, мс
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class LatencyHistogram:
+    """Число замеров по интервалам LATENCY_BUCKETS_MS, сумма и максимум"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self._buckets = buckets
+        self._counts: List[int] = [0] * (len(buckets) + 1)
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+
+    def observe(self, duration_ms: float) -> None:
+        self._counts[bisect.bisect_left(self._buckets, duration_ms)] += 1
+        self._total_ms += duration_ms
+        self._max_ms = max(self._max_ms, duration_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        count = sum(self._counts)
+        histogram = {f"<={bound:g}": n for bound, n in zip(self._buckets, self._counts)}
+        histogram[f">{self._buckets[-1]:g}"] = self._counts[-1]
+        return {
+            "count": count,
+            "avg_ms": round(self._total_ms / count, 3) if count else 0.0,
+            "max_ms": round(self._max_ms, 3),
+            "histogram": histogram,
+        }
+
+
+class PoolStats:
+    """Накопленные счётчики пула (общие для пересоздаваемых экземпляров пула одного движка)"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.wait = LatencyHistogram()
+        self.connect = LatencyHistogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        # Слушатели установлены (PoolInstrumentation.install)
+        self.installed = False
+
+    def record_wait(self, duration_ms: float, timed_out: bool = False) -> None:
+        """Время получения соединения; неудачные ожидания (таймаут) тоже попадают в гистограмму"""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait.observe(duration_ms)
+
+    def record_connect(self, duration_ms: float) -> None:
+        with self._lock:
+            self.connect.observe(duration_ms)
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "wait_ms": self.wait.snapshot(),
+                "connect_ms": self.connect.snapshot(),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool, замеряющий время получения соединения и считающий исчерпания пула"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # engine.dispose() и сброс после потери соединения пересоздают пул — счётчики сохраняются
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait((time.perf_counter() - started) * 1000, timed_out=True)
+            logger.warning(f"Пул соединений исчерпан: {PoolInstrumentation.pool_state(self)}")
+            raise
+        self.stats.record_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+
+class PoolInstrumentation:
+    """Слушатели событий пула и снимок его состояния"""
+
+    @classmethod
+    def install(cls, engine: Engine) -> None:
+        """
+        Замер установки соединений и учёт сброшенных соединений для пула InstrumentedQueuePool
+        (повторный вызов для того же движка ничего не делает)
+        """
+        stats = getattr(engine.pool, "stats", None)
+        if stats is None or stats.installed:
+            return
+        stats.installed = True
+
+        def before_connect(dialect, connection_record, cargs, cparams):
+            connection_record.info["connect_started_at"] = time.perf_counter()
+
+        def after_connect(dbapi_connection, connection_record):
+            started = connection_record.info.pop("connect_started_at", None)
+            if started is not None:
+                stats.record_connect((time.perf_counter() - started) * 1000)
+
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            stats.record_invalidation()
+
+        event.listen(engine, "do_connect", before_connect)
+        event.listen(engine, "connect", after_connect)
+        event.listen(engine, "invalidate", on_invalidate)
+
+    @classmethod
+    def snapshot(cls, engine: Engine) -> Dict[str, Any]:
+        """Текущее состояние пула и накопленная статистика"""
+        pool = engine.pool
+        state = cls.pool_state(pool)
+        stats = getattr(pool, "stats", None)
+        if stats is not None:
+            state.update(stats.snapshot())
+        return state
+
+    @staticmethod
+    def pool_state(pool) -> Dict[str, Any]:
+        if not isinstance(pool, QueuePool):
+            return {"pool_class": type(pool).__name__}
+        return {
+            "pool_class": type(pool).__name__,
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # Отрицательное значение — сколько соединений ещё можно открыть до pool_size
+            "overflow": pool.overflow(),
+        }
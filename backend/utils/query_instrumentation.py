@@ -0,0 +1,188 @@
+"""
+Инструментирование SQL-запросов движка: текст, форма параметров, длительность и число строк.
+
+Включается и настраивается через backend.settings (QUERY_LOG_*), значения читаются при
+каждом запросе, поэтому их можно менять во время работы приложения (QueryInstrumentation.configure).
+Запросы дольше QUERY_LOG_SLOW_THRESHOLD_MS пишутся в ротируемый файл; для SELECT дополнительно
+снимается план EXPLAIN (с QUERY_LOG_EXPLAIN_ANALYZE — EXPLAIN (ANALYZE, BUFFERS), запрос выполняется повторно).
+"""
+import logging
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import Engine, event
+
+from backend import settings
+
+logger = logging.getLogger(__name__)
+
+
+def bind_shape(parameters: Any) -> Any:
+    """Форма параметров без значений: имя -> тип (для executemany — число наборов и форма первого)"""
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return {"executemany": len(parameters), "row": bind_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class QueryInstrumentation:
+    """Слушатель событий before/after_cursor_execute с журналом последних запросов"""
+
+    _records: Deque[Dict[str, Any]] = deque(maxlen=settings.QUERY_LOG_MAX_RECORDS)
+    _lock = Lock()
+    _slow_logger: Optional[logging.Logger] = None
+
+    @classmethod
+    def install(cls, engine: Engine) -> None:
+        """Подключает слушателей к движку (повторный вызов для того же движка ничего не делает)"""
+        if event.contains(engine, "before_cursor_execute", cls._before_cursor_execute):
+            return
+        event.listen(engine, "before_cursor_execute", cls._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", cls._after_cursor_execute)
+        event.listen(engine, "handle_error", cls._handle_error)
+
+    @classmethod
+    def configure(
+        cls,
+        enabled: Optional[bool] = None,
+        slow_threshold_ms: Optional[float] = None,
+        explain: Optional[bool] = None,
+        explain_analyze: Optional[bool] = None,
+        max_records: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Изменение настроек журнала во время работы (None — без изменений); возвращает текущие настройки"""
+        if slow_threshold_ms is not None and slow_threshold_ms < 0:
+            raise ValueError("slow_threshold_ms не может быть отрицательным")
+        if max_records is not None and max_records <= 0:
+            raise ValueError("max_records должен быть положительным")
+        if enabled is not None:
+            settings.QUERY_LOG_ENABLED = enabled
+        if slow_threshold_ms is not None:
+            settings.QUERY_LOG_SLOW_THRESHOLD_MS = slow_threshold_ms
+        if explain is not None:
+            settings.QUERY_LOG_EXPLAIN = explain
+        if explain_analyze is not None:
+            settings.QUERY_LOG_EXPLAIN_ANALYZE = explain_analyze
+        if max_records is not None:
+            with cls._lock:
+                settings.QUERY_LOG_MAX_RECORDS = max_records
+                cls._records = deque(cls._records, maxlen=max_records)
+        return {
+            "enabled": settings.QUERY_LOG_ENABLED,
+            "slow_threshold_ms": settings.QUERY_LOG_SLOW_THRESHOLD_MS,
+            "explain": settings.QUERY_LOG_EXPLAIN,
+            "explain_analyze": settings.QUERY_LOG_EXPLAIN_ANALYZE,
+            "max_records": settings.QUERY_LOG_MAX_RECORDS,
+        }
+
+    @classmethod
+    def records(cls) -> List[Dict[str, Any]]:
+        with cls._lock:
+            return list(cls._records)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._records.clear()
+
+    @classmethod
+    def _before_cursor_execute(cls, conn, cursor, statement, parameters, context, executemany):
+        if settings.QUERY_LOG_ENABLED:
+            conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @classmethod
+    def _handle_error(cls, exception_context) -> None:
+        # Запрос завершился ошибкой: after_cursor_execute не вызывается, отметка начала снимается здесь
+        conn = exception_context.connection
+        if conn is not None and exception_context.execution_context is not None:
+            started = conn.info.get("query_started_at")
+            if started:
+                started.pop()
+
+    @classmethod
+    def _after_cursor_execute(cls, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started_at")
+        if not started:
+            return
+        duration_ms = (time.perf_counter() - started.pop()) * 1000
+
+        record = {
+            "sql": statement,
+            "bind_shape": bind_shape(parameters),
+            "duration_ms": round(duration_ms, 3),
+            "row_count": cursor.rowcount,
+            "executemany": executemany,
+            "timestamp": time.time(),
+        }
+        with cls._lock:
+            cls._records.append(record)
+        logger.debug(f"SQL {duration_ms:.1f} мс, строк: {cursor.rowcount}: {statement}")
+
+        if duration_ms >= settings.QUERY_LOG_SLOW_THRESHOLD_MS:
+            if settings.QUERY_LOG_EXPLAIN and not executemany and cls._is_select(statement):
+                record["plan"] = cls._explain(conn.connection, statement, parameters)
+            cls._log_slow(record)
+
+    @staticmethod
+    def _is_select(statement: str) -> bool:
+        # EXPLAIN ANALYZE (QUERY_LOG_EXPLAIN_ANALYZE) выполняет запрос повторно, поэтому только для чтения
+        return statement.lstrip().upper().startswith("SELECT")
+
+    @classmethod
+    def _explain(cls, dbapi_connection, statement: str, parameters: Any) -> Optional[str]:
+        """
+        EXPLAIN (с QUERY_LOG_EXPLAIN_ANALYZE — ANALYZE, BUFFERS) в точке сохранения,
+        чтобы ошибка не прервала транзакцию вызывающего.
+        dbapi_connection — соединение пула (для асинхронного движка — адаптер с синхронным API)
+        """
+        explain_cursor = dbapi_connection.cursor()
+        try:
+            explain_cursor.execute("SAVEPOINT query_log_explain")
+            try:
+                options = "(ANALYZE, BUFFERS) " if settings.QUERY_LOG_EXPLAIN_ANALYZE else ""
+                explain_cursor.execute(f"EXPLAIN {options}{statement}", parameters)
+                plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+                explain_cursor.execute("RELEASE SAVEPOINT query_log_explain")
+                return plan
+            except Exception as e:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT query_log_explain")
+                logger.warning(f"Не удалось получить план запроса: {e}")
+                return None
+        except Exception as e:
+            # Например, соединение в режиме autocommit без открытой транзакции
+            logger.warning(f"EXPLAIN для медленного запроса пропущен: {e}")
+            return None
+        finally:
+            explain_cursor.close()
+
+    @classmethod
+    def _log_slow(cls, record: Dict[str, Any]) -> None:
+        if cls._slow_logger is None:
+            cls._slow_logger = cls._create_slow_logger()
+        message = (
+            f"{record['duration_ms']:.1f} мс, строк: {record['row_count']}, "
+            f"параметры: {record['bind_shape']}\n{record['sql']}"
+        )
+        if record.get("plan"):
+            message += f"\n{record['plan']}"
+        cls._slow_logger.warning(message)
+
+    @staticmethod
+    def _create_slow_logger() -> logging.Logger:
+        slow_logger = logging.getLogger("backend.slow_queries")
+        slow_logger.propagate = False
+        handler = RotatingFileHandler(
+            settings.QUERY_LOG_SLOW_FILE_PATH,
+            maxBytes=settings.QUERY_LOG_SLOW_FILE_MAX_BYTES,
+            backupCount=settings.QUERY_LOG_SLOW_FILE_BACKUPS,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        slow_logger.addHandler(handler)
+        return slow_logger
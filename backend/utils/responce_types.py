@@ -32,9 +32,14 @@ class ErrorCode(Enum):
     FOREIGN_KEY_VIOLATION = "FOREIGN_KEY_VIOLATION"
     CHECK_CONSTRAINT_VIOLATION = "CHECK_CONSTRAINT_VIOLATION"
 
+    # Business rule errors
+    INSUFFICIENT_STOCK = "INSUFFICIENT_STOCK"
+
     # Query errors
     INVALID_FILTER = "INVALID_FILTER"
     INVALID_ORDER_BY = "INVALID_ORDER_BY"
+    INVALID_JOIN_CONDITION = "INVALID_JOIN_CONDITION"
+    INVALID_CURSOR = "INVALID_CURSOR"
     QUERY_SYNTAX_ERROR = "QUERY_SYNTAX_ERROR"
     QUERY_TIMEOUT = "QUERY_TIMEOUT"
 
@@ -57,6 +62,7 @@ class DatabaseResponse:
     error_code: Optional[ErrorCode] = None
     error_details: Optional[Dict[str, Any]] = None
     affected_rows: Optional[int] = None
+    meta: Optional[Dict[str, Any]] = None  # Служебные сведения (курсор пагинации и т.п.)
 
     def to_dict(self) -> Dict[str, Any]:
         """Преобразование в словарь для отправки на фронтенд"""
@@ -80,6 +86,9 @@ class DatabaseResponse:
         if self.affected_rows is not None:
             result["affected_rows"] = self.affected_rows
 
+        if self.meta:
+            result["meta"] = self.meta
+
         return result
 
     def to_json(self) -> str:
@@ -87,12 +96,19 @@ class DatabaseResponse:
         return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
 
     @classmethod
-    def success(cls, data: Any = None, message: str = "Операция выполнена успешно", affected_rows: Optional[int] = None):
+    def success(
+        cls,
+        data: Any = None,
+        message: str = "Операция выполнена успешно",
+        affected_rows: Optional[int] = None,
+        meta: Optional[Dict[str, Any]] = None
+    ):
         return cls(
             status=ResponseStatus.SUCCESS,
             data=data,
             message=message,
-            affected_rows=affected_rows
+            affected_rows=affected_rows,
+            meta=meta
         )
 
     @classmethod
@@ -0,0 +1,176 @@
+"""
+Кэш результатов чтения в памяти процесса с версионированием таблиц.
+
+Каждая запись помнит таблицы, из которых она прочитана. Запись в таблицу
+(invalidate_table) удаляет все зависящие от неё записи и увеличивает версию таблицы;
+результат чтения, начатого до записи, по версии распознаётся как устаревший и не кэшируется.
+Размер ограничен числом записей (LRU) и временем жизни (TTL).
+
+Инвалидация видит только записи через этот процесс: изменения из других процессов
+и приложений становятся видны не позже чем через TTL. Хранятся и выдаются копии
+результатов (copy_result), поэтому изменение полученного ответа не портит кэш.
+"""
+import dataclasses
+import sys
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from enum import Enum
+from threading import Lock
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """Приблизительный объём памяти значения в байтах (рекурсивно по контейнерам)"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    nbytes = getattr(value, "nbytes", None)  # массивы NumPy
+    if isinstance(nbytes, int):
+        return sys.getsizeof(value) + nbytes
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in value)
+    elif hasattr(value, "__dict__") and not isinstance(value, (Enum, type)):
+        size += estimate_size(vars(value), _seen)
+    return size
+
+
+# Значения, которые можно не копировать
+_IMMUTABLE_TYPES = frozenset({
+    type(None), bool, int, float, complex, str, bytes, Decimal, date, datetime, dt_time, timedelta
+})
+
+
+def copy_result(value: Any) -> Any:
+    """
+    Копия результата: контейнеры (dict, list, set, tuple, dataclass, массивы NumPy) копируются
+    рекурсивно, неизменяемые значения остаются общими. Быстрее copy.deepcopy на списках строк
+    """
+    value_type = type(value)
+    if value_type in _IMMUTABLE_TYPES or isinstance(value, Enum):
+        return value
+    if value_type is dict:
+        return {
+            key: item if type(item) in _IMMUTABLE_TYPES else copy_result(item)
+            for key, item in value.items()
+        }
+    if value_type is list:
+        return [item if type(item) in _IMMUTABLE_TYPES else copy_result(item) for item in value]
+    if isinstance(value, tuple):
+        return value_type(copy_result(item) for item in value) if value_type is tuple else value
+    if isinstance(value, (set, frozenset)):
+        return value_type(copy_result(item) for item in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.replace(value, **{
+            field.name: copy_result(getattr(value, field.name))
+            for field in dataclasses.fields(value) if field.init
+        })
+    if isinstance(getattr(value, "nbytes", None), int) and hasattr(value, "copy"):  # массивы NumPy
+        return value.copy()
+    if isinstance(value, dict):
+        return value_type((key, copy_result(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return value_type(copy_result(item) for item in value)
+    return value
+
+
+class ResultCache:
+    """LRU + TTL кэш результатов, инвалидируемый по именам таблиц"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        # key -> (value, таблицы, время записи, размер)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, FrozenSet[str], float, int]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """Версии таблиц на момент начала чтения; передаются в put"""
+        with self._lock:
+            return tuple(sorted((table, self._versions.get(table, 0)) for table in set(tables)))
+
+    def get(self, key: Hashable) -> Any:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, _, stored_at, _ = entry
+            if time.monotonic() - stored_at > self.ttl:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy_result(value)
+
+    def put(self, key: Hashable, value: Any, snapshot: Tuple[Tuple[str, int], ...]) -> bool:
+        """Сохраняет результат, если ни одна из его таблиц не менялась с момента snapshot"""
+        if not self.enabled:
+            return False
+        value = copy_result(value)
+        size = estimate_size(value)
+        with self._lock:
+            if any(self._versions.get(table, 0) != version for table, version in snapshot):
+                return False
+            if key in self._entries:
+                self._drop(key)
+            tables = frozenset(table for table, _ in snapshot)
+            self._entries[key] = (value, tables, time.monotonic(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            return True
+
+    def invalidate_table(self, table_name: str) -> int:
+        """Удаляет записи, прочитанные из таблицы, и повышает её версию. Возвращает число удалённых записей"""
+        with self._lock:
+            self._versions[table_name] = self._versions.get(table_name, 0) + 1
+            stale = [key for key, entry in self._entries.items() if table_name in entry[1]]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += 1
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "bytes": self._bytes,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, _, size = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,230 @@
+"""
+Неизменяемый каталог схемы, собираемый один раз из декларативных моделей
+и (опционально) отражённой живой схемы.
+
+Хранит для каждой таблицы модель, описание колонок (типы, внешние ключи, ENUM-значения,
+check constraints), граф связей по внешним ключам и колонку для отображения записей.
+Все обращения — поиск по словарю, без обхода Base.registry.mappers на каждый вызов.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import CheckConstraint, TextClause
+from sqlalchemy import Enum as SQLEnum
+
+from backend.utils.schema_reflection import build_model, mentions_column
+
+# Кандидаты на колонку для отображения записи связанной таблицы (в порядке приоритета)
+DISPLAY_COLUMN_CANDIDATES = ("name", "title", "label", "model", "type", "flavor")
+
+
+@dataclass(frozen=True)
+class TableInfo:
+    """Описание одной таблицы каталога"""
+    name: str
+    model: type
+    columns: Mapping[str, Mapping[str, Any]]
+    check_constraints: Tuple[str, ...]
+    related_tables: Mapping[str, Mapping[str, Any]]
+    display_column: str
+
+    def column(self, column_name: str) -> Optional[Mapping[str, Any]]:
+        return self.columns.get(column_name)
+
+    def columns_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Изменяемая копия описания колонок в формате get_table_columns"""
+        return {
+            name: {
+                **info,
+                'foreign_keys': [dict(fk) for fk in info['foreign_keys']],
+                'check_constraints': list(info['check_constraints']),
+                'enum_values': list(info['enum_values']) if info['enum_values'] is not None else None,
+            }
+            for name, info in self.columns.items()
+        }
+
+
+class SchemaCatalog:
+    """Каталог таблиц: имя таблицы -> TableInfo"""
+
+    def __init__(self, tables: Dict[str, TableInfo]):
+        self._tables: Mapping[str, TableInfo] = MappingProxyType(dict(tables))
+        self._table_names: Tuple[str, ...] = tuple(tables)
+
+    @classmethod
+    def build(cls, base, reflected: Optional[Dict[str, Dict[str, Any]]] = None) -> "SchemaCatalog":
+        """
+        Собирает каталог по всем моделям декларативной базы.
+        reflected — описание живой схемы (schema_reflection.load_schema): таблицы из него,
+        для которых нет модели (например, созданные только миграциями), добавляются в каталог
+        """
+        models = {mapper.class_.__tablename__: mapper.class_ for mapper in base.registry.mappers}
+        columns_by_table = {table_name: build_columns_info(model) for table_name, model in models.items()}
+        check_constraints_by_table = {
+            table_name: _table_check_constraints(model) for table_name, model in models.items()
+        }
+
+        for table_name, description in (reflected or {}).items():
+            if table_name in models:
+                continue
+            model = build_model(table_name, description)
+            if model is None:
+                continue
+            models[table_name] = model
+            columns_by_table[table_name] = {
+                name: {key: value for key, value in info.items() if key != 'type_spec'}
+                for name, info in description['columns'].items()
+            }
+            check_constraints_by_table[table_name] = list(description['check_constraints'])
+
+        related_by_table = _build_related_tables(columns_by_table)
+
+        tables = {}
+        for table_name, model in models.items():
+            columns = columns_by_table[table_name]
+            tables[table_name] = TableInfo(
+                name=table_name,
+                model=model,
+                columns=MappingProxyType({name: _freeze_column(info) for name, info in columns.items()}),
+                check_constraints=tuple(check_constraints_by_table[table_name]),
+                related_tables=_freeze_related(related_by_table[table_name]),
+                display_column=choose_display_column(columns),
+            )
+        return cls(tables)
+
+    def table(self, table_name: str) -> Optional[TableInfo]:
+        return self._tables.get(table_name)
+
+    def model(self, table_name: str) -> Optional[type]:
+        info = self._tables.get(table_name)
+        return info.model if info is not None else None
+
+    def table_names(self) -> List[str]:
+        return list(self._table_names)
+
+    def __contains__(self, table_name: object) -> bool:
+        return table_name in self._tables
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+
+def _table_check_constraints(model) -> List[str]:
+    constraints = []
+    for constraint in model.__table__.constraints:
+        if isinstance(constraint, CheckConstraint):
+            constraints.append(
+                str(constraint.sqltext) if isinstance(constraint.sqltext, TextClause)
+                else str(constraint.sqltext.compile())
+            )
+    return constraints
+
+
+def build_columns_info(model) -> Dict[str, Dict[str, Any]]:
+    """Описание колонок модели: типы, внешние ключи, enum-значения и ограничения"""
+    # Собираем check constraints на уровне таблицы
+    table_check_constraints: Dict[str, List[str]] = {}
+    for sql_text in _table_check_constraints(model):
+        for col in model.__table__.columns:
+            if mentions_column(sql_text, col.name):
+                table_check_constraints.setdefault(col.name, []).append(sql_text)
+
+    columns_info: Dict[str, Dict[str, Any]] = {}
+    for column in model.__table__.columns:
+        col_info = {
+            'name': column.name,
+            'type': str(column.type),
+            'nullable': column.nullable,
+            'primary_key': column.primary_key,
+            'default': None,
+            'foreign_keys': [],
+            'check_constraints': table_check_constraints.get(column.name, []),
+            'enum_values': None
+        }
+
+        # Обработка default
+        if column.default is not None:
+            if hasattr(column.default, 'arg'):
+                col_info['default'] = str(column.default.arg)
+            else:
+                col_info['default'] = str(column.default)
+
+        # Обработка foreign keys
+        for fk in column.foreign_keys:
+            col_info['foreign_keys'].append({
+                'target_table': fk.column.table.name,
+                'target_column': fk.column.name
+            })
+
+        # Обработка Enum
+        if isinstance(column.type, SQLEnum) and column.type.enums:
+            col_info['enum_values'] = list(column.type.enums)
+
+        columns_info[column.name] = col_info
+
+    return columns_info
+
+
+def _build_related_tables(columns_by_table: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Граф связей: для каждой таблицы исходящие и входящие внешние ключи (формат get_related_tables)"""
+    related: Dict[str, Dict[str, Dict[str, Any]]] = {table_name: {} for table_name in columns_by_table}
+
+    # Сначала исходящие связи, затем входящие — как в прежнем get_related_tables
+    for source_table, columns in columns_by_table.items():
+        for column_name, info in columns.items():
+            for fk in info['foreign_keys']:
+                related[source_table].setdefault(
+                    fk['target_table'], {'relationship_type': 'outgoing', 'columns': []}
+                )['columns'].append({
+                    'source_column': column_name,
+                    'target_column': fk['target_column']
+                })
+
+    for source_table, columns in columns_by_table.items():
+        for column_name, info in columns.items():
+            for fk in info['foreign_keys']:
+                target_table = fk['target_table']
+                if target_table == source_table or target_table not in related:
+                    continue
+                related[target_table].setdefault(
+                    source_table, {'relationship_type': 'incoming', 'columns': []}
+                )['columns'].append({
+                    'source_column': column_name,
+                    'target_column': fk['target_column']
+                })
+
+    return related
+
+
+def choose_display_column(columns: Mapping[str, Mapping[str, Any]]) -> str:
+    """Колонка для отображения записи: первый текстовый кандидат, затем первая TEXT-колонка, затем первая колонка"""
+    for candidate in DISPLAY_COLUMN_CANDIDATES:
+        if candidate in columns:
+            col_type = (columns[candidate].get("type") or "").upper()
+            if any(t in col_type for t in ("TEXT", "VARCHAR", "CHAR", "STRING")):
+                return candidate
+
+    for name, info in columns.items():
+        if "TEXT" in (info.get("type") or "").upper():
+            return name
+    return next(iter(columns), "id")
+
+
+def _freeze_column(info: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType({
+        **info,
+        'foreign_keys': tuple(MappingProxyType(dict(fk)) for fk in info['foreign_keys']),
+        'check_constraints': tuple(info['check_constraints']),
+        'enum_values': tuple(info['enum_values']) if info['enum_values'] is not None else None,
+    })
+
+
+def _freeze_related(related: Dict[str, Dict[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    return MappingProxyType({
+        table_name: MappingProxyType({
+            'relationship_type': relation['relationship_type'],
+            'columns': tuple(MappingProxyType(column) for column in relation['columns']),
+        })
+        for table_name, relation in related.items()
+    })
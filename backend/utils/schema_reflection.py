@@ -0,0 +1,266 @@
+"""
+Отражение живой схемы БД с сохранением результата в локальный файл.
+
+Ключ файла — текущая ревизия Alembic (таблица alembic_version) и хэш декларативных моделей.
+Если ключ совпадает, схема читается из файла без обращения к information_schema;
+при смене ревизии или моделей схема отражается заново и файл перезаписывается.
+Без таблицы alembic_version схема отражается при каждом запуске и не сохраняется.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Date, DateTime, Engine, Enum, Float, Integer, Interval,
+    LargeBinary, MetaData, Numeric, SmallInteger, String, Table, Text, Time, inspect, text
+)
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.types import NullType
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_FORMAT = 2
+
+
+class ReflectedBase(DeclarativeBase):
+    """База для моделей таблиц, которые есть в БД, но отсутствуют в backend.database.models"""
+
+
+# (таблица, описание) -> модель, чтобы повторная сборка каталога не отображала таблицу дважды
+_reflected_models: Dict[Tuple[str, str], type] = {}
+
+
+def models_hash(base) -> str:
+    """Хэш структуры декларативных моделей: таблицы, колонки, типы, ключи и ограничения"""
+    description = []
+    for table_name in sorted(base.metadata.tables):
+        table = base.metadata.tables[table_name]
+        description.append([
+            table_name,
+            [
+                [column.name, str(column.type), column.nullable, column.primary_key,
+                 sorted(fk.target_fullname for fk in column.foreign_keys)]
+                for column in table.columns
+            ],
+            sorted(str(getattr(constraint, "sqltext", "")) for constraint in table.constraints),
+        ])
+    return hashlib.sha1(json.dumps(description, default=str).encode("utf-8")).hexdigest()
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    """Текущая ревизия Alembic или None, если миграции не применялись"""
+    if not inspect(engine).has_table("alembic_version"):
+        return None
+    with engine.connect() as conn:
+        revisions = sorted(row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version")))
+    return ",".join(revisions) or None
+
+
+def load_schema(engine: Engine, base, cache_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Описание таблиц живой схемы: из файла, если ключ совпадает, иначе через отражение.
+    Формат: {таблица: {"columns": {колонка: описание}, "check_constraints": [...]}}
+    """
+    revision = current_revision(engine)
+    key = {"format": SCHEMA_CACHE_FORMAT, "revision": revision, "models_hash": models_hash(base)}
+
+    if revision is not None:
+        cached = _read_cache(cache_path)
+        if cached is not None and cached.get("key") == key:
+            logger.debug(f"Схема загружена из кэша {cache_path} (ревизия {revision})")
+            return cached["tables"]
+
+    tables = reflect_schema(engine)
+    if revision is not None:
+        _write_cache(cache_path, {"key": key, "tables": tables})
+        logger.info(f"Схема отражена и сохранена в {cache_path} (ревизия {revision}, таблиц: {len(tables)})")
+    return tables
+
+
+def invalidate_schema_cache(cache_path: str) -> None:
+    """Удаляет файл кэша (например, после пересоздания таблиц без новой ревизии)"""
+    try:
+        os.remove(cache_path)
+    except FileNotFoundError:
+        pass
+
+
+def reflect_schema(engine: Engine) -> Dict[str, Dict[str, Any]]:
+    """Отражение всех таблиц схемы по умолчанию, кроме служебной alembic_version"""
+    inspector = inspect(engine)
+    tables: Dict[str, Dict[str, Any]] = {}
+
+    for table_name in inspector.get_table_names():
+        if table_name == "alembic_version":
+            continue
+
+        primary_keys = set(inspector.get_pk_constraint(table_name).get("constrained_columns") or [])
+        check_constraints = [item["sqltext"] for item in _get_check_constraints(inspector, table_name)]
+
+        foreign_keys: Dict[str, List[Dict[str, str]]] = {}
+        for fk in inspector.get_foreign_keys(table_name):
+            for source_column, target_column in zip(fk["constrained_columns"], fk["referred_columns"]):
+                foreign_keys.setdefault(source_column, []).append({
+                    "target_table": fk["referred_table"],
+                    "target_column": target_column
+                })
+
+        columns: Dict[str, Dict[str, Any]] = {}
+        for column in inspector.get_columns(table_name):
+            type_spec = _describe_type(column["type"])
+            columns[column["name"]] = {
+                "name": column["name"],
+                "type": _type_name(column["type"]),
+                "type_spec": type_spec,
+                "nullable": column["nullable"],
+                "primary_key": column["name"] in primary_keys,
+                "default": column.get("default"),
+                "foreign_keys": foreign_keys.get(column["name"], []),
+                "check_constraints": [
+                    sql_text for sql_text in check_constraints if mentions_column(sql_text, column["name"])
+                ],
+                "enum_values": type_spec.get("enum_values"),
+            }
+
+        tables[table_name] = {"columns": columns, "check_constraints": check_constraints}
+
+    return tables
+
+
+def build_table(table_name: str, description: Dict[str, Any], metadata: MetaData) -> Table:
+    """Core-таблица по сохранённому описанию (без внешних ключей: они есть только в описании колонок)"""
+    return Table(
+        table_name,
+        metadata,
+        *(
+            Column(
+                info["name"],
+                _build_type(info["type_spec"]),
+                primary_key=info["primary_key"],
+                nullable=info["nullable"],
+            )
+            for info in description["columns"].values()
+        )
+    )
+
+
+def build_model(table_name: str, description: Dict[str, Any]) -> Optional[type]:
+    """
+    Модель для отражённой таблицы; таблицы без первичного ключа не отображаются.
+    Повторный вызов с тем же описанием возвращает ранее созданную модель
+    """
+    cache_key = (table_name, json.dumps(description, sort_keys=True, default=str))
+    if cache_key in _reflected_models:
+        return _reflected_models[cache_key]
+
+    if not any(info["primary_key"] for info in description["columns"].values()):
+        logger.warning(f"Таблица '{table_name}' без первичного ключа пропущена")
+        return None
+
+    metadata = ReflectedBase.metadata
+    if table_name in metadata.tables:
+        # Описание изменилось: заменяем таблицу, прежняя модель остаётся у старых ссылок
+        metadata.remove(metadata.tables[table_name])
+    table = build_table(table_name, description, metadata)
+    class_name = "".join(part.capitalize() for part in table_name.split("_"))
+    model = type(class_name, (ReflectedBase,), {"__table__": table, "__module__": __name__})
+    _reflected_models[cache_key] = model
+    return model
+
+
+def mentions_column(sql_text: str, column_name: str) -> bool:
+    """Упоминается ли колонка в выражении CHECK как отдельный идентификатор (price, но не unit_price)"""
+    return re.search(rf'(?<![\w$]){re.escape(column_name)}(?![\w$])', sql_text) is not None
+
+
+def _get_check_constraints(inspector, table_name: str) -> List[Dict[str, Any]]:
+    try:
+        return inspector.get_check_constraints(table_name)
+    except NotImplementedError:
+        return []
+
+
+def _type_name(col_type: Any) -> str:
+    try:
+        return str(col_type)
+    except Exception:
+        return col_type.__class__.__name__.upper()
+
+
+def _describe_type(col_type: Any) -> Dict[str, Any]:
+    """Сериализуемое описание типа колонки"""
+    try:
+        generic = col_type.as_generic()
+    except NotImplementedError:
+        generic = col_type
+
+    spec: Dict[str, Any] = {"kind": generic.__class__.__name__}
+    if isinstance(generic, Enum):
+        spec["enum_values"] = list(generic.enums)
+        spec["enum_name"] = generic.name
+    elif isinstance(generic, Numeric) and not isinstance(generic, Float):
+        spec["precision"] = generic.precision
+        spec["scale"] = generic.scale
+    elif isinstance(generic, String):
+        spec["length"] = generic.length
+    elif isinstance(generic, DateTime):
+        spec["timezone"] = generic.timezone
+    return spec
+
+
+_TYPE_BUILDERS = {
+    "Integer": lambda spec: Integer(),
+    "BigInteger": lambda spec: BigInteger(),
+    "SmallInteger": lambda spec: SmallInteger(),
+    "Float": lambda spec: Float(),
+    "Double": lambda spec: Float(),
+    "Numeric": lambda spec: Numeric(spec.get("precision"), spec.get("scale")),
+    "String": lambda spec: String(spec.get("length")),
+    "Unicode": lambda spec: String(spec.get("length")),
+    "Text": lambda spec: Text(),
+    "UnicodeText": lambda spec: Text(),
+    "Boolean": lambda spec: Boolean(),
+    "Date": lambda spec: Date(),
+    "DateTime": lambda spec: DateTime(timezone=bool(spec.get("timezone"))),
+    "Time": lambda spec: Time(),
+    "Interval": lambda spec: Interval(),
+    "LargeBinary": lambda spec: LargeBinary(),
+    "Enum": lambda spec: Enum(*spec["enum_values"], name=spec.get("enum_name"), create_constraint=False),
+}
+
+
+def _build_type(spec: Dict[str, Any]) -> Any:
+    builder = _TYPE_BUILDERS.get(spec.get("kind"))
+    return builder(spec) if builder is not None else NullType()
+
+
+def _read_cache(cache_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Кэш схемы {cache_path} не прочитан: {e}")
+        return None
+
+
+def _write_cache(cache_path: str, payload: Dict[str, Any]) -> None:
+    """Атомарная запись: временный файл в той же директории и os.replace"""
+    directory = os.path.dirname(cache_path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".schema_cache.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Кэш схемы {cache_path} не сохранён: {e}")
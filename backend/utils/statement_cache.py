@@ -0,0 +1,64 @@
+"""
+Кэш построенных SQLAlchemy-выражений, ключом которого служит "форма" запроса
+(таблица, колонки, JOIN, набор фильтров с операторами, сортировка), а не значения.
+
+Значения передаются через bindparam при выполнении, поэтому одно и то же выражение
+переиспользуется для любых значений фильтров. Компиляция в SQL при этом берётся из
+compiled_cache движка SQLAlchemy, который срабатывает именно на одинаковой структуре.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable
+
+from backend.utils.responce_types import DatabaseResponse, ResponseStatus
+
+
+class StatementCache:
+    """LRU-кэш построенных выражений со счётчиками попаданий и промахов"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], DatabaseResponse]) -> DatabaseResponse:
+        """
+        Возвращает выражение из кэша или строит его через builder.
+        В кэш попадают только успешные ответы builder, ошибки отдаются как есть.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return DatabaseResponse.success(data=self._entries[key])
+            self.misses += 1
+
+        response = builder()
+        if response.status != ResponseStatus.SUCCESS:
+            return response
+
+        with self._lock:
+            self._entries[key] = response.data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
@@ -1,7 +1,9 @@
 from collections import defaultdict
 from typing import List, Dict, Any
-from PySide6.QtWidgets import QLayoutItem, QScrollArea, QWidget
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QFileDialog, QLayoutItem, QProgressDialog, QScrollArea, QWidget
+)
+from PySide6.QtCore import QThread, Qt, Signal
 from backend.utils.responce_types import DatabaseResponse, ResponseStatus
 from frontend.shared.ui.table.DynamicTable import DynamicTable
 from frontend.shared.ui.inputs import ComboBox
@@ -13,6 +15,40 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class ExportWorker(QThread):
+    """Выгрузка таблицы (COPY) в фоновом потоке: прогресс и результат приходят сигналами в поток интерфейса"""
+
+    # строк (None для binary), байт, оценка числа строк; object — без 32-битного int Qt (выгрузки > 2 ГБ)
+    progress = Signal(object, object, object)
+    completed = Signal(object)  # DatabaseResponse
+
+    def __init__(
+        self,
+        table_name: str,
+        path: str,
+        view_query: Dict[str, Any],
+        export_format: str,
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.table_name = table_name
+        self.path = path
+        self.view_query = view_query
+        self.export_format = export_format
+
+    def run(self) -> None:
+        response = DatabaseMiddleware.export_table_data(
+            self.table_name,
+            self.path,
+            self.view_query["filters_dict"],
+            self.export_format,
+            self.progress.emit,
+            join_config=self.view_query["join_config"],
+            order_by=self.view_query["order_by"],
+        )
+        self.completed.emit(response)
+
+
 class TableControlPanel(Widget):
     """Панель управления фильтрами для таблиц с поддержкой множественных блоков"""
 
@@ -44,6 +80,9 @@ class TableControlPanel(Widget):
         self.apply_button = PushButton(
             text="o Применить фильтры", callback=self._apply_filters
         )
+        self.export_button = PushButton(
+            text="Экспорт", callback=self._export_table
+        )
 
         title_layout = HLayout()
         title_layout.addStretch()
@@ -54,6 +93,7 @@ class TableControlPanel(Widget):
                 self.add_button,
                 self.apply_button,
                 self.clear_button,
+                self.export_button,
             ]
         )
         self.layout.addLayout(title_layout)
@@ -104,6 +144,62 @@ class TableControlPanel(Widget):
         else:
             self.table_widget.set_data(data)
 
+    def _export_table(self) -> None:
+        """Выгружает выбранную таблицу с текущими фильтрами в файл (CSV или бинарный COPY)"""
+        table_name: str = (
+            self.get_selected_table() if self.blocks else self.base_table_selector.get_value()
+        )
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Экспорт таблицы",
+            f"{table_name}.csv",
+            "CSV (*.csv);;PostgreSQL COPY BINARY (*.bin)",
+        )
+        if not path:
+            return
+
+        export_format = "binary" if selected_filter.startswith("PostgreSQL") else "csv"
+        try:
+            view_query = self._build_view_query(table_name)
+        except ValueError as e:
+            MessageFactory.show(DatabaseResponse(status=ResponseStatus.ERROR, message=str(e)))
+            return
+
+        self._export_progress = QProgressDialog(f"Экспорт таблицы {table_name}...", "", 0, 0, self)
+        self._export_progress.setCancelButton(None)
+        self._export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self._export_progress.setMinimumDuration(0)
+        self._export_progress.show()
+        self.export_button.setEnabled(False)
+
+        # Слоты — методы панели: сигналы потока выгрузки доставляются в поток интерфейса
+        self._export_worker = ExportWorker(table_name, path, view_query, export_format, self)
+        self._export_worker.progress.connect(self._on_export_progress)
+        self._export_worker.completed.connect(self._on_export_completed)
+        self._export_worker.finished.connect(self._export_worker.deleteLater)
+        self._export_worker.start()
+
+    def _on_export_progress(self, rows: int | None, bytes_written: int, total_estimate: int | None) -> None:
+        """Обновляет диалог прогресса выгрузки"""
+        if rows is None:
+            # binary: число строк по ходу выгрузки неизвестно
+            self._export_progress.setLabelText(f"Выгружено {bytes_written // 1024} КБ")
+            return
+        if total_estimate:
+            self._export_progress.setMaximum(max(total_estimate, rows))
+            self._export_progress.setValue(rows)
+        self._export_progress.setLabelText(
+            f"Выгружено строк: {rows} ({bytes_written // 1024} КБ)"
+        )
+
+    def _on_export_completed(self, response: DatabaseResponse) -> None:
+        """Закрывает диалог прогресса и показывает результат выгрузки"""
+        self._export_progress.close()
+        self.export_button.setEnabled(True)
+        MessageFactory.show(response)
+        if response and response.status == ResponseStatus.SUCCESS:
+            logger.info(f"Таблица {self._export_worker.table_name} выгружена: {response.data}")
+
     def _load_table_names(self):
         """Загружает список имен таблиц из БД"""
         response = DatabaseMiddleware.get_table_names()
@@ -217,7 +313,13 @@ class TableControlPanel(Widget):
                 return
 
             model: type[Base] = model_response.data
-            table_data_response = DatabaseMiddleware.get_where(table_name, filters)
+            view_query = self._build_view_query(table_name)
+            table_data_response = DatabaseMiddleware.get_where(
+                table_name,
+                view_query["filters_dict"],
+                view_query["join_config"],
+                view_query["order_by"],
+            )
             if (
                 not table_data_response
                 or table_data_response.data is None
@@ -243,6 +345,55 @@ class TableControlPanel(Widget):
             )
             logger.error(f"Ошибка применения фильтров: {e}")
 
+    def _build_view_query(self, table_name: str) -> Dict[str, Any]:
+        """
+        Параметры запроса таблицы на экране: filters_dict, join_config и order_by.
+        Фильтры блоков других таблиц становятся условиями "таблица.колонка" с JOIN по внешнему ключу,
+        сортировка — по колонке, выбранной в заголовке таблицы. Общие для показа и экспорта
+        """
+        filters_dict: Dict[str, Any] = {}
+        join_config: List[Dict[str, Any]] = []
+        related_tables: Dict[str, Any] | None = None
+
+        for filter_table, table_filters in self.get_all_filters().items():
+            if filter_table == table_name:
+                filters_dict.update(table_filters)
+                continue
+
+            if related_tables is None:
+                related_tables = DatabaseMiddleware.get_related_tables(table_name).data or {}
+            relation = related_tables.get(filter_table)
+            if relation is None:
+                raise ValueError(
+                    f"Фильтр по таблице {filter_table} не применим: она не связана с {table_name}"
+                )
+            # Исходящая связь: колонка основной таблицы ссылается на связанную, входящая — наоборот
+            if relation["relationship_type"] == "outgoing":
+                join_on = {c["source_column"]: c["target_column"] for c in relation["columns"]}
+            else:
+                join_on = {c["target_column"]: c["source_column"] for c in relation["columns"]}
+            join_config.append({"table": filter_table, "on": join_on})
+            filters_dict.update(
+                {f"{filter_table}.{key}": value for key, value in table_filters.items()}
+            )
+
+        order_by: Dict[str, str] = {}
+        header = self.table_widget.horizontalHeader()
+        section = header.sortIndicatorSection()
+        if self.table_widget.isSortingEnabled() and 0 <= section < self.table_widget.columnCount():
+            header_item = self.table_widget.horizontalHeaderItem(section)
+            # На экране может быть другая таблица: её сортировка к этому запросу не относится
+            table_columns = DatabaseMiddleware.get_columns_by_table_name(table_name).data or {}
+            if header_item is not None and header_item.text() in table_columns:
+                descending = header.sortIndicatorOrder() == Qt.SortOrder.DescendingOrder
+                order_by[header_item.text()] = "desc" if descending else "asc"
+
+        return {
+            "filters_dict": filters_dict,
+            "join_config": join_config or None,
+            "order_by": order_by or None,
+        }
+
     def get_all_filters(self) -> Dict[str, Dict[str, Any]]:
         """
         Возвращает все фильтры в виде {table_name: {col: value, ...}, ...}
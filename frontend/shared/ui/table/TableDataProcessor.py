@@ -32,28 +32,10 @@ class TableDataProcessor:
 
     def _get_display_column_for_table(self, table_name: str) -> str:
         """Находит колонку для отображения в связанной таблице"""
-        col_resp = DatabaseMiddleware.get_columns_by_table_name(table_name)
-
-        if (
-            not col_resp
-            or not col_resp.data
-            or col_resp.status != ResponseStatus.SUCCESS
-        ):
+        resp = DatabaseMiddleware.get_display_column(table_name)
+        if not resp or resp.status != ResponseStatus.SUCCESS or not resp.data:
             return "id"
-
-        cols: dict[str,Any] = col_resp.data
-        candidates: List[str] = ["name", "title", "label", "model", "type", "flavor"]
-        for candidate in candidates:
-            if candidate in cols:
-                col_type = (cols[candidate].get("type") or "").upper()
-                if any(t in col_type for t in ("TEXT", "VARCHAR", "CHAR", "STRING")):
-                    return candidate
-
-        if isinstance(cols, dict):
-            for name, info in cols.items():
-                if "TEXT" in (info.get("type") or "").upper():
-                    return name
-        return list(cols.keys())[0] if cols else "id"
+        return resp.data
 
     def preload_foreign_key_data(self, col_name: str) -> None:
         """Предзагружает данные для внешних ключей"""
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 from backend.repository import DatabaseResponse, DatabaseRepository
 from backend.utils.logger import logging
 from backend.utils.responce_types import ResponseStatus
@@ -21,6 +21,11 @@ class DatabaseMiddleware:
     def get_columns_by_table_name(table_name: str) -> DatabaseResponse:
         return repo.get_table_columns(table_name)
 
+    @staticmethod
+    @CatchError
+    def get_display_column(table_name: str) -> DatabaseResponse:
+        return repo.get_display_column(table_name)
+
     @staticmethod
     @CatchError
     def search(
@@ -86,6 +91,37 @@ class DatabaseMiddleware:
     def get_table_schema(table_name: str) -> DatabaseResponse:
         return repo.get_model_by_tablename(table_name)
 
+    @staticmethod
+    @CatchError
+    def get_pool_stats() -> DatabaseResponse:
+        return repo.get_pool_stats()
+
+    @staticmethod
+    @CatchError
+    def get_related_tables(table_name: str) -> DatabaseResponse:
+        return repo.get_related_tables(table_name)
+
+    @staticmethod
+    @CatchError
+    def export_table_data(
+        table_name: str,
+        destination: str,
+        filters: Dict[str, Any] | None = None,
+        export_format: str = "csv",
+        progress_callback: Callable[[int | None, object, int | None], None] | None = None,
+        join_config: List[Dict[str, Any]] | None = None,
+        order_by: Dict[str, str] | None = None,
+    ) -> DatabaseResponse:
+        return repo.export_table_data(
+            table_name,
+            destination,
+            filters_dict=filters or None,
+            order_by=order_by or None,
+            join_config=join_config or None,
+            export_format=export_format,
+            progress_callback=progress_callback,
+        )
+
     @staticmethod
     @CatchError
     def get_all(table_name: str) -> DatabaseResponse:
@@ -93,10 +129,18 @@ class DatabaseMiddleware:
 
     @staticmethod
     @CatchError
-    def get_where(table_name: str, filters = {}) -> DatabaseResponse:
-        table_columns = DatabaseMiddleware.get_columns_by_table_name(table_name)
+    def get_where(
+        table_name: str,
+        filters: Dict[str, Any] | None = None,
+        join_config: List[Dict[str, Any]] | None = None,
+        order_by: Dict[str, str] | None = None,
+    ) -> DatabaseResponse:
+        """Колонки основной таблицы; filters в формате filters_dict (колонки JOIN — "таблица.колонка")"""
         return repo.get_table_data(
-            table_name, table_columns, filters.get(table_name, "")
+            table_name,
+            filters_dict=filters or None,
+            order_by=order_by or None,
+            join_config=join_config or None,
         )
 
 
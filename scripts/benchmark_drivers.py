@@ -0,0 +1,148 @@
+"""
+Сравнение драйверов PostgreSQL (settings.DB_DRIVER: psycopg2, psycopg) на операциях репозитория:
+повторяющиеся чтения с фильтром (для psycopg — подготовленные на сервере запросы),
+чтение таблицы, insert_many (psycopg — executemany драйвера в конвейерном режиме,
+psycopg2 — многострочные INSERT), insert_many с RETURNING, bulk_update_by_pk и increment.
+Каждый драйвер запускается в отдельном процессе (драйвер выбирается при создании движка),
+изменения данных откатываются.
+
+Запуск из корня проекта (нужна настроенная БД из .env):
+    python -m scripts.benchmark_drivers --repeat 10 --rows 5000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List
+
+
+class _Rollback(Exception):
+    """Откат изменений замера"""
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """Медиана времени вызова, мс"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run_workload(repeat: int, row_count: int) -> Dict[str, float]:
+    """Замеры в текущем процессе (драйвер — из DB_DRIVER)"""
+    from backend.repository import DatabaseRepository
+
+    def check(response):
+        if response.status.value == "error":
+            raise RuntimeError(response.message)
+        return response
+
+    product_ids = [
+        row["product_id"]
+        for row in check(DatabaseRepository.get_table_data("products", columns_list=["product_id"])).data
+    ]
+    rows = [
+        {
+            "product_id": product_ids[i % len(product_ids)],
+            "sale_date": date(2024, 1, i % 28 + 1).isoformat(),
+            "quantity_sold": i % 5 + 1,
+            "total_price": i % 100 + 0.5,
+        }
+        for i in range(row_count)
+    ]
+
+    def point_reads():
+        for product_id in product_ids * 5:
+            check(DatabaseRepository.get_table_data(
+                "sales", filters_dict={"product_id": product_id}, limit=20, use_cache=False
+            ))
+
+    results: Dict[str, float] = {
+        f"get_table_data x{len(product_ids) * 5} (filter)": measure(point_reads, repeat),
+        "get_table_data (sales)": measure(
+            lambda: check(DatabaseRepository.get_table_data("sales", use_cache=False)), repeat
+        ),
+    }
+
+    # Записи — в одной транзакции на повтор, откатываются
+    write_timings: Dict[str, List[float]] = {}
+
+    def timed(name: str, func: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        result = check(func())
+        write_timings.setdefault(name, []).append(time.perf_counter() - started)
+        return result
+
+    for _ in range(repeat):
+        try:
+            with DatabaseRepository.transaction():
+                timed(f"insert_many {row_count}", lambda: DatabaseRepository.insert_many("sales", rows))
+                inserted = timed(
+                    f"insert_many {row_count} RETURNING",
+                    lambda: DatabaseRepository.insert_many("sales", rows, returning=["sale_id"])
+                ).data["returned"]
+                updates = [
+                    {"sale_id": row["sale_id"], "quantity_sold": index % 7 + 1}
+                    for index, row in enumerate(inserted)
+                ]
+                timed(f"bulk_update_by_pk {row_count}", lambda: DatabaseRepository.bulk_update_by_pk("sales", updates))
+                timed("increment x100", lambda: [
+                    DatabaseRepository.increment(
+                        "inventory", {"product_id": product_ids[0]}, {"quantity_in_stock": 1}
+                    )
+                    for _ in range(100)
+                ][-1])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    results.update({name: statistics.median(timings) * 1000 for name, timings in write_timings.items()})
+    return results
+
+
+def run_driver(driver: str, repeat: int, row_count: int) -> Dict[str, Any]:
+    """Замеры драйвера в дочернем процессе"""
+    env = {**os.environ, "DB_DRIVER": driver}
+    completed = subprocess.run(
+        [sys.executable, "-m", "scripts.benchmark_drivers", "--worker",
+         "--repeat", str(repeat), "--rows", str(row_count)],
+        env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "ошибка"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", nargs="+", default=["psycopg2", "psycopg"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_workload(args.repeat, args.rows)))
+        return
+
+    results = {driver: run_driver(driver, args.repeat, args.rows) for driver in args.drivers}
+    for driver, result in results.items():
+        if "error" in result:
+            print(f"{driver}: {result['error']}")
+    measured = [driver for driver in args.drivers if "error" not in results[driver]]
+    if not measured:
+        return
+
+    print(f"{'операция':<36}" + "".join(f"{driver + ', мс':>16}" for driver in measured))
+    for operation in results[measured[0]]:
+        print(f"{operation:<36}" + "".join(f"{results[driver][operation]:>16.2f}" for driver in measured))
+
+
+if __name__ == "__main__":
+    main()
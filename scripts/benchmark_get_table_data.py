@@ -0,0 +1,83 @@
+"""
+Сравнение чтения таблицы через ORM-гидрацию (прежний путь get_table_data)
+и через Core-select по __table__ (текущий путь) на моделях Products и Sales.
+
+Запуск из корня проекта (нужна настроенная БД из .env):
+    python -m scripts.benchmark_get_table_data --repeat 20
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import select
+
+from backend.database.database import Database
+from backend.database.models import Products, Sales
+from backend.repository import DatabaseRepository
+
+
+def orm_hydration_path(model) -> List[Dict[str, Any]]:
+    """Прежняя реализация: select(model) + getattr по каждой колонке"""
+    with Database().get_db_session() as session:
+        data = []
+        for obj in session.execute(select(model)).scalars().all():
+            obj_dict = {}
+            for column in obj.__table__.columns:
+                value = getattr(obj, column.key)
+                if isinstance(value, (datetime, date)):
+                    value = value.isoformat()
+                obj_dict[column.key] = value
+            data.append(obj_dict)
+        return data
+
+
+def core_path(model) -> List[Dict[str, Any]]:
+    """Текущая реализация get_table_data без columns_list"""
+    return DatabaseRepository.get_table_data(model.__tablename__).data
+
+
+def measure(func: Callable[[Any], List[Dict[str, Any]]], model, repeat: int) -> Dict[str, float]:
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(func(model))
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func(model)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for model in (Products, Sales):
+        # Прогрев пула соединений и кэша компиляции
+        orm_hydration_path(model)
+        core_path(model)
+
+        for name, func in (("orm", orm_hydration_path), ("core", core_path)):
+            stats = measure(func, model, args.repeat)
+            print(
+                f"{model.__tablename__:<10} {name:<5} rows={stats['rows']:<8} "
+                f"median={stats['median_ms']:.2f}ms min={stats['min_ms']:.2f}ms "
+                f"peak={stats['peak_kb']:.0f}KB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# Общие настройки тестов: импорт backend без подключения к БД
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# settings завершает процесс без пароля БД; соединение в юнит-тестах не открывается
+os.environ.setdefault("DB_PASSWORD", "test")
+# Каталог схемы строится по моделям, без чтения схемы из БД
+os.environ.setdefault("SCHEMA_CACHE_ENABLED", "false")
+
+
+@pytest.fixture
+def compile_sql():
+    """SQL выражения в диалекте PostgreSQL одной строкой"""
+    from sqlalchemy.dialects import postgresql
+
+    def compile_statement(statement) -> str:
+        return re.sub(r"\s+", " ", str(statement.compile(dialect=postgresql.dialect())))
+
+    return compile_statement
@@ -0,0 +1,44 @@
+# Агрегация на стороне Postgres (aggregate_table_data)
+from backend.database.models import Sales
+from backend.repository import DatabaseRepository
+from backend.utils.responce_types import ErrorCode, ResponseStatus
+
+
+def test_aggregate_statement(compile_sql):
+    response = DatabaseRepository._build_aggregate_statement(
+        "sales", Sales, {"revenue": "total_price__sum", "n": "*__count"},
+        group_by=["product_id"],
+        filters_dict={"quantity_sold__gte": 1},
+        having={"n__gt": 2},
+        order_by={"revenue": "desc"},
+        with_limit=True,
+    )
+    sql = compile_sql(response.data["query"])
+
+    assert response.data["output_columns"] == ["product_id", "revenue", "n"]
+    assert sql.startswith(
+        "SELECT sales.product_id, sum(sales.total_price) AS revenue, count(*) AS n FROM sales"
+    )
+    assert "GROUP BY sales.product_id HAVING count(*) > %(having_0)s" in sql
+    assert sql.endswith("ORDER BY revenue DESC LIMIT %(row_limit)s")
+
+
+def test_invalid_aggregate_specs():
+    cases = [
+        ({"n": "total_price__median"}, {}, ErrorCode.INVALID_PARAMETERS),
+        ({"n": "*__sum"}, {}, ErrorCode.INVALID_PARAMETERS),
+        ({"n": "missing__sum"}, {}, ErrorCode.COLUMN_NOT_FOUND),
+        ({"n": "*__count"}, {"other__gt": 1}, ErrorCode.INVALID_FILTER),
+    ]
+    for aggregates, having, error_code in cases:
+        response = DatabaseRepository._build_aggregate_statement("sales", Sales, aggregates, having=having)
+        assert response.status == ResponseStatus.ERROR
+        assert response.error_code == error_code
+
+
+def test_order_only_by_group_columns_or_aggregates():
+    response = DatabaseRepository._build_aggregate_statement(
+        "sales", Sales, {"n": "*__count"}, group_by=["product_id"], order_by={"sale_date": "asc"}
+    )
+
+    assert response.error_code == ErrorCode.INVALID_ORDER_BY
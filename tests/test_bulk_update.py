@@ -0,0 +1,18 @@
+# Пакетный UPDATE по первичному ключу (UPDATE ... FROM VALUES)
+from backend.database.models import Sales
+from backend.repository import DatabaseRepository
+
+
+def test_bulk_update_statement(compile_sql):
+    sql = compile_sql(DatabaseRepository._build_bulk_update_statement(
+        Sales, ["sale_id"], ["quantity_sold"], 2
+    ).data)
+
+    assert sql.startswith("UPDATE sales SET quantity_sold=CAST(v.quantity_sold AS INTEGER)")
+    assert (
+        "FROM (VALUES (%(row_0)s, %(value_0_sale_id)s, %(value_0_quantity_sold)s),"
+        " (%(row_1)s, %(value_1_sale_id)s, %(value_1_quantity_sold)s))"
+        " AS v (row, sale_id, quantity_sold)"
+    ) in sql
+    assert "WHERE sales.sale_id = CAST(v.sale_id AS INTEGER)" in sql
+    assert sql.endswith("RETURNING CAST(v.row AS INTEGER) AS row")
@@ -0,0 +1,52 @@
+# Колоночный формат результата
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Date, Integer, Numeric, Text
+
+from backend.repository import DatabaseRepository
+from backend.utils import columnar
+from backend.utils.responce_types import ErrorCode, ResponseStatus
+
+
+def test_rows_to_columnar():
+    np = pytest.importorskip("numpy")
+    rows = [
+        (1, date(2024, 1, 1), Decimal("10.50"), "кола"),
+        (2, None, None, "сок"),
+        (3, date(2024, 1, 3), Decimal("1"), "кола"),
+    ]
+
+    result = columnar.rows_to_columnar(
+        rows, ["id", "day", "price", "name"], [Integer(), Date(), Numeric(10, 2), Text()]
+    )
+
+    assert result["row_count"] == 3
+    columns, schema = result["columns"], result["schema"]
+    assert columns["id"].dtype == np.int64 and columns["id"].tolist() == [1, 2, 3]
+    assert columns["day"].dtype == np.dtype("datetime64[D]") and np.isnat(columns["day"][1])
+    # NUMERIC остаётся Decimal: float64 потерял бы точность
+    assert columns["price"].dtype == object
+    assert columns["price"].tolist() == [Decimal("10.50"), None, Decimal("1")]
+    assert schema["price"]["encoding"] == "object"
+    assert columns["name"]["categories"] == ["кола", "сок"]
+    assert columns["name"]["codes"].tolist() == [0, 1, 0]
+    assert schema["name"] == {"type": "TEXT", "encoding": "dictionary", "dtype": "int32"}
+
+
+def test_rows_to_columnar_empty():
+    pytest.importorskip("numpy")
+    result = columnar.rows_to_columnar([], ["id"], [Integer()])
+
+    assert result["row_count"] == 0
+    assert len(result["columns"]["id"]) == 0
+
+
+def test_without_numpy(monkeypatch):
+    monkeypatch.setattr(columnar, "np", None)
+
+    assert not columnar.is_available()
+    response = DatabaseRepository.get_table_data("sales", result_format="columnar")
+    assert response.status == ResponseStatus.ERROR
+    assert response.error_code == ErrorCode.INVALID_PARAMETERS
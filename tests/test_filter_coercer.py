@@ -0,0 +1,84 @@
+# Преобразователь значений фильтров (_compile_filter_coercer)
+from datetime import datetime
+
+import pytest
+
+from backend.repository import DatabaseRepository, FilterValueError
+from backend.utils.responce_types import ErrorCode, ResponseStatus
+
+
+def coercer(table_name, column_name, operator):
+    col_info = DatabaseRepository._get_column_info(table_name, column_name).data
+    return DatabaseRepository._compile_filter_coercer(operator, col_info)
+
+
+@pytest.mark.parametrize("operator, value, expected", [
+    ("gt", "5", 5),
+    ("gt", 5.0, 5),
+    ("between", ["1", 3], [1, 3]),
+    ("in", [1, "2"], [1, 2]),
+    ("eq", "5", "5"),  # eq не приводится, значение передаётся как есть
+    ("gt", None, None),
+])
+def test_integer_column(operator, value, expected):
+    coerced = coercer("sales", "quantity_sold", operator)(value)
+
+    assert coerced == expected
+    # asyncpg не принимает float для integer
+    assert all(not isinstance(v, float) for v in (coerced if isinstance(coerced, list) else [coerced]))
+
+
+@pytest.mark.parametrize("value", ["много", 2.5, "2.5", float("nan")])
+def test_integer_column_rejects_non_integers(value):
+    with pytest.raises(FilterValueError):
+        coercer("sales", "quantity_sold", "gte")(value)
+
+
+def test_numeric_column():
+    assert coercer("products", "price", "between")(["1.5", 3]) == [1.5, 3.0]
+    with pytest.raises(FilterValueError):
+        coercer("products", "price", "lt")("дорого")
+
+
+def test_date_column():
+    coerce = coercer("sales", "sale_date", "between")
+
+    assert coerce(["2024-01-01", "01.02.2024"]) == [datetime(2024, 1, 1), datetime(2024, 2, 1)]
+    with pytest.raises(FilterValueError):
+        coerce(["2024-01-01", "вчера"])
+
+
+def test_enum_column():
+    assert coercer("products", "caffeine_level", "eq")("high") == "high"
+    assert coercer("products", "caffeine_level", "in")(["low", "high"]) == ["low", "high"]
+    assert coercer("products", "caffeine_level", "like")("%ig%") == "%ig%"
+    with pytest.raises(FilterValueError):
+        coercer("products", "caffeine_level", "not_in")(["low", "ultra"])
+
+
+@pytest.mark.parametrize("operator, value", [
+    ("in", 5),
+    ("not_in", "a"),
+    ("between", [1]),
+    ("between", [1, None]),
+    ("is_null", "yes"),
+])
+def test_value_shape_checked_without_column(operator, value):
+    with pytest.raises(FilterValueError):
+        DatabaseRepository._compile_filter_coercer(operator)(value)
+
+
+def test_is_null_accepts_bool():
+    assert DatabaseRepository._compile_filter_coercer("is_null")(True) is True
+
+
+def test_invalid_filters_reported_before_query():
+    response = DatabaseRepository.get_table_data("sales", filters_dict={"quantity_sold__gt": "много"})
+    assert response.status == ResponseStatus.ERROR
+    assert response.error_code == ErrorCode.INVALID_FILTER
+
+    response = DatabaseRepository.aggregate_table_data(
+        "sales", {"n": "*__count"}, group_by=["product_id"], having={"n__between": [1]}
+    )
+    assert response.status == ResponseStatus.ERROR
+    assert response.error_code == ErrorCode.INVALID_FILTER
@@ -0,0 +1,44 @@
+# Атомарное изменение числовых колонок (increment)
+from decimal import Decimal
+
+import pytest
+
+from backend.database.models import Inventory
+from backend.repository import DatabaseRepository
+from backend.utils.responce_types import ErrorCode, ResponseStatus
+
+
+def test_increment_statement(compile_sql):
+    sql = compile_sql(DatabaseRepository._build_increment_statement(
+        "inventory", Inventory, ["quantity_in_stock"], {"product_id": 1}
+    ).data)
+
+    assert sql.startswith(
+        "UPDATE inventory SET quantity_in_stock=(inventory.quantity_in_stock + %(delta_quantity_in_stock)s),"
+        " last_updated=now()"
+    )
+    assert "WHERE inventory.product_id = %(filter_0)s" in sql
+    assert sql.endswith(
+        "RETURNING inventory.inventory_id, inventory.product_id,"
+        " inventory.quantity_in_stock, inventory.last_updated"
+    )
+
+
+@pytest.mark.parametrize("filters, deltas, error_code", [
+    ({}, {"quantity_in_stock": 1}, ErrorCode.INVALID_PARAMETERS),
+    ({"product_id": 1}, {}, ErrorCode.INVALID_PARAMETERS),
+    ({"product_id": 1}, {"missing": 1}, ErrorCode.COLUMN_NOT_FOUND),
+    ({"product_id": 1}, {"inventory_id": 1}, ErrorCode.INVALID_COLUMN_TYPE),
+    ({"product_id": 1}, {"last_updated": 1}, ErrorCode.INVALID_COLUMN_TYPE),
+    ({"product_id": 1}, {"quantity_in_stock": "5"}, ErrorCode.INVALID_DATA_TYPE),
+    ({"product_id": 1}, {"quantity_in_stock": True}, ErrorCode.INVALID_DATA_TYPE),
+    ({"product_id": 1}, {"quantity_in_stock": 0.6}, ErrorCode.INVALID_DATA_TYPE),
+    ({"product_id": 1}, {"quantity_in_stock": Decimal("1.5")}, ErrorCode.INVALID_DATA_TYPE),
+    ({"product_id": 1}, {"quantity_in_stock": float("inf")}, ErrorCode.INVALID_DATA_TYPE),
+    ({"product_id": 1}, {"quantity_in_stock": float("nan")}, ErrorCode.INVALID_DATA_TYPE),
+])
+def test_invalid_increment_rejected_before_query(filters, deltas, error_code):
+    response = DatabaseRepository.increment("inventory", filters, deltas)
+
+    assert response.status == ResponseStatus.ERROR
+    assert response.error_code == error_code
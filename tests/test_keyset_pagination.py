@@ -0,0 +1,72 @@
+# Keyset-пагинация: курсоры и условие "строка после курсора"
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from backend.database.models import Sales
+from backend.repository import DatabaseRepository
+from backend.utils.keyset_cursor import (
+    InvalidCursorError, cursor_signature, decode_cursor, encode_cursor
+)
+from backend.utils.responce_types import ErrorCode, ResponseStatus
+
+
+def test_round_trip_keeps_types():
+    signature = cursor_signature("sales", ["sale_date:desc", "sale_id:desc"])
+    values = [date(2024, 3, 1), datetime(2024, 3, 1, 12, 30), Decimal("10.50"), 42, "текст", None]
+
+    token = encode_cursor(signature, values)
+
+    assert decode_cursor(token, signature, len(values)) == values
+
+
+def test_signature_depends_on_table_and_order():
+    assert cursor_signature("sales", ["sale_id:asc"]) != cursor_signature("sales", ["sale_id:desc"])
+    assert cursor_signature("sales", ["sale_id:asc"]) != cursor_signature("inventory", ["sale_id:asc"])
+
+
+def test_foreign_signature_rejected():
+    token = encode_cursor(cursor_signature("sales", ["sale_id:asc"]), [1])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, cursor_signature("sales", ["sale_id:desc"]), 1)
+
+
+@pytest.mark.parametrize("token", ["не base64", "bm90IGpzb24=", encode_cursor("x", [1, 2])])
+def test_broken_token_rejected(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "x", 1)
+
+
+def test_repository_returns_invalid_cursor_for_tampered_token():
+    # Курсор проверяется до обращения к БД
+    token = encode_cursor("0000000000000000", [5])
+
+    response = DatabaseRepository.get_table_data(
+        "sales", order_by={"sale_id": "asc"}, limit=10, cursor=token
+    )
+
+    assert response.status == ResponseStatus.ERROR
+    assert response.error_code == ErrorCode.INVALID_CURSOR
+
+
+def test_keyset_condition_same_direction_uses_row_comparison(compile_sql):
+    condition = DatabaseRepository._build_keyset_condition(
+        [(Sales.sale_date, "desc"), (Sales.sale_id, "desc")]
+    )
+
+    assert compile_sql(condition) == (
+        "(sales.sale_date, sales.sale_id) < (%(keyset_0)s, %(keyset_1)s)"
+    )
+
+
+def test_keyset_condition_mixed_directions(compile_sql):
+    condition = DatabaseRepository._build_keyset_condition(
+        [(Sales.sale_date, "desc"), (Sales.sale_id, "asc")]
+    )
+
+    assert compile_sql(condition) == (
+        "sales.sale_date < %(keyset_0)s"
+        " OR sales.sale_date = %(keyset_0)s AND sales.sale_id > %(keyset_1)s"
+    )
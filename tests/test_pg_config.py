@@ -0,0 +1,43 @@
+# URL и параметры подключения PgConfig для каждого драйвера
+import pytest
+
+from backend.settings import PgConfig
+
+
+def config(**overrides) -> PgConfig:
+    return PgConfig(host="db", port=5432, dbname="shop", user="app", password="secret", **overrides)
+
+
+@pytest.mark.parametrize("driver, scheme", [
+    ("psycopg2", "postgresql+psycopg2"),
+    ("psycopg", "postgresql+psycopg"),
+    ("pg8000", "postgresql+pg8000"),
+])
+def test_database_url(driver, scheme):
+    assert config(driver=driver).database_url() == f"{scheme}://app:secret@db:5432/shop"
+
+
+@pytest.mark.parametrize("driver, scheme", [
+    ("psycopg", "postgresql+psycopg_async"),
+    ("asyncpg", "postgresql+asyncpg"),
+])
+def test_async_database_url(driver, scheme):
+    assert config(async_driver=driver).async_database_url() == f"{scheme}://app:secret@db:5432/shop"
+
+
+def test_unknown_driver():
+    with pytest.raises(ValueError):
+        config(driver="mysqlclient").database_url()
+    with pytest.raises(ValueError):
+        config(async_driver="psycopg2").async_database_url()
+
+
+def test_connect_args():
+    pg = config(driver="psycopg", sslmode="require", connect_timeout=3, prepare_threshold=None)
+
+    # prepare_threshold=None отключает подготовку запросов psycopg 3 (PgBouncer)
+    assert pg.connect_args() == {"sslmode": "require", "connect_timeout": 3, "prepare_threshold": None}
+    assert pg.connect_args("psycopg2") == {"sslmode": "require", "connect_timeout": 3}
+    # pg8000 и asyncpg не принимают libpq-параметры
+    assert pg.connect_args("pg8000") == {"timeout": 3}
+    assert pg.connect_args("asyncpg") == {"timeout": 3}
@@ -0,0 +1,73 @@
+# Статистика пула соединений (PoolInstrumentation) и параметры пула из настроек
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from backend.settings import PgConfig
+from backend.utils.pool_instrumentation import (
+    InstrumentedQueuePool, LatencyHistogram, PoolInstrumentation, PoolStats
+)
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram(buckets=(1, 10))
+    for duration_ms in (0.5, 1, 7, 250):
+        histogram.observe(duration_ms)
+
+    snapshot = histogram.snapshot()
+    # Граница интервала включается в него
+    assert snapshot["histogram"] == {"<=1": 2, "<=10": 1, ">10": 1}
+    assert snapshot["count"] == 4
+    assert snapshot["avg_ms"] == 64.625
+    assert snapshot["max_ms"] == 250
+
+
+def test_pool_stats_counts_timeouts_separately():
+    stats = PoolStats()
+    stats.record_wait(2)
+    stats.record_wait(30, timed_out=True)
+    stats.record_invalidation()
+
+    snapshot = stats.snapshot()
+    assert (snapshot["checkouts"], snapshot["timeouts"], snapshot["invalidations"]) == (1, 1, 1)
+    assert snapshot["wait_ms"]["count"] == 2
+
+
+def test_instrumented_pool(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01
+    )
+    PoolInstrumentation.install(engine)
+    PoolInstrumentation.install(engine)  # повторная установка не дублирует слушателей
+
+    with engine.connect():
+        state = PoolInstrumentation.snapshot(engine)
+        assert state["pool_class"] == "InstrumentedQueuePool"
+        assert (state["pool_size"], state["checked_out"]) == (1, 1)
+        # Пул исчерпан: ожидание завершается таймаутом и учитывается
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    with engine.connect():
+        pass
+
+    stats = PoolInstrumentation.snapshot(engine)
+    assert (stats["checkouts"], stats["timeouts"], stats["checked_out"]) == (2, 1, 0)
+    assert stats["connect_ms"]["count"] == 1
+
+    # dispose() пересоздаёт пул, накопленные счётчики сохраняются
+    engine.dispose()
+    assert PoolInstrumentation.snapshot(engine)["checkouts"] == 2
+
+
+def test_pool_options():
+    options = PgConfig(pool_size=3, max_overflow=1, pool_timeout=2.5, pool_recycle=600,
+                       pool_pre_ping="optimistic").pool_options()
+
+    assert options == {
+        "pool_size": 3, "max_overflow": 1, "pool_timeout": 2.5, "pool_recycle": 600, "pool_pre_ping": False,
+    }
+    assert PgConfig(pool_pre_ping="pessimistic").pool_options()["pool_pre_ping"] is True
+    with pytest.raises(ValueError):
+        PgConfig(pool_pre_ping="sometimes").pool_options()
@@ -0,0 +1,72 @@
+# Кэш результатов: версии таблиц, TTL и вытеснение LRU
+from backend.utils import result_cache
+from backend.utils.result_cache import ResultCache
+
+
+def test_put_and_get_return_copies():
+    cache = ResultCache()
+    rows = [{"sale_id": 1}]
+    cache.put("key", rows, cache.snapshot(["sales"]))
+
+    rows[0]["sale_id"] = 2
+    cached = cache.get("key")
+    cached[0]["sale_id"] = 3
+
+    assert cache.get("key") == [{"sale_id": 1}]
+
+
+def test_invalidation_drops_entries_of_table():
+    cache = ResultCache()
+    cache.put("sales", [1], cache.snapshot(["sales"]))
+    cache.put("joined", [2], cache.snapshot(["sales", "products"]))
+    cache.put("products", [3], cache.snapshot(["products"]))
+
+    assert cache.invalidate_table("sales") == 2
+    assert cache.get("sales") is None
+    assert cache.get("joined") is None
+    assert cache.get("products") == [3]
+
+
+def test_version_bump_during_read_rejects_put():
+    cache = ResultCache()
+    snapshot = cache.snapshot(["sales"])
+
+    # Запись в таблицу между началом чтения и сохранением результата
+    cache.invalidate_table("sales")
+
+    assert cache.put("key", [1], snapshot) is False
+    assert cache.get("key") is None
+    assert cache.put("key", [1], cache.snapshot(["sales"])) is True
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache = ResultCache(ttl=5)
+    cache.put("key", [1], cache.snapshot(["sales"]))
+
+    now[0] += 4
+    assert cache.get("key") == [1]
+
+    now[0] += 2
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", [1], cache.snapshot(["sales"]))
+    cache.put("b", [2], cache.snapshot(["sales"]))
+    cache.get("a")
+    cache.put("c", [3], cache.snapshot(["sales"]))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1]
+    assert cache.get("c") == [3]
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(enabled=False)
+
+    assert cache.put("key", [1], cache.snapshot(["sales"])) is False
+    assert cache.get("key") is None
@@ -0,0 +1,91 @@
+# Каталог схемы: таблицы, колонки, связи и колонки для отображения
+import pytest
+
+from backend.database.models import Base, Products, Sales
+from backend.repository import DatabaseRepository
+from backend.utils.responce_types import ErrorCode, ResponseStatus
+from backend.utils.schema_catalog import SchemaCatalog, choose_display_column
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return SchemaCatalog.build(Base)
+
+
+def test_tables_and_models(catalog):
+    assert set(catalog.table_names()) == {"sales", "products", "inventory", "production_batches"}
+    assert catalog.model("sales") is Sales
+    assert catalog.model("missing") is None
+    assert "products" in catalog and len(catalog) == 4
+
+
+def test_columns(catalog):
+    products = catalog.table("products")
+
+    assert products.column("caffeine_level")["enum_values"] == ("low", "medium", "high", "extra_high")
+    assert products.column("product_id")["primary_key"] is True
+    assert catalog.table("sales").column("product_id")["foreign_keys"][0]["target_table"] == "products"
+    assert products.column("price")["check_constraints"] == ("price > 0",)
+    assert set(products.check_constraints) == {"price > 0", "volume_ml > 0"}
+
+
+def test_columns_are_read_only_but_copies_are_not(catalog):
+    products = catalog.table("products")
+    with pytest.raises(TypeError):
+        products.columns["price"]["nullable"] = True
+
+    columns = products.columns_dict()
+    columns["price"]["nullable"] = True
+    assert products.column("price")["nullable"] is False
+
+
+def test_related_tables(catalog):
+    assert catalog.table("sales").related_tables["products"]["relationship_type"] == "outgoing"
+    related = catalog.table("products").related_tables
+    assert set(related) == {"sales", "inventory", "production_batches"}
+    assert related["sales"]["relationship_type"] == "incoming"
+    assert related["sales"]["columns"][0] == {"source_column": "product_id", "target_column": "product_id"}
+
+
+def test_reflected_table_without_model_added(catalog):
+    reflected = {
+        "suppliers": {
+            "columns": {
+                "supplier_id": {"name": "supplier_id", "type": "INTEGER", "type_spec": {"kind": "Integer"},
+                                "nullable": False, "primary_key": True, "default": None,
+                                "foreign_keys": [], "check_constraints": [], "enum_values": None},
+                "title": {"name": "title", "type": "TEXT", "type_spec": {"kind": "Text"},
+                          "nullable": True, "primary_key": False, "default": None,
+                          "foreign_keys": [], "check_constraints": [], "enum_values": None},
+            },
+            "check_constraints": [],
+        },
+        # Таблица с моделью берётся из модели
+        "products": {"columns": {}, "check_constraints": []},
+    }
+
+    extended = SchemaCatalog.build(Base, reflected=reflected)
+
+    assert extended.model("products") is Products
+    assert str(extended.model("suppliers").__table__.c.title.type) == "TEXT"
+    assert extended.table("suppliers").display_column == "title"
+
+
+@pytest.mark.parametrize("columns, expected", [
+    ({"id": {"type": "INTEGER"}, "name": {"type": "TEXT"}}, "name"),
+    ({"id": {"type": "INTEGER"}, "name": {"type": "INTEGER"}, "note": {"type": "VARCHAR(20)"}}, "id"),
+    ({"id": {"type": "INTEGER"}, "comment": {"type": "TEXT"}}, "comment"),
+    ({"id": {"type": "INTEGER"}}, "id"),
+])
+def test_choose_display_column(columns, expected):
+    assert choose_display_column(columns) == expected
+
+
+def test_repository_lookups():
+    assert DatabaseRepository.get_display_column("products").data == "name"
+    assert DatabaseRepository.get_display_column("sales").data == "sale_id"
+    assert DatabaseRepository.get_model_by_tablename("inventory").status == ResponseStatus.SUCCESS
+
+    response = DatabaseRepository.get_display_column("missing")
+    assert response.status == ResponseStatus.ERROR
+    assert response.error_code == ErrorCode.TABLE_NOT_FOUND
@@ -0,0 +1,83 @@
+# Отражение схемы БД: кэш по ревизии Alembic, сопоставление CHECK с колонками, ленивый каталог
+import json
+
+import pytest
+
+import backend.repository as repository
+from backend.database.models import Base
+from backend.repository import DatabaseRepository
+from backend.utils import schema_reflection
+from backend.utils.schema_reflection import load_schema, mentions_column
+
+
+@pytest.mark.parametrize("sql_text, column_name, expected", [
+    ("quantity_in_stock >= 0", "quantity_in_stock", True),
+    ("unit_price > 0", "price", False),
+    ("price_total > 0", "price", False),
+    ("(price > 0) AND (price < 1000)", "price", True),
+    ('"price" > 0', "price", True),
+    ("price$1 > 0", "price", False),
+])
+def test_mentions_column(sql_text, column_name, expected):
+    assert mentions_column(sql_text, column_name) is expected
+
+
+@pytest.fixture
+def fake_database(monkeypatch):
+    """Ревизия и отражение схемы без БД; возвращает журнал вызовов отражения"""
+    state = {"revision": "a1", "reflections": 0}
+
+    def reflect_schema(engine):
+        state["reflections"] += 1
+        return {"extra": {"columns": {}, "check_constraints": [], "reflection": state["reflections"]}}
+
+    monkeypatch.setattr(schema_reflection, "current_revision", lambda engine: state["revision"])
+    monkeypatch.setattr(schema_reflection, "reflect_schema", reflect_schema)
+    return state
+
+
+def test_schema_cached_by_revision(fake_database, tmp_path):
+    cache_path = str(tmp_path / "schema.json")
+
+    first = load_schema(None, Base, cache_path)
+    second = load_schema(None, Base, cache_path)
+
+    assert fake_database["reflections"] == 1
+    assert first == second
+    assert json.loads((tmp_path / "schema.json").read_text(encoding="utf-8"))["key"]["revision"] == "a1"
+
+    # Новая миграция — схема отражается заново
+    fake_database["revision"] = "b2"
+    assert load_schema(None, Base, cache_path)["extra"]["reflection"] == 2
+
+
+def test_schema_without_revision_not_cached(fake_database, tmp_path):
+    fake_database["revision"] = None
+    cache_path = tmp_path / "schema.json"
+
+    load_schema(None, Base, str(cache_path))
+    load_schema(None, Base, str(cache_path))
+
+    assert fake_database["reflections"] == 2
+    assert not cache_path.exists()
+
+
+def test_broken_cache_file_ignored(fake_database, tmp_path):
+    cache_path = tmp_path / "schema.json"
+    cache_path.write_text("{не json", encoding="utf-8")
+
+    load_schema(None, Base, str(cache_path))
+
+    assert fake_database["reflections"] == 1
+
+
+def test_catalog_built_lazily_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(repository, "_load_reflected_schema", lambda: calls.append(1))
+    monkeypatch.setattr(DatabaseRepository, "_catalog", None)
+
+    assert calls == []
+    DatabaseRepository.get_tablenames()
+    DatabaseRepository.get_model_by_tablename("sales")
+
+    assert calls == [1]
@@ -0,0 +1,48 @@
+# Кэш построенных выражений
+from backend.utils.responce_types import DatabaseResponse, ErrorCode, ResponseStatus
+from backend.utils.statement_cache import StatementCache
+
+
+def counting_builder(calls, value):
+    def build():
+        calls.append(value)
+        return DatabaseResponse.success(data=value)
+    return build
+
+
+def test_hit_and_miss():
+    cache = StatementCache()
+    calls = []
+
+    first = cache.get_or_build("key", counting_builder(calls, "stmt"))
+    second = cache.get_or_build("key", counting_builder(calls, "other"))
+
+    assert first.data == second.data == "stmt"
+    assert calls == ["stmt"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_lru_eviction():
+    cache = StatementCache(max_size=2)
+    calls = []
+    cache.get_or_build("a", counting_builder(calls, "a"))
+    cache.get_or_build("b", counting_builder(calls, "b"))
+    cache.get_or_build("a", counting_builder(calls, "a"))
+    cache.get_or_build("c", counting_builder(calls, "c"))
+
+    # "b" использовался давнее всех и вытеснен, "a" остался
+    cache.get_or_build("a", counting_builder(calls, "a"))
+    cache.get_or_build("b", counting_builder(calls, "b"))
+
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_errors_not_cached():
+    cache = StatementCache()
+    error = DatabaseResponse.error(ErrorCode.INVALID_PARAMETERS, "ошибка")
+    calls = []
+
+    assert cache.get_or_build("key", lambda: error).status == ResponseStatus.ERROR
+    assert cache.get_or_build("key", counting_builder(calls, "stmt")).data == "stmt"
+    assert calls == ["stmt"]
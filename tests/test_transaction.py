@@ -0,0 +1,106 @@
+# Единица работы Database.transaction(): фиксация, откат, точки сохранения, after_commit
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database.database import Database, TransactionFailedError
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Database, сессии которой открываются в SQLite в памяти (SAVEPOINT поддерживается)"""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        # pysqlite сам управляет транзакциями и ломает SAVEPOINT: BEGIN выполняется явно
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE items (name TEXT)")
+
+    db = Database()
+    monkeypatch.setattr(db, "_SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    return db
+
+
+def names(db: Database) -> list:
+    """Зафиксированные строки (отдельная сессия)"""
+    with db._SessionLocal() as session:
+        return list(session.scalars(text("SELECT name FROM items ORDER BY name")))
+
+
+def insert(db: Database, name: str) -> None:
+    with db.get_db_session() as session:
+        session.execute(text("INSERT INTO items VALUES (:name)"), {"name": name})
+
+
+def test_single_commit_and_after_commit(database):
+    calls = []
+    with database.transaction() as transaction:
+        assert database.in_transaction()
+        insert(database, "a")
+        insert(database, "b")
+        with database.get_db_session() as session:
+            assert session is transaction.session
+            Database.after_commit(session, lambda: calls.append(names(database)))
+        # Изменения не зафиксированы, callback ещё не вызван
+        assert calls == []
+
+    assert not database.in_transaction()
+    assert calls == [["a", "b"]]
+
+
+def test_exception_rolls_back(database):
+    calls = []
+    with pytest.raises(KeyError):
+        with database.transaction():
+            insert(database, "a")
+            with database.get_db_session() as session:
+                Database.after_commit(session, lambda: calls.append("commit"))
+            raise KeyError("x")
+
+    assert names(database) == []
+    assert calls == []
+
+
+def test_failed_step_rolls_back(database):
+    with pytest.raises(TransactionFailedError) as error:
+        with database.transaction() as transaction:
+            insert(database, "a")
+            # Ошибка БД внутри get_db_session помечает транзакцию неудавшейся, даже если перехвачена
+            try:
+                with database.get_db_session() as session:
+                    session.execute(text("INSERT INTO missing VALUES (1)"))
+            except Exception:
+                pass
+            assert transaction.failed
+
+    assert "missing" in str(error.value.cause)
+    assert names(database) == []
+
+
+def test_savepoint_rolls_back_only_inner_step(database):
+    with database.transaction() as transaction:
+        insert(database, "outer")
+
+        with pytest.raises(ValueError):
+            with database.transaction():
+                insert(database, "raised")
+                raise ValueError
+
+        with database.transaction() as nested:
+            insert(database, "failed")
+            nested.mark_failed(RuntimeError("step"))
+
+        with transaction.savepoint():
+            insert(database, "kept")
+
+        assert not transaction.failed
+
+    assert names(database) == ["kept", "outer"]
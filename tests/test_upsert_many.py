@@ -0,0 +1,29 @@
+# Пакетный upsert (INSERT ... ON CONFLICT)
+from backend.database.models import Inventory
+from backend.repository import DatabaseRepository
+from backend.utils.responce_types import ErrorCode, ResponseStatus
+
+
+def test_upsert_many_statement(compile_sql):
+    sql = compile_sql(DatabaseRepository._build_upsert_many_statement(
+        Inventory, ["inventory_id"], ["quantity_in_stock"]
+    ).data)
+
+    assert sql.startswith("INSERT INTO inventory")
+    assert "ON CONFLICT (inventory_id) DO UPDATE SET quantity_in_stock = excluded.quantity_in_stock" in sql
+    assert sql.endswith("RETURNING (xmax = 0)")
+
+
+def test_upsert_many_statement_without_updates(compile_sql):
+    sql = compile_sql(DatabaseRepository._build_upsert_many_statement(Inventory, ["inventory_id"], []).data)
+
+    assert "ON CONFLICT (inventory_id) DO NOTHING" in sql
+
+
+def test_conflict_columns_must_be_unique_key():
+    response = DatabaseRepository.upsert_many(
+        "inventory", [{"product_id": 1, "quantity_in_stock": 5}], conflict_columns=["product_id"]
+    )
+
+    assert response.status == ResponseStatus.ERROR
+    assert response.error_code == ErrorCode.INVALID_PARAMETERS
@@ -0,0 +1,94 @@
+# Оконные функции и top_n в get_table_data
+import pytest
+
+from backend.database.models import Sales
+from backend.repository import DatabaseRepository
+from backend.utils.responce_types import ErrorCode, ResponseStatus
+
+PRODUCTS_JOIN = [{"table": "products", "on": {"product_id": "product_id"}}]
+TOP_2 = {"n": 2, "partition_by": ["product_id"], "order_by": {"total_price": "desc"}}
+
+
+def build(**options):
+    return DatabaseRepository._build_table_data_statement("sales", Sales, **options)
+
+
+def test_window_columns(compile_sql):
+    response = build(windows={
+        "running_total": {"func": "sum", "column": "total_price", "partition_by": ["product_id"],
+                          "order_by": {"sale_date": "asc"}, "rows": [None, 0]},
+        "prev_qty": {"func": "lag", "column": "quantity_sold", "offset": 2, "order_by": {"sale_date": "asc"}},
+        "place": {"func": "rank", "order_by": {"products.name": "desc"}},
+    }, join_config=PRODUCTS_JOIN)
+    sql = compile_sql(response.data["query"])
+
+    assert response.data["output_columns"][-3:] == ["running_total", "prev_qty", "place"]
+    assert (
+        "sum(sales.total_price) OVER (PARTITION BY sales.product_id ORDER BY sales.sale_date ASC"
+        " ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS running_total"
+    ) in sql
+    assert "lag(sales.quantity_sold, %(lag_1)s) OVER (ORDER BY sales.sale_date ASC) AS prev_qty" in sql
+    assert "rank() OVER (ORDER BY products.name DESC) AS place" in sql
+
+
+@pytest.mark.parametrize("spec, error_code", [
+    ({"func": "median", "column": "total_price"}, ErrorCode.INVALID_PARAMETERS),
+    ({"func": "sum"}, ErrorCode.COLUMN_NOT_FOUND),
+    ({"func": "sum", "column": "missing"}, ErrorCode.COLUMN_NOT_FOUND),
+    ({"func": "rank", "partition_by": ["missing"]}, ErrorCode.COLUMN_NOT_FOUND),
+    ({"func": "rank", "order_by": {"missing": "asc"}}, ErrorCode.INVALID_ORDER_BY),
+])
+def test_invalid_window_spec(spec, error_code):
+    response = build(windows={"w": spec})
+
+    assert response.status == ResponseStatus.ERROR
+    assert response.error_code == error_code
+
+
+def test_top_n(compile_sql):
+    response = build(order_by={"sale_date": "desc"}, top_n={**TOP_2, "ties": True})
+    sql = compile_sql(response.data["query"])
+
+    assert response.data["output_columns"] == ["sale_id", "product_id", "sale_date", "quantity_sold", "total_price"]
+    assert sql.startswith("SELECT top_n.sale_id, top_n.product_id, top_n.sale_date,")
+    assert (
+        "rank() OVER (PARTITION BY sales.product_id ORDER BY sales.total_price DESC) AS _top_n_rank"
+    ) in sql
+    assert "WHERE top_n._top_n_rank <= %(top_n)s" in sql
+    assert sql.endswith("ORDER BY top_n.sale_date DESC, top_n._top_n_rank ASC")
+
+
+def test_top_n_orders_by_unselected_column(compile_sql):
+    response = build(columns_list=["sale_id", "product_id"], order_by={"sale_date": "desc"}, top_n=TOP_2)
+    sql = compile_sql(response.data["query"])
+
+    # Колонка сортировки выбирается во внутреннем запросе, но не попадает в результат
+    assert sql.startswith("SELECT top_n.sale_id, top_n.product_id FROM (SELECT")
+    assert "sales.sale_date AS _top_n_order_0" in sql
+    assert sql.endswith("ORDER BY top_n._top_n_order_0 DESC, top_n._top_n_rank ASC")
+
+
+def test_top_n_orders_by_joined_column(compile_sql):
+    response = build(order_by={"products.name": "asc", "sale_id": "desc"}, join_config=PRODUCTS_JOIN, top_n=TOP_2)
+    sql = compile_sql(response.data["query"])
+
+    assert "products.name AS _top_n_order_0" in sql
+    assert "_top_n_order_1" not in sql
+    assert sql.endswith("ORDER BY top_n._top_n_order_0 ASC, top_n.sale_id DESC, top_n._top_n_rank ASC")
+
+
+def test_top_n_orders_by_selected_joined_column(compile_sql):
+    response = build(
+        columns_list=["sale_id", "products.name"], order_by={"products.name": "asc"},
+        join_config=PRODUCTS_JOIN, top_n=TOP_2
+    )
+    sql = compile_sql(response.data["query"])
+
+    assert "_top_n_order_" not in sql
+    assert sql.endswith('ORDER BY top_n."products.name" ASC, top_n._top_n_rank ASC')
+
+
+def test_top_n_requires_partition_and_order():
+    response = build(top_n={"n": 1, "partition_by": ["product_id"]})
+
+    assert response.error_code == ErrorCode.INVALID_PARAMETERS